@@ -1,29 +1,137 @@
 """The GaggiMate integration."""
 from __future__ import annotations
 
+import asyncio
 import logging
+from datetime import datetime, time, timedelta
+from pathlib import Path
 
 import voluptuous as vol
 
 from homeassistant.components.http import StaticPathConfig
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST
-from homeassistant.core import HomeAssistant, ServiceCall
-from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN, PLATFORMS
-from .coordinator import GaggiMateCoordinator
+from .const import (
+    CAPTURE_DIR,
+    CONF_MEMORY_BUDGET,
+    DEFAULT_MEMORY_BUDGET,
+    DOMAIN,
+    DOWNSAMPLE_POINTS,
+    HISTORY_HOURS,
+    MEMORY_CHECK_INTERVAL,
+    MODE_REVERSE_MAP,
+    PLATFORMS,
+    RECIPE_TIMEOUT,
+    TRENDS_DAYS,
+)
+from .coordinator import GaggiMateCoordinator, find_coordinator, get_coordinator
+from .history import HISTORY_DEFAULT_CHANNELS, HISTORY_SENSORS
+from .trends import TREND_GROUPS
+from .websocket_api import async_register_websocket_commands
 
 _LOGGER = logging.getLogger(__name__)
 
 SERVICE_RAISE_TEMPERATURE = "raise_temperature"
 SERVICE_LOWER_TEMPERATURE = "lower_temperature"
+SERVICE_EXPORT_PROFILES = "export_profiles"
+SERVICE_IMPORT_PROFILES = "import_profiles"
+SERVICE_SYNC_PROFILES = "sync_profiles"
+SERVICE_SIMULATE_SHOT = "simulate_shot"
+SERVICE_START_CAPTURE = "start_capture"
+SERVICE_STOP_CAPTURE = "stop_capture"
+SERVICE_GET_SHOT = "get_shot"
+SERVICE_GET_HISTORY = "get_history"
+SERVICE_SHOT_TRENDS = "shot_trends"
+SERVICE_SET_REFERENCE_SHOT = "set_reference_shot"
+SERVICE_PREHEAT = "preheat"
+SERVICE_CANCEL_PREHEAT = "cancel_preheat"
+SERVICE_APPLY_RECIPE = "apply_recipe"
 
 SERVICE_SCHEMA = vol.Schema({
     vol.Required("device_id"): cv.string,
 })
 
+IMPORT_PROFILES_SCHEMA = vol.Schema({
+    vol.Required("device_id"): vol.All(cv.ensure_list, [cv.string]),
+    vol.Required("profiles"): vol.All(cv.ensure_list, [dict]),
+})
+
+SYNC_PROFILES_SCHEMA = vol.Schema({
+    vol.Required("source_device_id"): cv.string,
+    vol.Required("target_device_id"): vol.All(cv.ensure_list, [cv.string]),
+})
+
+START_CAPTURE_SCHEMA = vol.Schema({
+    vol.Required("device_id"): cv.string,
+    vol.Optional("filename"): vol.Match(r"^[\w-][\w.-]*$"),
+    vol.Optional("duration"): vol.All(vol.Coerce(float), vol.Range(min=1)),
+})
+
+SIMULATION_VARIANT_SCHEMA = vol.Schema({
+    vol.Optional("label"): cv.string,
+    vol.Optional("pressure_scale"): vol.All(vol.Coerce(float), vol.Range(min=0, max=2)),
+    vol.Optional("flow_scale"): vol.All(vol.Coerce(float), vol.Range(min=0, max=2)),
+    vol.Optional("time_scale"): vol.All(vol.Coerce(float), vol.Range(min=0.25, max=4)),
+})
+
+SIMULATE_SHOT_SCHEMA = vol.Schema({
+    vol.Required("device_id"): cv.string,
+    vol.Optional("profile"): cv.string,
+    vol.Optional("variants"): vol.All(cv.ensure_list, [SIMULATION_VARIANT_SCHEMA]),
+    vol.Optional("target_weight"): vol.All(vol.Coerce(float), vol.Range(min=0)),
+})
+
+GET_SHOT_SCHEMA = vol.Schema({
+    vol.Required("device_id"): cv.string,
+    vol.Optional("shot_id"): cv.string,
+    vol.Optional("points", default=DOWNSAMPLE_POINTS): vol.All(vol.Coerce(int), vol.Range(min=10, max=5000)),
+})
+
+GET_HISTORY_SCHEMA = vol.Schema({
+    vol.Required("device_id"): cv.string,
+    vol.Optional("channels", default=list(HISTORY_DEFAULT_CHANNELS)): vol.All(
+        cv.ensure_list, [vol.In(HISTORY_SENSORS)]
+    ),
+    vol.Optional("start"): cv.datetime,
+    vol.Optional("end"): cv.datetime,
+    vol.Optional("hours", default=HISTORY_HOURS): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=168)),
+    vol.Optional("points", default=DOWNSAMPLE_POINTS): vol.All(vol.Coerce(int), vol.Range(min=10, max=5000)),
+})
+
+SET_REFERENCE_SHOT_SCHEMA = vol.Schema({
+    vol.Required("device_id"): cv.string,
+    vol.Optional("shot_id"): cv.string,
+})
+
+PREHEAT_SCHEMA = vol.Schema({
+    vol.Required("device_id"): cv.string,
+    vol.Required("ready_at"): vol.Any(cv.time, cv.datetime),
+    vol.Optional("target_temperature"): vol.All(vol.Coerce(float), vol.Range(min=80, max=110)),
+})
+
+APPLY_RECIPE_SCHEMA = vol.Schema({
+    vol.Required("device_id"): cv.string,
+    vol.Optional("profile"): cv.string,
+    vol.Optional("temperature"): vol.All(vol.Coerce(float), vol.Range(min=0, max=160)),
+    vol.Optional("pressure"): vol.All(vol.Coerce(float), vol.Range(min=0, max=15)),
+    vol.Optional("weight"): vol.All(vol.Coerce(float), vol.Range(min=5, max=250)),
+    vol.Optional("mode"): vol.In(MODE_REVERSE_MAP),
+    vol.Optional("timeout", default=RECIPE_TIMEOUT): vol.All(vol.Coerce(float), vol.Range(min=1, max=60)),
+})
+
+SHOT_TRENDS_SCHEMA = vol.Schema({
+    vol.Required("device_id"): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional("profile"): cv.string,
+    vol.Optional("group_by", default="week"): vol.In(TREND_GROUPS),
+    vol.Optional("days", default=TRENDS_DAYS): vol.All(vol.Coerce(int), vol.Range(min=1, max=3650)),
+})
+
 type GaggiMateConfigEntry = ConfigEntry[GaggiMateCoordinator]
 
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
@@ -49,6 +157,8 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     # add_extra_js_url() only works for direct local HA access.
     hass.async_create_task(_async_register_lovelace_resource(hass))
 
+    async_register_websocket_commands(hass)
+
     return True
 
 
@@ -84,42 +194,182 @@ async def async_setup_entry(hass: HomeAssistant, entry: GaggiMateConfigEntry) ->
     """Set up GaggiMate from a config entry."""
     host = entry.data[CONF_HOST]
     
-    coordinator = GaggiMateCoordinator(hass, host)
+    coordinator = GaggiMateCoordinator(hass, host, entry.entry_id)
+    await coordinator.shot_recorder.async_load()
+    await coordinator.statistics.async_load()
+    await coordinator.trends.async_load(coordinator.shot_recorder.shots)
+    await coordinator.preheat.async_load()
     
     try:
         await coordinator.async_config_entry_first_refresh()
     except Exception as err:
         _LOGGER.error("Error connecting to GaggiMate at %s: %s", host, err)
+        # Loading may already have started analytics workers; a retry
+        # creates a new coordinator, so stop this one completely
+        await coordinator.async_shutdown()
         raise ConfigEntryNotReady from err
     
     entry.runtime_data = coordinator
     
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    coordinator.async_mark_setup_complete()
+    entry.async_on_unload(entry.add_update_listener(_async_options_updated))
+    
+    coordinator.memory.budget = entry.options.get(CONF_MEMORY_BUDGET, DEFAULT_MEMORY_BUDGET) * 1024 * 1024
+    coordinator.async_check_memory()
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass, coordinator.async_check_memory, timedelta(seconds=MEMORY_CHECK_INTERVAL)
+        )
+    )
     
     # Register services
     async def async_raise_temperature(call: ServiceCall) -> None:
         """Handle raise temperature service call."""
         device_id = call.data["device_id"]
-        # Find the coordinator for this device
-        for config_entry in hass.config_entries.async_entries(DOMAIN):
-            if config_entry.entry_id in device_id or device_id in config_entry.title.lower().replace(" ", "_"):
-                coordinator = config_entry.runtime_data
-                await coordinator.raise_temperature()
-                _LOGGER.debug("Raised temperature for device %s", device_id)
-                return
-        _LOGGER.error("Device %s not found", device_id)
+        coordinator = find_coordinator(hass, device_id)
+        if coordinator is None:
+            _LOGGER.error("Device %s not found", device_id)
+            return
+        await coordinator.raise_temperature()
+        _LOGGER.debug("Raised temperature for device %s", device_id)
     
     async def async_lower_temperature(call: ServiceCall) -> None:
         """Handle lower temperature service call."""
         device_id = call.data["device_id"]
-        # Find the coordinator for this device
-        for config_entry in hass.config_entries.async_entries(DOMAIN):
-            if config_entry.entry_id in device_id or device_id in config_entry.title.lower().replace(" ", "_"):
-                coordinator = config_entry.runtime_data
-                await coordinator.lower_temperature()
-                _LOGGER.debug("Lowered temperature for device %s", device_id)
-                return
-        _LOGGER.error("Device %s not found", device_id)
+        coordinator = find_coordinator(hass, device_id)
+        if coordinator is None:
+            _LOGGER.error("Device %s not found", device_id)
+            return
+        await coordinator.lower_temperature()
+        _LOGGER.debug("Lowered temperature for device %s", device_id)
+    
+    async def async_export_profiles(call: ServiceCall) -> ServiceResponse:
+        """Handle export profiles service call."""
+        coordinator = get_coordinator(hass, call.data["device_id"])
+        profiles = await coordinator.async_fetch_profiles()
+        return {"profiles": profiles}
+    
+    async def async_import_profiles(call: ServiceCall) -> ServiceResponse:
+        """Handle import profiles service call."""
+        profiles = call.data["profiles"]
+        coordinators = {
+            device_id: get_coordinator(hass, device_id)
+            for device_id in call.data["device_id"]
+        }
+        # Devices are independent, so push to all of them at once
+        results = await asyncio.gather(
+            *(coordinator.async_import_profiles(profiles) for coordinator in coordinators.values())
+        )
+        return dict(zip(coordinators, results))
+    
+    async def async_sync_profiles(call: ServiceCall) -> ServiceResponse:
+        """Handle sync profiles service call."""
+        source = get_coordinator(hass, call.data["source_device_id"])
+        targets = {
+            device_id: get_coordinator(hass, device_id)
+            for device_id in call.data["target_device_id"]
+        }
+        profiles = await source.async_fetch_profiles()
+        results = await asyncio.gather(
+            *(coordinator.async_import_profiles(profiles) for coordinator in targets.values())
+        )
+        return dict(zip(targets, results))
+    
+    async def async_start_capture(call: ServiceCall) -> None:
+        """Handle start capture service call."""
+        device_id = call.data["device_id"]
+        coordinator = get_coordinator(hass, device_id)
+        filename = call.data.get(
+            "filename",
+            f"{device_id}_{dt_util.now().strftime('%Y%m%d_%H%M%S')}.jsonl.gz",
+        )
+        path = Path(hass.config.path(CAPTURE_DIR)) / filename
+        await coordinator.async_start_capture(path, call.data.get("duration"))
+    
+    async def async_stop_capture(call: ServiceCall) -> ServiceResponse:
+        """Handle stop capture service call."""
+        coordinator = get_coordinator(hass, call.data["device_id"])
+        return await coordinator.async_stop_capture() or {}
+    
+    async def async_simulate_shot(call: ServiceCall) -> ServiceResponse:
+        """Handle simulate shot service call."""
+        coordinator = get_coordinator(hass, call.data["device_id"])
+        return await coordinator.async_simulate_shot(
+            call.data.get("profile"),
+            call.data.get("variants"),
+            call.data.get("target_weight"),
+        )
+    
+    async def async_get_shot(call: ServiceCall) -> ServiceResponse:
+        """Handle get shot service call."""
+        coordinator = get_coordinator(hass, call.data["device_id"])
+        return await coordinator.async_get_shot(call.data.get("shot_id"), call.data["points"])
+    
+    async def async_get_history(call: ServiceCall) -> ServiceResponse:
+        """Handle get history service call."""
+        coordinator = get_coordinator(hass, call.data["device_id"])
+        end = dt_util.as_utc(call.data.get("end") or dt_util.utcnow())
+        start = dt_util.as_utc(call.data.get("start") or end - timedelta(hours=call.data["hours"]))
+        if start >= end:
+            raise HomeAssistantError("start must be before end")
+        return await coordinator.async_get_history(
+            start, end, call.data["channels"], call.data["points"]
+        )
+    
+    async def async_set_reference_shot(call: ServiceCall) -> ServiceResponse:
+        """Handle set reference shot service call."""
+        coordinator = get_coordinator(hass, call.data["device_id"])
+        return coordinator.async_set_reference_shot(call.data.get("shot_id"))
+    
+    async def async_preheat(call: ServiceCall) -> ServiceResponse:
+        """Handle preheat service call."""
+        coordinator = get_coordinator(hass, call.data["device_id"])
+        ready_at = call.data["ready_at"]
+        if isinstance(ready_at, time):
+            # Next occurrence of the time of day
+            ready_at = datetime.combine(dt_util.now().date(), ready_at)
+            if dt_util.as_utc(ready_at) <= dt_util.utcnow():
+                ready_at += timedelta(days=1)
+        return await coordinator.async_schedule_preheat(
+            dt_util.as_utc(ready_at), call.data.get("target_temperature")
+        )
+    
+    async def async_cancel_preheat(call: ServiceCall) -> None:
+        """Handle cancel preheat service call."""
+        coordinator = get_coordinator(hass, call.data["device_id"])
+        coordinator.async_cancel_preheat()
+    
+    async def async_apply_recipe(call: ServiceCall) -> ServiceResponse:
+        """Handle apply recipe service call."""
+        coordinator = get_coordinator(hass, call.data["device_id"])
+        mode = call.data.get("mode")
+        return await coordinator.async_apply_recipe(
+            profile=call.data.get("profile"),
+            temperature=call.data.get("temperature"),
+            pressure=call.data.get("pressure"),
+            weight=call.data.get("weight"),
+            mode=MODE_REVERSE_MAP[mode] if mode is not None else None,
+            timeout=call.data["timeout"],
+        )
+    
+    async def async_shot_trends(call: ServiceCall) -> ServiceResponse:
+        """Handle shot trends service call."""
+        coordinators = {
+            device_id: get_coordinator(hass, device_id)
+            for device_id in call.data["device_id"]
+        }
+        since = dt_util.now().date() - timedelta(days=call.data["days"] - 1)
+        return {
+            "group_by": call.data["group_by"],
+            "since": since.isoformat(),
+            "devices": {
+                device_id: coordinator.trends.query(
+                    call.data.get("profile"), call.data["group_by"], since
+                )
+                for device_id, coordinator in coordinators.items()
+            },
+        }
     
     # Register services only once (check if not already registered)
     if not hass.services.has_service(DOMAIN, SERVICE_RAISE_TEMPERATURE):
@@ -138,9 +388,129 @@ async def async_setup_entry(hass: HomeAssistant, entry: GaggiMateConfigEntry) ->
             schema=SERVICE_SCHEMA,
         )
     
+    if not hass.services.has_service(DOMAIN, SERVICE_EXPORT_PROFILES):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_EXPORT_PROFILES,
+            async_export_profiles,
+            schema=SERVICE_SCHEMA,
+            supports_response=SupportsResponse.ONLY,
+        )
+    
+    if not hass.services.has_service(DOMAIN, SERVICE_IMPORT_PROFILES):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_IMPORT_PROFILES,
+            async_import_profiles,
+            schema=IMPORT_PROFILES_SCHEMA,
+            supports_response=SupportsResponse.OPTIONAL,
+        )
+    
+    if not hass.services.has_service(DOMAIN, SERVICE_SYNC_PROFILES):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_SYNC_PROFILES,
+            async_sync_profiles,
+            schema=SYNC_PROFILES_SCHEMA,
+            supports_response=SupportsResponse.OPTIONAL,
+        )
+    
+    if not hass.services.has_service(DOMAIN, SERVICE_START_CAPTURE):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_START_CAPTURE,
+            async_start_capture,
+            schema=START_CAPTURE_SCHEMA,
+        )
+    
+    if not hass.services.has_service(DOMAIN, SERVICE_STOP_CAPTURE):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_STOP_CAPTURE,
+            async_stop_capture,
+            schema=SERVICE_SCHEMA,
+            supports_response=SupportsResponse.OPTIONAL,
+        )
+    
+    if not hass.services.has_service(DOMAIN, SERVICE_SIMULATE_SHOT):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_SIMULATE_SHOT,
+            async_simulate_shot,
+            schema=SIMULATE_SHOT_SCHEMA,
+            supports_response=SupportsResponse.ONLY,
+        )
+    
+    if not hass.services.has_service(DOMAIN, SERVICE_GET_SHOT):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_GET_SHOT,
+            async_get_shot,
+            schema=GET_SHOT_SCHEMA,
+            supports_response=SupportsResponse.ONLY,
+        )
+    
+    if not hass.services.has_service(DOMAIN, SERVICE_GET_HISTORY):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_GET_HISTORY,
+            async_get_history,
+            schema=GET_HISTORY_SCHEMA,
+            supports_response=SupportsResponse.ONLY,
+        )
+    
+    if not hass.services.has_service(DOMAIN, SERVICE_SET_REFERENCE_SHOT):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_SET_REFERENCE_SHOT,
+            async_set_reference_shot,
+            schema=SET_REFERENCE_SHOT_SCHEMA,
+            supports_response=SupportsResponse.OPTIONAL,
+        )
+    
+    if not hass.services.has_service(DOMAIN, SERVICE_PREHEAT):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_PREHEAT,
+            async_preheat,
+            schema=PREHEAT_SCHEMA,
+            supports_response=SupportsResponse.OPTIONAL,
+        )
+    
+    if not hass.services.has_service(DOMAIN, SERVICE_CANCEL_PREHEAT):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_CANCEL_PREHEAT,
+            async_cancel_preheat,
+            schema=SERVICE_SCHEMA,
+        )
+    
+    if not hass.services.has_service(DOMAIN, SERVICE_APPLY_RECIPE):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_APPLY_RECIPE,
+            async_apply_recipe,
+            schema=APPLY_RECIPE_SCHEMA,
+            supports_response=SupportsResponse.OPTIONAL,
+        )
+    
+    if not hass.services.has_service(DOMAIN, SERVICE_SHOT_TRENDS):
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_SHOT_TRENDS,
+            async_shot_trends,
+            schema=SHOT_TRENDS_SCHEMA,
+            supports_response=SupportsResponse.ONLY,
+        )
+    
     return True
 
 
+async def _async_options_updated(hass: HomeAssistant, entry: GaggiMateConfigEntry) -> None:
+    """Reload the entry so the sensors use the new options."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: GaggiMateConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
@@ -153,5 +523,18 @@ async def async_unload_entry(hass: HomeAssistant, entry: GaggiMateConfigEntry) -
         if len(hass.config_entries.async_entries(DOMAIN)) == 1:
             hass.services.async_remove(DOMAIN, SERVICE_RAISE_TEMPERATURE)
             hass.services.async_remove(DOMAIN, SERVICE_LOWER_TEMPERATURE)
+            hass.services.async_remove(DOMAIN, SERVICE_EXPORT_PROFILES)
+            hass.services.async_remove(DOMAIN, SERVICE_IMPORT_PROFILES)
+            hass.services.async_remove(DOMAIN, SERVICE_SYNC_PROFILES)
+            hass.services.async_remove(DOMAIN, SERVICE_SIMULATE_SHOT)
+            hass.services.async_remove(DOMAIN, SERVICE_START_CAPTURE)
+            hass.services.async_remove(DOMAIN, SERVICE_STOP_CAPTURE)
+            hass.services.async_remove(DOMAIN, SERVICE_GET_SHOT)
+            hass.services.async_remove(DOMAIN, SERVICE_GET_HISTORY)
+            hass.services.async_remove(DOMAIN, SERVICE_SHOT_TRENDS)
+            hass.services.async_remove(DOMAIN, SERVICE_SET_REFERENCE_SHOT)
+            hass.services.async_remove(DOMAIN, SERVICE_PREHEAT)
+            hass.services.async_remove(DOMAIN, SERVICE_CANCEL_PREHEAT)
+            hass.services.async_remove(DOMAIN, SERVICE_APPLY_RECIPE)
     
     return unload_ok
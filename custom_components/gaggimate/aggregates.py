@@ -0,0 +1,196 @@
+"""Hourly long-term statistics for GaggiMate.
+
+Status frames and recorded shots are folded into a handful of running
+totals for the current hour. When the hour ends, the totals are imported
+into the recorder as external statistics (``gaggimate:<entry>_<key>``), so
+trend charts work even when the high-rate sensors are excluded from the
+recorder.
+"""
+from __future__ import annotations
+
+import logging
+import math
+from collections import Counter
+from datetime import datetime
+from typing import Any
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.const import UnitOfTemperature, UnitOfTime, UnitOfVolume
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, MODE_MAP, STATISTICS_MAX_GAP
+
+try:  # Home Assistant 2025.4+
+    from homeassistant.components.recorder.models import StatisticMeanType
+except ImportError:
+    StatisticMeanType = None
+
+_LOGGER = logging.getLogger(__name__)
+
+# key: (name, unit, True for a running sum or False for a mean)
+STATISTICS: dict[str, tuple[str, str | None, bool]] = {
+    "shots": ("Shots", None, True),
+    "water": ("Water Pumped", UnitOfVolume.MILLILITERS, True),
+    "brew_temperature": ("Brew Temperature", UnitOfTemperature.CELSIUS, False),
+    "peak_pressure": ("Peak Pressure", "bar", False),
+    **{
+        f"time_{name.lower()}": (f"Time in {name}", UnitOfTime.SECONDS, True)
+        for name in MODE_MAP.values()
+    },
+}
+
+
+class _Mean:
+    """Running mean, minimum and maximum."""
+
+    def __init__(self) -> None:
+        self.total = 0.0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        self.total += value
+        self.count += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+
+class StatisticsAggregator:
+    """Aggregate one device's activity into hourly external statistics."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the aggregator."""
+        self.hass = hass
+        self.entry_id = entry_id
+        self._object_prefix = entry_id.lower()
+        self._hour = self._hour_start(dt_util.utcnow())
+        self._sums: Counter[str] = Counter()
+        self._means: dict[str, _Mean] = {}
+        self._base: dict[str, float] = {}
+        self._last_time: float | None = None
+        self._last_mode: int | None = None
+        self._last_flow = 0.0
+
+    @staticmethod
+    def _hour_start(moment: datetime) -> datetime:
+        """Return the start of the hour containing ``moment``."""
+        return moment.replace(minute=0, second=0, microsecond=0)
+
+    def statistic_id(self, key: str) -> str:
+        """Return the external statistic ID for a key."""
+        return f"{DOMAIN}:{self._object_prefix}_{key}"
+
+    async def async_load(self) -> None:
+        """Load the running sums from the recorder.
+
+        If the current hour was already imported before a restart, its
+        totals are taken over so the hour is not counted twice.
+        """
+        if not self._recorder_loaded:
+            return
+        for key, (_, _, has_sum) in STATISTICS.items():
+            if not has_sum:
+                continue
+            statistic_id = self.statistic_id(key)
+            last = await get_instance(self.hass).async_add_executor_job(
+                get_last_statistics, self.hass, 1, statistic_id, True, {"sum", "state"}
+            )
+            rows = last.get(statistic_id)
+            if not rows:
+                continue
+            row = rows[0]
+            total = row.get("sum") or 0.0
+            if row["start"] == self._hour.timestamp():
+                self._base[key] = total - (row.get("state") or 0.0)
+                self._sums[key] += row.get("state") or 0.0
+            else:
+                self._base[key] = total
+
+    @property
+    def _recorder_loaded(self) -> bool:
+        """Return true if the recorder is available."""
+        return "recorder" in self.hass.config.components
+
+    def process_status(self, data: dict[str, Any], now: float) -> None:
+        """Feed a merged status frame received at monotonic time ``now``."""
+        hour = self._hour_start(dt_util.utcnow())
+        if hour != self._hour:
+            self._import(self._hour, final=True)
+            self._hour = hour
+
+        if self._last_time is not None:
+            # Time spent disconnected is not attributed to any mode
+            elapsed = now - self._last_time
+            if 0 < elapsed <= STATISTICS_MAX_GAP:
+                if self._last_mode in MODE_MAP:
+                    self._sums[f"time_{MODE_MAP[self._last_mode].lower()}"] += elapsed
+                self._sums["water"] += self._last_flow * elapsed
+        self._last_time = now
+        self._last_mode = data.get("m")
+        self._last_flow = max(data.get("fl") or 0.0, 0.0)
+
+    def add_shot(self, shot: dict[str, Any]) -> None:
+        """Count a recorded shot and its brew temperature and peak pressure."""
+        self._sums["shots"] += 1
+        temperatures = [value for value in shot["ct"] if value is not None]
+        if temperatures:
+            self._means.setdefault("brew_temperature", _Mean()).add(
+                sum(temperatures) / len(temperatures)
+            )
+        pressures = [value for value in shot["pr"] if value is not None]
+        if pressures:
+            self._means.setdefault("peak_pressure", _Mean()).add(max(pressures))
+
+    @callback
+    def async_flush(self) -> None:
+        """Import the totals of the unfinished hour, e.g. before shutdown."""
+        self._import(self._hour, final=False)
+
+    def _import(self, hour: datetime, final: bool) -> None:
+        """Import the totals for ``hour`` and, if final, start a new hour."""
+        sums, means = self._sums, self._means
+        if final:
+            self._sums, self._means = Counter(), {}
+        if not self._recorder_loaded:
+            return
+
+        for key, (name, unit, has_sum) in STATISTICS.items():
+            if has_sum:
+                state = sums.get(key, 0.0)
+                total = self._base.get(key, 0.0) + state
+                if final:
+                    self._base[key] = total
+                row = StatisticData(start=hour, state=state, sum=total)
+            else:
+                mean = means.get(key)
+                if mean is None:
+                    continue
+                row = StatisticData(
+                    start=hour, mean=mean.total / mean.count, min=mean.min, max=mean.max
+                )
+            async_add_external_statistics(self.hass, self._metadata(key, name, unit, has_sum), [row])
+        _LOGGER.debug("Imported statistics for the hour starting %s", hour)
+
+    def _metadata(self, key: str, name: str, unit: str | None, has_sum: bool) -> StatisticMetaData:
+        """Return the metadata of a statistic."""
+        entry = self.hass.config_entries.async_get_entry(self.entry_id)
+        metadata = StatisticMetaData(
+            has_mean=not has_sum,
+            has_sum=has_sum,
+            name=f"{entry.title if entry else 'GaggiMate'} {name}",
+            source=DOMAIN,
+            statistic_id=self.statistic_id(key),
+            unit_of_measurement=unit,
+        )
+        if StatisticMeanType is not None:
+            metadata["mean_type"] = (
+                StatisticMeanType.NONE if has_sum else StatisticMeanType.ARITHMETIC
+            )
+        return metadata
@@ -14,6 +14,7 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
 from .coordinator import GaggiMateCoordinator
+from .entity import StateWriteCounter
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -35,7 +36,7 @@ async def async_setup_entry(
     async_add_entities(entities)
 
 
-class GaggiMateBinarySensorBase(CoordinatorEntity[GaggiMateCoordinator], BinarySensorEntity):
+class GaggiMateBinarySensorBase(StateWriteCounter, CoordinatorEntity[GaggiMateCoordinator], BinarySensorEntity):
     """Base class for GaggiMate binary sensors."""
 
     def __init__(
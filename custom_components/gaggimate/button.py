@@ -11,6 +11,7 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
 from .coordinator import GaggiMateCoordinator
+from .entity import StateWriteCounter
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -31,7 +32,7 @@ async def async_setup_entry(
     async_add_entities(entities)
 
 
-class GaggiMateButtonBase(CoordinatorEntity[GaggiMateCoordinator], ButtonEntity):
+class GaggiMateButtonBase(StateWriteCounter, CoordinatorEntity[GaggiMateCoordinator], ButtonEntity):
     """Base class for GaggiMate buttons."""
 
     def __init__(
@@ -0,0 +1,86 @@
+"""WebSocket traffic capture for GaggiMate.
+
+Captures are gzip-compressed JSON lines, one ``[t, direction, frame]`` array
+per frame, where ``t`` is seconds since the capture started, ``direction``
+is ``"i"`` for frames received from the device or ``"o"`` for frames sent to
+it, and ``frame`` is the raw text frame. Frames are buffered in memory and
+appended to the file from the executor, so recording costs one list append
+per frame on the event loop.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import CAPTURE_FLUSH_INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
+
+DIRECTION_IN = "i"
+DIRECTION_OUT = "o"
+
+
+class FrameCapture:
+    """Record raw WebSocket frames with timestamps to a capture file."""
+
+    def __init__(self, hass: HomeAssistant, path: Path) -> None:
+        """Initialize the capture."""
+        self.hass = hass
+        self.path = path
+        self.frames = 0
+        self._start = time.monotonic()
+        self._buffer: list[tuple[float, str, str]] = []
+        self._unsub_flush: CALLBACK_TYPE | None = None
+
+    @property
+    def buffered(self) -> int:
+        """Return the number of frames waiting to be written."""
+        return len(self._buffer)
+
+    def start(self) -> None:
+        """Start periodic flushing to disk."""
+        self._unsub_flush = async_track_time_interval(
+            self.hass, self._async_flush, timedelta(seconds=CAPTURE_FLUSH_INTERVAL)
+        )
+
+    def record(self, direction: str, frame: str) -> None:
+        """Buffer one frame."""
+        self._buffer.append((round(time.monotonic() - self._start, 4), direction, frame))
+        self.frames += 1
+
+    async def _async_flush(self, _now: Any = None) -> None:
+        """Append buffered frames to the capture file."""
+        if not self._buffer:
+            return
+        frames, self._buffer = self._buffer, []
+        await self.hass.async_add_executor_job(write_frames, self.path, frames)
+
+    async def async_stop(self) -> None:
+        """Stop capturing and write any remaining frames."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        await self._async_flush()
+        _LOGGER.info("Captured %d frames to %s", self.frames, self.path)
+
+
+def write_frames(path: Path, frames: list[tuple[float, str, str]]) -> None:
+    """Append frames to a capture file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "at", encoding="utf-8") as file:
+        for frame in frames:
+            file.write(json.dumps(frame, separators=(",", ":")) + "\n")
+
+
+def read_frames(path: Path) -> list[tuple[float, str, str]]:
+    """Read all frames from a capture file."""
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        return [tuple(json.loads(line)) for line in file if line.strip()]
@@ -6,16 +6,45 @@ import logging
 import socket
 from typing import Any
 
-import aiohttp
 import voluptuous as vol
+from zeroconf import IPVersion, ServiceStateChange
+from zeroconf.asyncio import AsyncServiceBrowser, AsyncServiceInfo
 
 from homeassistant import config_entries
+from homeassistant.components import zeroconf
 from homeassistant.const import CONF_HOST
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.service_info.zeroconf import ZeroconfServiceInfo
 
-from .const import DOMAIN, DEFAULT_NAME, MDNS_HOSTNAME, CONF_MODEL, CONF_HW_VERSION
+from .connection import (
+    async_discard_validated_connection,
+    async_mark_submitted,
+    async_open_validated_connection,
+)
+from .const import (
+    DOMAIN,
+    DEFAULT_NAME,
+    MDNS_HOSTNAME,
+    CONF_MODEL,
+    CONF_HW_VERSION,
+    CONF_MAX_STALENESS,
+    CONF_MEMORY_BUDGET,
+    DEFAULT_DEADBANDS,
+    DEFAULT_MAX_STALENESS,
+    DEFAULT_MEMORY_BUDGET,
+    DEFAULT_STEPS,
+    FILTERED_SENSOR_KINDS,
+    ZEROCONF_TYPE,
+    ZEROCONF_NAME_PREFIX,
+    DISCOVERY_BROWSE_TIME,
+    DISCOVERY_PROBE_TIMEOUT,
+    DISCOVERY_RESOLVE_TIMEOUT,
+    WS_TIMEOUT,
+)
+
+CONF_DEVICES = "devices"
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -31,36 +60,28 @@ def parse_hardware(hardware_str: str) -> tuple[str, str]:
     return model, hw_version
 
 
-async def query_ota_settings(hass: HomeAssistant, host: str) -> dict[str, Any]:
-    """Query OTA settings from device via WebSocket."""
-    session = async_get_clientsession(hass)
-    ws_url = f"ws://{host}/ws"
-    
+async def query_ota_settings(
+    hass: HomeAssistant, host: str, timeout: float = WS_TIMEOUT, cache: bool = True
+) -> dict[str, Any]:
+    """Query OTA settings from device via WebSocket.
+
+    With ``cache`` the connection stays open for a short while so the
+    coordinator can adopt it if the device is added.
+    """
     try:
-        async with session.ws_connect(ws_url, timeout=10) as ws:
-            # Send OTA settings request
-            await ws.send_json({"tp": "req:ota-settings"})
-            
-            # Wait for response
-            async for msg in ws:
-                if msg.type == aiohttp.WSMsgType.TEXT:
-                    data = msg.json()
-                    if data.get("tp") == "res:ota-settings":
-                        return data
-                elif msg.type == aiohttp.WSMsgType.ERROR:
-                    break
-            
-            raise CannotConnect("No OTA settings response received")
+        return await async_open_validated_connection(hass, host, timeout, cache)
     except Exception as err:
         _LOGGER.error("Error querying OTA settings from %s: %s", host, err)
         raise CannotConnect from err
 
 
-async def validate_connection(hass: HomeAssistant, host: str) -> dict[str, Any]:
+async def validate_connection(
+    hass: HomeAssistant, host: str, timeout: float = WS_TIMEOUT, cache: bool = True
+) -> dict[str, Any]:
     """Validate the connection to GaggiMate device and get device info."""
     try:
         # Query OTA settings to get device information
-        ota_data = await query_ota_settings(hass, host)
+        ota_data = await query_ota_settings(hass, host, timeout, cache)
         
         # Parse hardware field
         hardware = ota_data.get("hardware", DEFAULT_NAME)
@@ -79,15 +100,114 @@ async def validate_connection(hass: HomeAssistant, host: str) -> dict[str, Any]:
         raise CannotConnect from err
 
 
+async def async_resolve_addresses(hosts: set[str]) -> set[str]:
+    """Return the hosts together with the IPv4 addresses they resolve to."""
+    loop = asyncio.get_running_loop()
+
+    async def resolve(host: str) -> set[str]:
+        try:
+            async with asyncio.timeout(DISCOVERY_RESOLVE_TIMEOUT):
+                infos = await loop.getaddrinfo(host, None, family=socket.AF_INET)
+        except (OSError, TimeoutError):
+            return {host}
+        return {host} | {info[4][0] for info in infos}
+
+    addresses: set[str] = set()
+    for resolved in await asyncio.gather(*(resolve(host) for host in hosts)):
+        addresses |= resolved
+    return addresses
+
+
+async def async_discover_devices(
+    hass: HomeAssistant, extra_hosts: set[str], configured: set[str]
+) -> dict[str, dict[str, Any]]:
+    """Browse zeroconf for GaggiMate devices and probe them, returning those that answered.
+
+    Every announced device is resolved and probed as soon as it is seen, so
+    the search takes about ``DISCOVERY_BROWSE_TIME`` instead of the browse,
+    resolve and probe times added up. ``extra_hosts`` are probed straight
+    away; hosts or addresses in ``configured`` are skipped.
+    """
+    aiozc = await zeroconf.async_get_async_instance(hass)
+    devices: dict[str, dict[str, Any]] = {}
+    probes: dict[str, asyncio.Task[None]] = {}
+    lookups: list[asyncio.Task[None]] = []
+
+    async def probe(host: str) -> None:
+        try:
+            devices[host] = await validate_connection(hass, host, DISCOVERY_PROBE_TIMEOUT)
+        except CannotConnect:
+            pass
+
+    def add_host(host: str) -> None:
+        if host not in probes and host not in configured:
+            probes[host] = hass.async_create_task(probe(host))
+
+    async def lookup(name: str) -> None:
+        info = AsyncServiceInfo(ZEROCONF_TYPE, name)
+        if await info.async_request(aiozc.zeroconf, DISCOVERY_BROWSE_TIME * 1000):
+            addresses = info.parsed_addresses(IPVersion.V4Only)
+            if addresses:
+                add_host(addresses[0])
+
+    seen: set[str] = set()
+
+    def on_service_state_change(
+        zeroconf: Any, service_type: str, name: str, state_change: ServiceStateChange
+    ) -> None:
+        if (
+            state_change is not ServiceStateChange.Removed
+            and name.lower().startswith(ZEROCONF_NAME_PREFIX)
+            and name not in seen
+        ):
+            seen.add(name)
+            lookups.append(hass.async_create_task(lookup(name)))
+
+    for host in extra_hosts:
+        add_host(host)
+    browser = AsyncServiceBrowser(
+        aiozc.zeroconf, ZEROCONF_TYPE, handlers=[on_service_state_change]
+    )
+    try:
+        await asyncio.sleep(DISCOVERY_BROWSE_TIME)
+    finally:
+        await browser.async_cancel()
+    await asyncio.gather(*lookups, return_exceptions=True)
+
+    # Fall back to the default mDNS hostname if nothing was announced
+    if not probes and not (await async_resolve_addresses({MDNS_HOSTNAME})) & configured:
+        add_host(MDNS_HOSTNAME)
+    await asyncio.gather(*probes.values())
+    return dict(sorted(devices.items()))
+
+
+def _entry_data(info: dict[str, Any], model: str) -> dict[str, Any]:
+    """Build config entry data from validated device info."""
+    return {
+        CONF_HOST: info["host"],
+        CONF_MODEL: model,
+        CONF_HW_VERSION: info.get("hw_version", ""),
+    }
+
+
 class GaggiMateConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for GaggiMate."""
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> GaggiMateOptionsFlow:
+        """Return the options flow."""
+        return GaggiMateOptionsFlow()
+
     def __init__(self) -> None:
         """Initialize the config flow."""
         self.discovered_host: str | None = None
         self.discovered_info: dict[str, Any] = {}
+        self.discovered_devices: dict[str, dict[str, Any]] = {}
 
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
@@ -99,8 +219,7 @@ class GaggiMateConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             host = user_input[CONF_HOST]
             
             # Check if already configured
-            await self.async_set_unique_id(host)
-            self._abort_if_unique_id_configured()
+            await self._async_claim_host(host)
             
             try:
                 info = await validate_connection(self.hass, host)
@@ -112,13 +231,11 @@ class GaggiMateConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 _LOGGER.exception("Unexpected exception")
                 errors["base"] = "unknown"
 
-        # Try to discover device via mDNS
-        if self.discovered_host is None:
-            try:
-                self.discovered_host = socket.gethostbyname(MDNS_HOSTNAME)
-                _LOGGER.info("Discovered GaggiMate at %s", self.discovered_host)
-            except socket.gaierror:
-                _LOGGER.debug("Could not resolve %s via mDNS", MDNS_HOSTNAME)
+        # Discover devices via zeroconf the first time the form is shown
+        if user_input is None and not self.discovered_devices:
+            self.discovered_devices = await self._async_discover_devices()
+            if self.discovered_devices:
+                return await self.async_step_pick_devices()
 
         data_schema = vol.Schema(
             {
@@ -135,6 +252,126 @@ class GaggiMateConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors=errors,
         )
 
+    async def _async_discover_devices(self) -> dict[str, dict[str, Any]]:
+        """Find unconfigured devices and probe them concurrently."""
+        # Devices already announced through zeroconf discovery flows
+        announced = {
+            flow["context"]["host"]
+            for flow in self._async_in_progress(include_uninitialized=True)
+            if flow["context"].get("host")
+        }
+        # Entries may be configured by hostname while browsing finds addresses
+        configured = await async_resolve_addresses(
+            {unique_id for unique_id in self._async_current_ids() if unique_id}
+        )
+        try:
+            devices = await async_discover_devices(self.hass, announced, configured)
+        except Exception as err:  # noqa: BLE001
+            _LOGGER.debug("Zeroconf browsing failed: %s", err)
+            devices = {}
+        _LOGGER.info("Discovered %d GaggiMate device(s): %s", len(devices), ", ".join(devices))
+        if devices:
+            self.discovered_host = next(iter(devices))
+        return devices
+
+    async def _async_claim_host(self, host: str) -> None:
+        """Use ``host`` as unique ID, taking over zeroconf flows offering it."""
+        for flow in self._async_in_progress(include_uninitialized=True):
+            if flow["context"].get("unique_id") == host:
+                self.hass.config_entries.flow.async_abort(flow["flow_id"])
+        await self.async_set_unique_id(host, raise_on_progress=False)
+        self._abort_if_unique_id_configured()
+
+    async def async_step_pick_devices(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Let the user add one or several discovered devices."""
+        if user_input is not None:
+            selected = [
+                self.discovered_devices[host]
+                for host in user_input.get(CONF_DEVICES, [])
+                if host in self.discovered_devices
+            ]
+            # Release the probe connections of machines that were not picked
+            for host in self.discovered_devices.keys() - {info["host"] for info in selected}:
+                await async_discard_validated_connection(self.hass, host)
+            if not selected:
+                # Nothing picked, fall back to manual entry
+                return await self.async_step_user()
+
+            if len(selected) == 1:
+                info = selected[0]
+                await self._async_claim_host(info["host"])
+                self.discovered_info = info
+                return await self.async_step_confirm()
+
+            # Several machines share a model name, so tell them apart by host
+            models = [info["model"] for info in selected]
+            titles = [
+                model if models.count(model) == 1 else f"{model} {info['host']}"
+                for model, info in zip(models, selected)
+            ]
+
+            # The other machines get their own flows to confirm, this one keeps the first
+            for info, title in zip(selected[1:], titles[1:]):
+                self.hass.async_create_task(
+                    self.hass.config_entries.flow.async_init(
+                        DOMAIN,
+                        context={"source": config_entries.SOURCE_INTEGRATION_DISCOVERY},
+                        data={**info, "title": title},
+                    )
+                )
+
+            await self._async_claim_host(selected[0]["host"])
+            async_mark_submitted(self.hass, selected[0]["host"])
+            return self.async_create_entry(
+                title=titles[0],
+                data=_entry_data(selected[0], selected[0]["model"]),
+            )
+
+        options = {
+            host: f"{info['model']} ({host})"
+            for host, info in self.discovered_devices.items()
+        }
+        return self.async_show_form(
+            step_id="pick_devices",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(CONF_DEVICES, default=list(options)): cv.multi_select(options),
+                }
+            ),
+            description_placeholders={"count": str(len(options))},
+        )
+
+    async def async_step_integration_discovery(
+        self, discovery_info: dict[str, Any]
+    ) -> FlowResult:
+        """Confirm a device picked together with others in a user flow."""
+        await self._async_claim_host(discovery_info["host"])
+        self.discovered_info = discovery_info
+        self.context["title_placeholders"] = {"name": discovery_info["title"]}
+        return await self.async_step_confirm()
+
+    async def async_step_zeroconf(
+        self, discovery_info: ZeroconfServiceInfo
+    ) -> FlowResult:
+        """Handle a device announced via zeroconf."""
+        host = discovery_info.host
+        await self.async_set_unique_id(host)
+        self._abort_if_unique_id_configured()
+        self.context["host"] = host
+
+        # Nobody asked for this probe, so do not keep its connection open
+        try:
+            self.discovered_info = await validate_connection(
+                self.hass, host, DISCOVERY_PROBE_TIMEOUT, cache=False
+            )
+        except CannotConnect:
+            return self.async_abort(reason="cannot_connect")
+
+        self.context["title_placeholders"] = {"name": self.discovered_info["model"]}
+        return await self.async_step_confirm()
+
     async def async_step_confirm(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -142,14 +379,17 @@ class GaggiMateConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             # Use edited model name if provided
             model = user_input.get(CONF_MODEL, self.discovered_info.get("model"))
+            # Keep the title telling same-model machines apart unless renamed
+            title = (
+                self.discovered_info.get("title", model)
+                if model == self.discovered_info.get("model")
+                else model
+            )
             
+            async_mark_submitted(self.hass, self.discovered_info["host"])
             return self.async_create_entry(
-                title=model,
-                data={
-                    CONF_HOST: self.discovered_info["host"],
-                    CONF_MODEL: model,
-                    CONF_HW_VERSION: self.discovered_info.get("hw_version", ""),
-                },
+                title=title,
+                data=_entry_data(self.discovered_info, model),
             )
 
         # Show form with device information
@@ -174,5 +414,38 @@ class GaggiMateConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
 
+class GaggiMateOptionsFlow(config_entries.OptionsFlow):
+    """Handle GaggiMate options."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Configure sensor filtering and the memory budget."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        options = self.config_entry.options
+        fields: dict[Any, Any] = {}
+        for kind in FILTERED_SENSOR_KINDS:
+            deadband = f"{kind}_deadband"
+            step = f"{kind}_step"
+            fields[vol.Required(deadband, default=options.get(deadband, DEFAULT_DEADBANDS[kind]))] = vol.All(
+                vol.Coerce(float), vol.Range(min=0)
+            )
+            fields[vol.Required(step, default=options.get(step, DEFAULT_STEPS[kind]))] = vol.All(
+                vol.Coerce(float), vol.Range(min=0)
+            )
+        fields[vol.Required(
+            CONF_MAX_STALENESS,
+            default=options.get(CONF_MAX_STALENESS, DEFAULT_MAX_STALENESS),
+        )] = vol.All(vol.Coerce(int), vol.Range(min=10, max=3600))
+        fields[vol.Required(
+            CONF_MEMORY_BUDGET,
+            default=options.get(CONF_MEMORY_BUDGET, DEFAULT_MEMORY_BUDGET),
+        )] = vol.All(vol.Coerce(int), vol.Range(min=1, max=1024))
+
+        return self.async_show_form(step_id="init", data_schema=vol.Schema(fields))
+
+
 class CannotConnect(Exception):
     """Error to indicate we cannot connect."""
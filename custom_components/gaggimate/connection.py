@@ -0,0 +1,152 @@
+"""Short-lived cache of WebSocket connections validated by the config flow.
+
+The config flow has to open a WebSocket and ask for the OTA settings to
+identify a device. Instead of closing that connection and letting the
+coordinator open a new one seconds later, the flow leaves it here and the
+coordinator adopts it together with the OTA payload.
+
+Only flows the user started keep their connection; passive zeroconf
+discovery closes its probe straight away, so repeated announcements of a
+device nobody adds do not hold connections open.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+import aiohttp
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_call_later
+
+from .const import DOMAIN, VALIDATED_CONNECTION_TTL, WS_PATH
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_VALIDATED_CONNECTIONS = f"{DOMAIN}_validated_connections"
+
+
+@dataclass
+class ValidatedConnection:
+    """A WebSocket connection kept open after validating a device."""
+
+    host: str
+    ws: aiohttp.ClientWebSocketResponse
+    ota_data: dict[str, Any]
+    validated: float = field(default_factory=time.monotonic)
+    submitted: float | None = None
+    last_status: str | None = None
+    drain_task: asyncio.Task | None = None
+    cancel_expiry: CALLBACK_TYPE | None = None
+
+    @property
+    def status(self) -> dict[str, Any]:
+        """Return the last status frame received while cached."""
+        if self.last_status is None:
+            return {}
+        return json.loads(self.last_status)
+
+
+def _connections(hass: HomeAssistant) -> dict[str, ValidatedConnection]:
+    """Return the cache of validated connections keyed by host."""
+    return hass.data.setdefault(DATA_VALIDATED_CONNECTIONS, {})
+
+
+async def async_open_validated_connection(
+    hass: HomeAssistant, host: str, timeout: float, cache: bool = True
+) -> dict[str, Any]:
+    """Connect to a device and query its OTA settings.
+
+    The connection is cached for the coordinator if ``cache`` is set and
+    closed otherwise.
+    """
+    session = async_get_clientsession(hass)
+    ws = await session.ws_connect(f"ws://{host}{WS_PATH}", timeout=timeout, heartbeat=30)
+    last_status: str | None = None
+    try:
+        async with asyncio.timeout(timeout):
+            await ws.send_json({"tp": "req:ota-settings"})
+            async for msg in ws:
+                if msg.type == aiohttp.WSMsgType.TEXT:
+                    data = msg.json()
+                    if data.get("tp") == "evt:status":
+                        last_status = msg.data
+                    elif data.get("tp") == "res:ota-settings":
+                        ota_data = data
+                        break
+                elif msg.type == aiohttp.WSMsgType.ERROR:
+                    raise aiohttp.ClientError(f"WebSocket error: {ws.exception()}")
+            else:
+                raise aiohttp.ClientError("Connection closed before OTA settings were received")
+    except BaseException:
+        await ws.close()
+        raise
+
+    if not cache:
+        await ws.close()
+        return ota_data
+
+    await async_discard_validated_connection(hass, host)
+    connection = ValidatedConnection(host, ws, ota_data, last_status=last_status)
+    connection.drain_task = hass.async_create_background_task(
+        _async_drain(connection), f"{DOMAIN} validated connection {host}"
+    )
+
+    @callback
+    def _expire(_now: Any) -> None:
+        connection.cancel_expiry = None
+        hass.async_create_task(async_discard_validated_connection(hass, host))
+
+    connection.cancel_expiry = async_call_later(hass, VALIDATED_CONNECTION_TTL, _expire)
+    _connections(hass)[host] = connection
+    return ota_data
+
+
+async def _async_drain(connection: ValidatedConnection) -> None:
+    """Keep reading so heartbeats are answered, remembering the latest status."""
+    async for msg in connection.ws:
+        if msg.type == aiohttp.WSMsgType.TEXT and '"evt:status"' in msg.data:
+            connection.last_status = msg.data
+        elif msg.type == aiohttp.WSMsgType.ERROR:
+            break
+
+
+@callback
+def async_mark_submitted(hass: HomeAssistant, host: str) -> None:
+    """Record the moment the user finished the config flow for a host."""
+    connection = _connections(hass).get(host)
+    if connection is not None:
+        connection.submitted = time.monotonic()
+
+
+async def async_pop_validated_connection(
+    hass: HomeAssistant, host: str
+) -> ValidatedConnection | None:
+    """Take over the cached connection for a host, if it is still usable."""
+    connection = _connections(hass).pop(host, None)
+    if connection is None:
+        return None
+
+    if connection.cancel_expiry is not None:
+        connection.cancel_expiry()
+    if connection.drain_task is not None:
+        # The new owner must be the only reader of the WebSocket
+        connection.drain_task.cancel()
+        await asyncio.wait([connection.drain_task])
+
+    if connection.ws.closed:
+        return None
+    return connection
+
+
+async def async_discard_validated_connection(hass: HomeAssistant, host: str) -> None:
+    """Close and forget the cached connection for a host."""
+    connection = await async_pop_validated_connection(hass, host)
+    if connection is not None:
+        _LOGGER.debug("Closing unused validation connection to %s", host)
+        await connection.ws.close()
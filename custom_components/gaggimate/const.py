@@ -6,13 +6,98 @@ DEFAULT_NAME = "GaggiMate"
 # mDNS hostname
 MDNS_HOSTNAME = "gaggimate.local"
 
+# Discovery
+ZEROCONF_TYPE = "_http._tcp.local."
+ZEROCONF_NAME_PREFIX = "gaggimate"
+DISCOVERY_BROWSE_TIME = 3  # seconds spent browsing for devices
+DISCOVERY_PROBE_TIMEOUT = 5  # seconds allowed for each candidate to answer
+DISCOVERY_RESOLVE_TIMEOUT = 1  # seconds allowed to resolve a configured hostname
+
 # WebSocket configuration
 WS_PATH = "/ws"
 WS_TIMEOUT = 10
 RECONNECT_INTERVAL = 30
+RECONNECT_JITTER = 0.2  # ±20% so a fleet dropped together does not reconnect in lockstep
+VALIDATED_CONNECTION_TTL = 120  # seconds a config flow connection waits to be adopted
 
 # Update intervals
 OTA_REFRESH_INTERVAL = 900  # 15 minutes
+OTA_REFRESH_JITTER = 0.1  # ±10% so a fleet does not query in lockstep
+OTA_PROGRESS_INTERVAL = 2  # seconds between refreshes while updating
+OTA_PROGRESS_GRACE = 60  # seconds of fast refresh after starting an update
+
+# Shot recording
+SHOT_START_PRESSURE = 1.0  # bar
+SHOT_START_FLOW = 0.3  # ml/s
+SHOT_STOP_PRESSURE = 0.5  # bar, a running shot is idle below both stop thresholds
+SHOT_STOP_FLOW = 0.1  # ml/s
+SHOT_END_DELAY = 2.0  # seconds below the stop thresholds before a shot is closed
+SHOT_MIN_DURATION = 5.0  # seconds, shorter shots are discarded
+MAX_STORED_SHOTS = 100
+SHOTS_SAVE_DELAY = 10  # seconds
+PREINFUSION_END_PRESSURE = 4.0  # bar, pre-infusion ends when pressure first reaches this
+SHOT_SENSOR_INTERVAL = 1.0  # seconds between shot timer state writes during a shot
+
+# Shot lifecycle events
+EVENT_SHOT_STARTED = f"{DOMAIN}_shot_started"
+EVENT_SHOT_PHASE_CHANGED = f"{DOMAIN}_shot_phase_changed"
+EVENT_SHOT_FINISHED = f"{DOMAIN}_shot_finished"
+PHASE_PREINFUSION = "preinfusion"
+PHASE_EXTRACTION = "extraction"
+
+# Reference shot comparison
+REFERENCE_CHANNELS = ("pr", "fl", "cw")
+REFERENCE_WINDOW = 30  # reference samples searched either side of the last match
+
+# Preheat scheduling
+PREHEAT_MIN_RISE = 5.0  # °C below target for leaving Standby to count as a warm-up
+PREHEAT_TOLERANCE = 0.5  # °C below target at which a warm-up is complete
+PREHEAT_SAMPLE_INTERVAL = 2.0  # seconds between recorded warm-up samples
+PREHEAT_MAX_DURATION = 3600  # seconds before a warm-up is abandoned
+PREHEAT_WARMUPS = 20  # recorded warm-ups kept per device
+PREHEAT_MARGIN = 120  # seconds of safety margin added to predicted warm-ups
+
+# Downsampled retrieval
+DOWNSAMPLE_POINTS = 500  # default points per returned series
+DOWNSAMPLE_CACHE_SIZE = 32  # downsampled shots kept in memory
+HISTORY_HOURS = 24  # default history window
+
+# Analytics jobs
+ANALYTICS_WORKERS = 2  # concurrent analytics jobs per device
+
+# Shot trends
+MAX_SHOT_SUMMARIES = 5000  # per-shot summaries kept for trend analytics
+TRENDS_DAYS = 30  # default trend window
+TRENDS_SENSOR_DAYS = 7  # window of the trend sensors
+
+# Long-term statistics
+STATISTICS_MAX_GAP = 10  # seconds between frames still counted as connected time
+
+# Storage
+STORAGE_VERSION = 1
+
+# Metrics
+METRICS_WINDOW = 1000  # recent samples kept per timing histogram
+METRICS_SENSOR_INTERVAL = 10  # seconds between diagnostic sensor state writes
+RECENT_FRAMES = 100  # raw frames kept for diagnostics
+CONNECTION_HISTORY = 20  # connection events kept for diagnostics
+COMMAND_EFFECT_TIMEOUT = 10  # seconds for a command to show up in status frames
+RECIPE_TIMEOUT = 10  # seconds to wait for a recipe to show up in status frames
+
+# Memory accounting
+CONF_MEMORY_BUDGET = "memory_budget"
+DEFAULT_MEMORY_BUDGET = 32  # MiB per device
+MEMORY_CHECK_INTERVAL = 300  # seconds between memory checks
+TRANSIENT_KEYS = ("tp", "rid")  # message keys not merged into device data
+
+# Live telemetry subscriptions
+TELEMETRY_CHANNELS = ("ct", "tt", "pr", "pt", "fl", "cw", "tw", "m", "shot")
+TELEMETRY_DEFAULT_CHANNELS = ("ct", "pr", "fl", "cw")
+TELEMETRY_INTERVAL = 0.25  # seconds between batches
+
+# Traffic capture
+CAPTURE_DIR = "gaggimate_captures"  # relative to the config directory
+CAPTURE_FLUSH_INTERVAL = 5  # seconds
 
 # API paths
 API_SETTINGS_PATH = "/api/settings"
@@ -37,6 +122,18 @@ MODE_MAP = {
 
 MODE_REVERSE_MAP = {v: k for k, v in MODE_MAP.items()}
 
+# Modes in which the periodic OTA refresh is postponed. Brew mode is the
+# idle-ready mode, so there the refresh only waits for a shot in progress.
+OTA_BUSY_MODES = (MODE_STEAM, MODE_WATER)
+
 # Config entry keys
 CONF_MODEL = "model"
 CONF_HW_VERSION = "hw_version"
+
+# Options: sensor write filtering, set per sensor kind as
+# "<kind>_deadband" (minimum change to write) and "<kind>_step" (rounding)
+CONF_MAX_STALENESS = "max_staleness"
+FILTERED_SENSOR_KINDS = ("temperature", "pressure", "weight", "flow")
+DEFAULT_DEADBANDS = {"temperature": 0.2, "pressure": 0.05, "weight": 0.2, "flow": 0.05}
+DEFAULT_STEPS = {"temperature": 0.1, "pressure": 0.01, "weight": 0.1, "flow": 0.01}
+DEFAULT_MAX_STALENESS = 300  # seconds before a changed value is written regardless
@@ -2,42 +2,127 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
+import math
+import random
+import time
 import uuid
-from datetime import timedelta
+from datetime import datetime, timedelta
+from collections.abc import Callable
+from pathlib import Path
 from typing import Any
 
 import aiohttp
 
-from homeassistant.core import HomeAssistant
+from homeassistant.components.recorder import get_instance
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import device_registry as dr, entity_registry as er
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_call_later, async_track_point_in_utc_time
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
 from .const import (
     DOMAIN,
     WS_PATH,
     WS_TIMEOUT,
     RECONNECT_INTERVAL,
+    RECONNECT_JITTER,
     OTA_REFRESH_INTERVAL,
+    OTA_REFRESH_JITTER,
+    OTA_PROGRESS_INTERVAL,
+    OTA_PROGRESS_GRACE,
+    OTA_BUSY_MODES,
     API_SETTINGS_PATH,
+    MODE_BREW,
+    MODE_STANDBY,
+    PREHEAT_MARGIN,
+    RECIPE_TIMEOUT,
+    DEFAULT_MEMORY_BUDGET,
+    TRANSIENT_KEYS,
 )
+from .aggregates import StatisticsAggregator
+from .capture import DIRECTION_IN, DIRECTION_OUT, FrameCapture
+from .connection import async_pop_validated_connection
+from .history import HISTORY_SENSORS, load_history
+from .jobs import PRIORITY_INTERACTIVE, AnalyticsScheduler
+from .memory import MemoryBudget
+from .metrics import CoordinatorMetrics
+from .preheat import PreheatModel
+from .profiles import find_profile, profile_content, profile_hash
+from .shots import ShotRecorder
+from .simulator import run_simulation
+from .trends import ShotTrends
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def find_coordinator(hass: HomeAssistant, device_id: str) -> GaggiMateCoordinator | None:
+    """Find the coordinator for a device slug or config entry ID."""
+    for config_entry in hass.config_entries.async_entries(DOMAIN):
+        if config_entry.entry_id in device_id or device_id in config_entry.title.lower().replace(" ", "_"):
+            return config_entry.runtime_data
+    return None
+
+
+def _strip_transient(data: dict[str, Any]) -> dict[str, Any]:
+    """Return message data without the keys that only describe the message."""
+    return {key: value for key, value in data.items() if key not in TRANSIENT_KEYS}
+
+
+def get_coordinator(hass: HomeAssistant, device_id: str) -> GaggiMateCoordinator:
+    """Find the coordinator for a device, raising if it is not loaded."""
+    coordinator = find_coordinator(hass, device_id)
+    if coordinator is None:
+        raise HomeAssistantError(f"GaggiMate device {device_id} not found")
+    return coordinator
+
+
 class GaggiMateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
     """Class to manage fetching GaggiMate data via WebSocket."""
 
-    def __init__(self, hass: HomeAssistant, host: str) -> None:
+    def __init__(self, hass: HomeAssistant, host: str, entry_id: str) -> None:
         """Initialize."""
         self.host = host
+        self.entry_id = entry_id
         self.ws_url = f"ws://{host}{WS_PATH}"
         self._ws: aiohttp.ClientWebSocketResponse | None = None
         self._session: aiohttp.ClientSession | None = None
         self._reconnect_task: asyncio.Task | None = None
         self._ota_refresh_task: asyncio.Task | None = None
         self._profiles: list[dict[str, Any]] = []
+        self._profile_hashes: dict[str, str] = {}
         self._ota_data: dict[str, Any] = {}
+        self._ota_refresh_wakeup = asyncio.Event()
+        self._ota_refresh_deferred = False
+        self._ota_fast_refresh_until = 0.0
+        self._pending_requests: dict[str, asyncio.Future[dict[str, Any]]] = {}
+        self.analytics = AnalyticsScheduler(hass, entry_id)
+        self.shot_recorder = ShotRecorder(hass, entry_id, self.analytics)
+        self.statistics = StatisticsAggregator(hass, entry_id)
+        self.shot_recorder.async_add_shot_listener(self.statistics.add_shot)
+        self.trends = ShotTrends(hass, entry_id, self.analytics)
+        self.shot_recorder.async_add_shot_listener(self.trends.add_shot)
+        self.preheat = PreheatModel(hass, entry_id, self.analytics)
+        # Analytics fed every merged status frame
+        self._status_hooks: tuple[Callable[[dict[str, Any], float], None], ...] = (
+            self.shot_recorder.process_status,
+            self.statistics.process_status,
+            self.preheat.process_status,
+        )
+        self._cancel_preheat: CALLBACK_TYPE | None = None
+        self.preheat_schedule: dict[str, Any] | None = None
+        self._setup_started = time.monotonic()
+        self.setup_latency: float | None = None
+        self.reused_validation_connection = False
+        self._capture: FrameCapture | None = None
+        self.metrics = CoordinatorMetrics()
+        self.memory = MemoryBudget(DEFAULT_MEMORY_BUDGET * 1024 * 1024)
+        self._cancel_capture_timer: CALLBACK_TYPE | None = None
+        self._telemetry_listeners: list[Callable[[float, dict[str, Any]], None]] = []
+        self._status_waiters: list[tuple[Callable[[dict[str, Any]], bool], asyncio.Future[None]]] = []
         
         super().__init__(
             hass,
@@ -51,6 +136,11 @@ class GaggiMateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         """Return cached profiles list."""
         return self._profiles
 
+    @property
+    def profile_hashes(self) -> dict[str, str]:
+        """Return content hashes of cached profiles keyed by profile ID."""
+        return self._profile_hashes
+
     @property
     def ota_data(self) -> dict[str, Any]:
         """Return OTA settings data."""
@@ -70,6 +160,22 @@ class GaggiMateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         if self._session is None:
             self._session = async_get_clientsession(self.hass)
         
+        # Adopt the connection the config flow left open, along with its OTA data
+        validated = await async_pop_validated_connection(self.hass, self.host)
+        if validated is not None:
+            _LOGGER.debug("Reusing validated WebSocket connection to %s", self.host)
+            self._ws = validated.ws
+            self._ota_data = _strip_transient(validated.ota_data)
+            if self.data is None:
+                self.data = _strip_transient(validated.status)
+            self._setup_started = validated.submitted or validated.validated
+            self.reused_validation_connection = True
+            self.metrics.record_connection("connected", reused=True)
+            self.hass.async_create_task(self._listen_websocket())
+            self._start_ota_refresh()
+            _LOGGER.info("Connected to GaggiMate WebSocket at %s", self.host)
+            return
+        
         try:
             _LOGGER.debug("Connecting to WebSocket at %s", self.ws_url)
             self._ws = await self._session.ws_connect(
@@ -77,6 +183,7 @@ class GaggiMateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
                 timeout=WS_TIMEOUT,
                 heartbeat=30,
             )
+            self.metrics.record_connection("connected")
             
             # Start listening for messages
             self.hass.async_create_task(self._listen_websocket())
@@ -89,6 +196,7 @@ class GaggiMateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             
             _LOGGER.info("Connected to GaggiMate WebSocket at %s", self.host)
         except Exception as err:
+            self.metrics.record_connection("connect_failed", error=str(err))
             _LOGGER.error("Error connecting to WebSocket: %s", err)
             raise UpdateFailed(f"Error connecting to WebSocket: {err}") from err
 
@@ -97,42 +205,28 @@ class GaggiMateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         if self._ws is None:
             return
         
+        reason: str | None = None
         try:
             async for msg in self._ws:
                 if msg.type == aiohttp.WSMsgType.TEXT:
-                    try:
-                        data = msg.json()
-                        msg_type = data.get("tp")
-                        _LOGGER.debug("Received WebSocket message type %s: %s", msg_type, data)
-                        
-                        if msg_type == "evt:status":
-                            # Status update - merge with existing data
-                            current_data = self.data or {}
-                            updated_data = {**current_data, **data}
-                            self.async_set_updated_data(updated_data)
-                        
-                        elif msg_type == "res:ota-settings":
-                            # OTA settings response
-                            self._ota_data = data
-                            # Merge with current data
-                            current_data = self.data or {}
-                            updated_data = {**current_data, **data}
-                            self.async_set_updated_data(updated_data)
-                        
-                        elif msg_type == "res:profiles:list":
-                            # Profiles list response
-                            self._profiles = data.get("profiles", [])
-                            _LOGGER.info("Updated profiles list: %d profiles available", len(self._profiles))
-                            _LOGGER.debug("Profile details: %s", self._profiles)
-                        
-                    except Exception as err:
-                        _LOGGER.error("Error parsing WebSocket message: %s", err)
+                    self.process_frame(msg.data)
                 elif msg.type == aiohttp.WSMsgType.ERROR:
-                    _LOGGER.error("WebSocket error: %s", self._ws.exception())
+                    reason = str(self._ws.exception())
+                    _LOGGER.error("WebSocket error: %s", reason)
                     break
         except Exception as err:
+            reason = str(err)
             _LOGGER.error("WebSocket connection lost: %s", err)
         finally:
+            self.metrics.record_connection(
+                "disconnected", reason=reason, close_code=self._ws.close_code
+            )
+            
+            # Fail any requests still waiting for a response
+            for future in self._pending_requests.values():
+                if not future.done():
+                    future.set_exception(UpdateFailed("WebSocket connection lost"))
+            
             # Stop OTA refresh task
             if self._ota_refresh_task is not None:
                 self._ota_refresh_task.cancel()
@@ -142,6 +236,94 @@ class GaggiMateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
                 await self._ws.close()
             self._schedule_reconnect()
 
+    def process_frame(self, raw: str, received: float | None = None) -> None:
+        """Handle one text frame received from the device.
+
+        ``received`` is the monotonic receive time; replays pass the
+        captured time so shot timing is preserved at any replay speed.
+        """
+        if self._capture is not None:
+            self._capture.record(DIRECTION_IN, raw)
+        
+        metrics = self.metrics
+        metrics.record_frame(DIRECTION_IN, raw)
+        metrics.bytes_received += len(raw)
+        try:
+            started = time.perf_counter()
+            data = json.loads(raw)
+            decoded = time.perf_counter()
+            metrics.decode.add(decoded - started)
+            msg_type = data.get("tp")
+            metrics.frames[msg_type] += 1
+            _LOGGER.debug("Received WebSocket message type %s: %s", msg_type, data)
+            
+            if msg_type == "evt:status":
+                # Status update - merge with existing data
+                current_data = self.data or {}
+                updated_data = {**current_data, **_strip_transient(data)}
+                now = time.monotonic() if received is None else received
+                for hook in self._status_hooks:
+                    # A failing analytics hook must not drop the status update
+                    try:
+                        hook(updated_data, now)
+                    except Exception:  # noqa: BLE001
+                        _LOGGER.exception("Error processing status frame in %s", hook.__qualname__)
+                metrics.observe_status(data)
+                for satisfied, future in self._status_waiters:
+                    if future.done():
+                        continue
+                    # A failing check fails its own waiter, not the update
+                    try:
+                        if satisfied(updated_data):
+                            future.set_result(None)
+                    except Exception as err:  # noqa: BLE001
+                        future.set_exception(err)
+                if self._telemetry_listeners:
+                    sampled = time.time()
+                    for listener in list(self._telemetry_listeners):
+                        # Nor may one failing websocket subscriber
+                        try:
+                            listener(sampled, updated_data)
+                        except Exception:  # noqa: BLE001
+                            _LOGGER.exception("Error in telemetry listener %s", listener)
+                self.async_set_updated_data(updated_data)
+                
+                # Run a postponed OTA refresh once the machine is idle
+                if self._ota_refresh_deferred and not self._machine_busy(updated_data):
+                    self._ota_refresh_wakeup.set()
+            
+            elif msg_type == "res:ota-settings":
+                # OTA settings response
+                ota_data = _strip_transient(data)
+                if ota_data == self._ota_data:
+                    _LOGGER.debug("OTA settings unchanged, skipping entity update")
+                else:
+                    self._ota_data = ota_data
+                    # Merge with current data
+                    current_data = self.data or {}
+                    updated_data = {**current_data, **ota_data}
+                    self.async_set_updated_data(updated_data)
+            
+            elif msg_type == "res:profiles:list":
+                # Profiles list response
+                profiles = data.get("profiles", [])
+                changed = profiles != self._profiles
+                self._set_profiles(profiles)
+                if changed:
+                    # Let entities and snapshot subscribers see the new catalogue
+                    self.async_update_listeners()
+                _LOGGER.info("Updated profiles list: %d profiles available", len(self._profiles))
+                _LOGGER.debug("Profile details: %s", self._profiles)
+            
+            # Resolve any request waiting for this response
+            future = self._pending_requests.get(data.get("rid"))
+            if future is not None and not future.done():
+                future.set_result(data)
+            
+            metrics.dispatch.add(time.perf_counter() - decoded)
+        except Exception as err:
+            _LOGGER.error("Error parsing WebSocket message: %s", err)
+
     def _schedule_reconnect(self) -> None:
         """Schedule a reconnection attempt."""
         if self._reconnect_task is not None and not self._reconnect_task.done():
@@ -149,7 +331,9 @@ class GaggiMateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         
         async def reconnect() -> None:
             _LOGGER.info("Attempting to reconnect to GaggiMate at %s", self.host)
-            await asyncio.sleep(RECONNECT_INTERVAL)
+            await asyncio.sleep(
+                RECONNECT_INTERVAL * random.uniform(1 - RECONNECT_JITTER, 1 + RECONNECT_JITTER)
+            )
             try:
                 await self._connect_websocket()
                 _LOGGER.info("Successfully reconnected to GaggiMate at %s", self.host)
@@ -160,20 +344,55 @@ class GaggiMateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         self._reconnect_task = self.hass.async_create_task(reconnect())
 
     def _start_ota_refresh(self) -> None:
-        """Start periodic OTA settings refresh."""
+        """Start periodic OTA settings refresh.
+
+        Refreshes are postponed while the machine is brewing, steaming or
+        dispensing water, and run every few seconds while an update is in
+        progress so the update entities can follow the progress.
+        """
         if self._ota_refresh_task is not None and not self._ota_refresh_task.done():
             return
         
         async def refresh_ota() -> None:
+            # Start at a random point of the interval to spread a fleet out
+            delay = random.uniform(0, OTA_REFRESH_INTERVAL)
             while True:
-                await asyncio.sleep(OTA_REFRESH_INTERVAL)
+                try:
+                    await asyncio.wait_for(self._ota_refresh_wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                self._ota_refresh_wakeup.clear()
+                
+                fast = self._ota_fast_refresh_active()
+                if not fast and self._machine_busy(self.data or {}):
+                    _LOGGER.debug("Machine busy, postponing OTA settings refresh")
+                    self._ota_refresh_deferred = True
+                    delay = OTA_REFRESH_INTERVAL
+                    continue
+                
+                self._ota_refresh_deferred = False
                 try:
                     await self._request_ota_settings()
                 except Exception as err:
                     _LOGGER.error("Error refreshing OTA settings: %s", err)
+                
+                if fast:
+                    delay = OTA_PROGRESS_INTERVAL
+                else:
+                    delay = OTA_REFRESH_INTERVAL * random.uniform(
+                        1 - OTA_REFRESH_JITTER, 1 + OTA_REFRESH_JITTER
+                    )
         
         self._ota_refresh_task = self.hass.async_create_task(refresh_ota())
 
+    def _machine_busy(self, data: dict[str, Any]) -> bool:
+        """Return true while a shot is pulled or steam or water is dispensed."""
+        return self.shot_recorder.recording or data.get("m") in OTA_BUSY_MODES
+
+    def _ota_fast_refresh_active(self) -> bool:
+        """Return true while update progress should be tracked at full rate."""
+        return bool(self._ota_data.get("updating")) or time.monotonic() < self._ota_fast_refresh_until
+
     async def _request_ota_settings(self) -> None:
         """Request OTA settings from device."""
         await self.send_command({"tp": "req:ota-settings"})
@@ -185,15 +404,170 @@ class GaggiMateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         
         if self._ws is not None and not self._ws.closed:
             try:
+                raw = json.dumps(command)
                 await asyncio.wait_for(
-                    self._ws.send_json(command),
+                    self._ws.send_str(raw),
                     timeout=WS_TIMEOUT
                 )
+                if self._capture is not None:
+                    self._capture.record(DIRECTION_OUT, raw)
+                self.metrics.record_frame(DIRECTION_OUT, raw)
+                self.metrics.commands[command.get("tp")] += 1
                 _LOGGER.debug("Sent command: %s", command)
             except Exception as err:
+                self.metrics.send_failures += 1
                 _LOGGER.error("Error sending command: %s", err)
                 raise UpdateFailed(f"Error sending command: {err}") from err
 
+    async def async_request(
+        self, command: dict[str, Any], timeout: float = WS_TIMEOUT
+    ) -> dict[str, Any]:
+        """Send a command and wait for the response carrying the same request ID."""
+        rid = str(uuid.uuid4())
+        future: asyncio.Future[dict[str, Any]] = self.hass.loop.create_future()
+        self._pending_requests[rid] = future
+        try:
+            await self.send_command({**command, "rid": rid})
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError as err:
+            raise UpdateFailed(f"No response to {command.get('tp')} within {timeout}s") from err
+        finally:
+            self._pending_requests.pop(rid, None)
+
+    def _set_profiles(self, profiles: list[dict[str, Any]]) -> None:
+        """Store the profiles list and its content hashes."""
+        self._profiles = profiles
+        self._profile_hashes = {profile.get("id"): profile_hash(profile) for profile in profiles}
+
+    async def async_fetch_profiles(self) -> list[dict[str, Any]]:
+        """Fetch the full profiles list and wait for the response."""
+        response = await self.async_request({"tp": "req:profiles:list"})
+        return response.get("profiles", [])
+
+    async def async_save_profile(self, profile: dict[str, Any]) -> dict[str, Any]:
+        """Save a profile on the device, creating it if the ID is unknown."""
+        response = await self.async_request(
+            {"tp": "req:profiles:save", "profile": profile_content(profile)}
+        )
+        return response.get("profile", profile)
+
+    async def async_import_profiles(
+        self, profiles: list[dict[str, Any]]
+    ) -> dict[str, list[str]]:
+        """Push profiles to the device, transferring only those whose content differs."""
+        await self.async_fetch_profiles()
+        result: dict[str, list[str]] = {"saved": [], "unchanged": [], "failed": []}
+
+        for profile in profiles:
+            label = profile.get("label", profile.get("id") or "Unknown")
+            # IDs differ between machines, so the device's profile of the
+            # same name is the one to compare with and update in place;
+            # without one the device assigns a new ID
+            existing = next(
+                (p for p in self._profiles if "label" in profile and p.get("label") == label),
+                None,
+            )
+            existing_id = existing.get("id") if existing is not None else None
+            if existing is not None and self._profile_hashes.get(existing_id) == profile_hash(profile):
+                result["unchanged"].append(label)
+                continue
+            content = {k: v for k, v in profile.items() if k != "id"}
+            if existing_id is not None:
+                content["id"] = existing_id
+            try:
+                await self.async_save_profile(content)
+                result["saved"].append(label)
+            except Exception as err:  # noqa: BLE001
+                _LOGGER.error("Error saving profile %s to %s: %s", label, self.host, err)
+                result["failed"].append(label)
+
+        if result["saved"]:
+            # Refresh the cached list so hashes reflect the new content
+            await self.async_fetch_profiles()
+
+        _LOGGER.info(
+            "Imported profiles to %s: %d saved, %d unchanged, %d failed",
+            self.host, len(result["saved"]), len(result["unchanged"]), len(result["failed"]),
+        )
+        return result
+
+    def _find_shot(self, shot_id: str | None) -> dict[str, Any]:
+        """Return a recorded shot, the latest by default."""
+        recorder = self.shot_recorder
+        if shot_id is None:
+            if not recorder.shots:
+                raise HomeAssistantError("No shots have been recorded yet")
+            return recorder.shots[-1]
+        shot = recorder.get_shot(shot_id)
+        if shot is None:
+            raise HomeAssistantError(f"Shot {shot_id} not found")
+        return shot
+
+    async def async_get_shot(self, shot_id: str | None, points: int) -> dict[str, Any]:
+        """Return a recorded shot downsampled to ``points``, the latest by default."""
+        return await self.shot_recorder.async_get_downsampled(self._find_shot(shot_id), points)
+
+    @callback
+    def async_set_reference_shot(self, shot_id: str | None) -> dict[str, Any]:
+        """Make a recorded shot, the latest by default, the reference for its profile."""
+        shot = self._find_shot(shot_id)
+        self.shot_recorder.set_reference(shot)
+        return {"profile": shot["profile"], "shot_id": shot["id"], "started": shot["started"]}
+
+    async def async_get_history(
+        self, start: datetime, end: datetime, channels: list[str], points: int
+    ) -> dict[str, Any]:
+        """Return recorded sensor history downsampled to ``points`` per channel."""
+        if "recorder" not in self.hass.config.components:
+            raise HomeAssistantError("The recorder integration is not loaded")
+        registry = er.async_get(self.hass)
+        entity_ids = {}
+        for channel in channels:
+            entity_id = registry.async_get_entity_id(
+                "sensor", DOMAIN, f"{self.entry_id}_{HISTORY_SENSORS[channel]}"
+            )
+            if entity_id is not None:
+                entity_ids[channel] = entity_id
+        
+        series = await get_instance(self.hass).async_add_executor_job(
+            load_history, self.hass, start, end, entity_ids, points
+        )
+        return {"start": start.isoformat(), "end": end.isoformat(), "channels": series}
+
+    async def async_simulate_shot(
+        self,
+        profile_key: str | None = None,
+        variants: list[dict[str, Any]] | None = None,
+        target_weight: float | None = None,
+    ) -> dict[str, Any]:
+        """Simulate a profile using a model fitted to its recorded shots."""
+        profile_key = profile_key or (self.data or {}).get("p")
+        profile = find_profile(self._profiles, profile_key) if profile_key else None
+        if profile is None:
+            raise HomeAssistantError(f"Profile {profile_key} not found")
+
+        shots = self.shot_recorder.shots_for_profile(profile.get("label"))
+        start = time.perf_counter()
+        try:
+            result = await self.analytics.async_run(
+                "simulate_shot",
+                run_simulation,
+                profile,
+                shots,
+                variants,
+                target_weight,
+                priority=PRIORITY_INTERACTIVE,
+                key=json.dumps([profile.get("label"), len(shots), variants, target_weight], sort_keys=True),
+            )
+        except ValueError as err:
+            raise HomeAssistantError(f"Cannot simulate profile {profile_key}: {err}") from err
+
+        return {
+            "profile": profile.get("label"),
+            **result,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+
     async def request_profiles_list(self) -> None:
         """Request profiles list from device."""
         rid = str(uuid.uuid4())
@@ -203,15 +577,26 @@ class GaggiMateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         """Select a profile by ID."""
         rid = str(uuid.uuid4())
         await self.send_command({"tp": "req:profiles:select", "id": profile_id, "rid": rid})
+        label = next((p.get("label") for p in self._profiles if p.get("id") == profile_id), None)
+        if label is not None:
+            self._expect_effect("select_profile", "p", lambda value: value == label)
 
     async def change_mode(self, mode: int) -> None:
         """Change device mode."""
         await self.send_command({"tp": "req:change-mode", "mode": mode})
+        self._expect_effect("change_mode", "m", lambda value: value == mode)
+
+    def _expect_effect(self, command: str, key: str, check: Callable[[Any], bool]) -> None:
+        """Time a command until a status frame shows its effect on ``key``."""
+        self.metrics.expect_effect(command, key, check, (self.data or {}).get(key))
 
     async def start_ota_update(self) -> None:
         """Start OTA update."""
         rid = str(uuid.uuid4())
         await self.send_command({"tp": "req:ota-start", "rid": rid})
+        # Follow the update progress straight away
+        self._ota_fast_refresh_until = time.monotonic() + OTA_PROGRESS_GRACE
+        self._ota_refresh_wakeup.set()
 
     async def scan_scales(self) -> bool:
         """Trigger Bluetooth scale scan via HTTP."""
@@ -251,20 +636,50 @@ class GaggiMateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             current_int, target_int, abs(steps), command,
         )
 
+        self._expect_effect(
+            "set_target_temperature", "tt", lambda value: round(value) == target_int
+        )
         for _ in range(abs(steps)):
             await self.send_command({"tp": command})
             await asyncio.sleep(0.05)  # Small delay to avoid flooding the device
 
+    async def _async_post_settings(self, settings: dict[str, Any]) -> bool:
+        """Post settings to the HTTP API, returning whether the device accepted them."""
+        # Start timing before the request, a status frame may reflect the
+        # change before the response arrives
+        commands = []
+        if "targetPressure" in settings:
+            pressure = settings["targetPressure"]
+            commands.append("set_target_pressure")
+            self._expect_effect(
+                "set_target_pressure", "pt",
+                lambda value: math.isclose(value, pressure, abs_tol=0.05),
+            )
+        if "targetWeight" in settings:
+            weight = settings["targetWeight"]
+            commands.append("set_target_weight")
+            self._expect_effect(
+                "set_target_weight", "tw",
+                lambda value: math.isclose(value, weight, abs_tol=0.05),
+            )
+        url = f"http://{self.host}{API_SETTINGS_PATH}"
+        accepted = False
+        try:
+            async with self._session.post(url, json=settings, timeout=10) as response:
+                accepted = response.status == 200
+                if not accepted:
+                    _LOGGER.error("Failed to set %s: HTTP %s", ", ".join(settings), response.status)
+        finally:
+            if not accepted:
+                for command in commands:
+                    self.metrics.discard_effect(command)
+        return accepted
+
     async def set_target_pressure(self, pressure: float) -> None:
         """Set target pressure via HTTP API."""
         try:
-            url = f"http://{self.host}{API_SETTINGS_PATH}"
-            data = {"targetPressure": pressure}
-            async with self._session.post(url, json=data, timeout=10) as response:
-                if response.status == 200:
-                    _LOGGER.debug("Set target pressure to %.2f bar", pressure)
-                else:
-                    _LOGGER.error("Failed to set target pressure: HTTP %s", response.status)
+            if await self._async_post_settings({"targetPressure": pressure}):
+                _LOGGER.debug("Set target pressure to %.2f bar", pressure)
         except Exception as err:
             _LOGGER.error("Error setting target pressure: %s", err)
             raise
@@ -272,27 +687,297 @@ class GaggiMateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
     async def set_target_weight(self, weight: float) -> None:
         """Set target weight via HTTP API."""
         try:
-            url = f"http://{self.host}{API_SETTINGS_PATH}"
-            data = {"targetWeight": weight}
-            async with self._session.post(url, json=data, timeout=10) as response:
-                if response.status == 200:
-                    _LOGGER.debug("Set target weight to %.1fg", weight)
-                else:
-                    _LOGGER.error("Failed to set target weight: HTTP %s", response.status)
+            if await self._async_post_settings({"targetWeight": weight}):
+                _LOGGER.debug("Set target weight to %.1fg", weight)
         except Exception as err:
             _LOGGER.error("Error setting target weight: %s", err)
             raise
 
+    async def async_apply_recipe(
+        self,
+        profile: str | None = None,
+        temperature: float | None = None,
+        pressure: float | None = None,
+        weight: float | None = None,
+        mode: int | None = None,
+        timeout: float = RECIPE_TIMEOUT,
+    ) -> dict[str, Any]:
+        """Apply a profile, targets and mode in as few round trips as possible.
+
+        Selecting a profile resets the device's targets, so it is sent with
+        the mode change and confirmed first. The temperature steps over the
+        WebSocket and a single settings request for pressure and weight then
+        run concurrently. Returns the elapsed time and the fields that did
+        not show up in status frames within ``timeout``.
+        """
+        started = time.perf_counter()
+        data = self.data or {}
+        checks: dict[str, tuple[str, Callable[[Any], bool]]] = {}
+        errors: dict[str, str] = {}
+
+        selection = []
+        if profile is not None:
+            found = find_profile(self._profiles, profile)
+            if found is None:
+                raise HomeAssistantError(f"Profile {profile} not found")
+            label = found.get("label")
+            if data.get("p") != label:
+                selection.append(self.select_profile(found.get("id")))
+            checks["profile"] = ("p", lambda value: value == label)
+        if mode is not None and data.get("m") != mode:
+            selection.append(self.change_mode(mode))
+        if mode is not None:
+            checks["mode"] = ("m", lambda value: value == mode)
+        await asyncio.gather(*selection)
+        if "profile" in checks:
+            await self._async_wait_for_status({"profile": checks["profile"]}, timeout)
+
+        # (fields, coroutine) pairs that may run at the same time
+        steps = []
+        if temperature is not None:
+            target = round(temperature)
+            steps.append((("temperature",), self.set_target_temperature(temperature)))
+            checks["temperature"] = ("tt", lambda value: round(value) == target)
+        settings: dict[str, Any] = {}
+        if pressure is not None:
+            settings["targetPressure"] = pressure
+            checks["pressure"] = ("pt", lambda value: math.isclose(value, pressure, abs_tol=0.05))
+        if weight is not None:
+            settings["targetWeight"] = weight
+            checks["weight"] = ("tw", lambda value: math.isclose(value, weight, abs_tol=0.05))
+        if settings:
+            fields = tuple(field for field in ("pressure", "weight") if field in checks)
+            steps.append((fields, self._async_post_settings(settings)))
+        results = await asyncio.gather(*(step for _, step in steps), return_exceptions=True)
+        for (fields, _), result in zip(steps, results):
+            if isinstance(result, Exception) or result is False:
+                for field in fields:
+                    errors[field] = str(result) if isinstance(result, Exception) else "rejected"
+                    del checks[field]
+
+        unconfirmed = await self._async_wait_for_status(checks, timeout)
+        return {
+            "elapsed_ms": round((time.perf_counter() - started) * 1000),
+            "applied": [field for field in checks if field not in unconfirmed],
+            "unconfirmed": unconfirmed,
+            "errors": errors,
+        }
+
+    async def _async_wait_for_status(
+        self, checks: dict[str, tuple[str, Callable[[Any], bool]]], timeout: float
+    ) -> list[str]:
+        """Wait until status frames satisfy every check; return the fields that did not."""
+        pending = dict(checks)
+
+        def satisfied(data: dict[str, Any]) -> bool:
+            for field, (key, check) in list(pending.items()):
+                if data.get(key) is not None and check(data[key]):
+                    del pending[field]
+            return not pending
+
+        if satisfied(self.data or {}):
+            return []
+        waiter = (satisfied, self.hass.loop.create_future())
+        self._status_waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter[1], timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._status_waiters.remove(waiter)
+        return list(pending)
+
     async def raise_temperature(self) -> None:
         """Raise target temperature by 1°C via WebSocket."""
+        current = (self.data or {}).get("tt")
         await self.send_command({"tp": "req:raise-temp"})
+        if current is not None:
+            self._expect_effect("raise_temperature", "tt", lambda value: value > current)
 
     async def lower_temperature(self) -> None:
         """Lower target temperature by 1°C via WebSocket."""
+        current = (self.data or {}).get("tt")
         await self.send_command({"tp": "req:lower-temp"})
+        if current is not None:
+            self._expect_effect("lower_temperature", "tt", lambda value: value < current)
+
+    @callback
+    def async_add_telemetry_listener(
+        self, listener: Callable[[float, dict[str, Any]], None]
+    ) -> CALLBACK_TYPE:
+        """Call ``listener`` with the wall time and data of every status frame.
+
+        Telemetry listeners see every frame and do not cause entity state
+        writes.
+        """
+        self._telemetry_listeners.append(listener)
+        
+        @callback
+        def remove_listener() -> None:
+            self._telemetry_listeners.remove(listener)
+        
+        return remove_listener
+
+    @property
+    def connected(self) -> bool:
+        """Return True while the WebSocket is open."""
+        return self._ws is not None and not self._ws.closed
+
+    @property
+    def queue_depths(self) -> dict[str, int]:
+        """Return the number of items waiting in each internal queue."""
+        return {
+            "pending_requests": len(self._pending_requests),
+            "capture_buffer": self._capture.buffered if self._capture is not None else 0,
+            "analytics_jobs": self.analytics.queued,
+        }
+
+    @property
+    def capture(self) -> FrameCapture | None:
+        """Return the running traffic capture, if any."""
+        return self._capture
+
+    async def async_start_capture(self, path: Path, duration: float | None = None) -> None:
+        """Start recording raw WebSocket traffic to a capture file."""
+        await self.async_stop_capture()
+        self._capture = FrameCapture(self.hass, path)
+        self._capture.start()
+        if duration:
+            self._cancel_capture_timer = async_call_later(
+                self.hass, duration, self._async_capture_timeout
+            )
+        _LOGGER.info("Capturing WebSocket traffic of %s to %s", self.host, path)
+
+    async def _async_capture_timeout(self, _now: Any) -> None:
+        """Stop a capture that reached its duration."""
+        self._cancel_capture_timer = None
+        await self.async_stop_capture()
+
+    async def async_stop_capture(self) -> dict[str, Any] | None:
+        """Stop the running capture and return where it was written."""
+        if self._cancel_capture_timer is not None:
+            self._cancel_capture_timer()
+            self._cancel_capture_timer = None
+        capture, self._capture = self._capture, None
+        if capture is None:
+            return None
+        await capture.async_stop()
+        return {"path": str(capture.path), "frames": capture.frames}
+
+    @callback
+    def async_check_memory(self, _now: Any = None) -> None:
+        """Measure the memory held for this device and evict buffers over budget."""
+        recorder = self.shot_recorder
+        self.memory.check(
+            {
+                "state": self.data,
+                "ota": self._ota_data,
+                "profiles": (self._profiles, self._profile_hashes),
+                "pending_requests": self._pending_requests,
+                "recent_frames": self.metrics.recent_frames,
+                "shot_cache": recorder.downsampled_cache,
+                "shots": recorder.shots,
+                "shot_summaries": self.trends.summaries,
+                "warmups": self.preheat.warmups,
+            },
+            # Least valuable first. Shot summaries are tiny and the only
+            # long-term trend record, so they go after the full shots. The
+            # frame buffer is bounded and refills within seconds, so it is
+            # measured but never evicted
+            {
+                "shot_cache": recorder.evict_cached,
+                "shots": recorder.evict_oldest_shot,
+                "shot_summaries": self.trends.evict_oldest_summary,
+            },
+        )
+
+    async def async_schedule_preheat(
+        self, ready_at: datetime, target: float | None = None
+    ) -> dict[str, Any]:
+        """Leave Standby just in time to reach the target temperature at ``ready_at``.
+
+        The warm-up is predicted from the coldest recorded starting
+        temperature, since the boiler keeps cooling until it is switched on.
+        """
+        data = self.data or {}
+        target = target if target is not None else data.get("tt")
+        current = data.get("ct")
+        if target is None or current is None:
+            raise HomeAssistantError("Current and target temperature are not known yet")
+        coldest = self.preheat.coldest_start
+        start_temperature = min(current, coldest) if coldest is not None else current
+        warmup = self.preheat.predict(start_temperature, target)
+        if warmup is None:
+            raise HomeAssistantError(
+                "No warm-up recorded yet; switch the machine on from Standby once so it can be learned"
+            )
+
+        self.async_cancel_preheat()
+        start_at = ready_at - timedelta(seconds=warmup + PREHEAT_MARGIN)
+        schedule = self.preheat_schedule = {
+            "ready_at": ready_at.isoformat(),
+            "start_at": start_at.isoformat(),
+            "target_temperature": target,
+            "start_temperature": start_temperature,
+            "warmup_seconds": round(warmup),
+        }
+        if start_at <= dt_util.utcnow():
+            await self._async_start_preheat()
+            return {**schedule, "late": True}
+        self._cancel_preheat = async_track_point_in_utc_time(
+            self.hass, self._async_start_preheat, start_at
+        )
+        _LOGGER.info("Preheating %s at %s to be ready at %s", self.host, start_at, ready_at)
+        return {**schedule, "late": False}
+
+    async def _async_start_preheat(self, _now: Any = None) -> None:
+        """Leave Standby and set the scheduled target temperature."""
+        schedule, self.preheat_schedule = self.preheat_schedule, None
+        self._cancel_preheat = None
+        data = self.data or {}
+        if data.get("m") == MODE_STANDBY:
+            await self.change_mode(MODE_BREW)
+        if schedule is not None and schedule["target_temperature"] != data.get("tt"):
+            await self.set_target_temperature(schedule["target_temperature"])
+
+    @callback
+    def async_cancel_preheat(self) -> None:
+        """Cancel a scheduled preheat."""
+        if self._cancel_preheat is not None:
+            self._cancel_preheat()
+            self._cancel_preheat = None
+        self.preheat_schedule = None
+
+    def async_mark_setup_complete(self) -> None:
+        """Record how long it took from flow submit (or setup start) to entities."""
+        self.setup_latency = time.monotonic() - self._setup_started
+        _LOGGER.info(
+            "GaggiMate at %s ready in %.2fs (%s)",
+            self.host,
+            self.setup_latency,
+            "reused validation connection" if self.reused_validation_connection else "new connection",
+        )
+        self.shot_recorder.device_id = self._device_id()
+
+    def _device_id(self) -> str | None:
+        """Return the device registry ID, once the platforms created the device."""
+        try:
+            registry = dr.async_get(self.hass)
+        except KeyError:
+            # Bare instances used by the development tools load no registry
+            return None
+        device = registry.async_get_device(identifiers={(DOMAIN, self.entry_id)})
+        return device.id if device is not None else None
 
     async def async_shutdown(self) -> None:
         """Shutdown the coordinator."""
+        self.analytics.cancel()
+        self.async_cancel_preheat()
+        await self.shot_recorder.async_save()
+        await self.trends.async_save()
+        self.statistics.async_flush()
+        await self.async_stop_capture()
+        
         if self._reconnect_task is not None:
             self._reconnect_task.cancel()
         
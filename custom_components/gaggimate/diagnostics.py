@@ -0,0 +1,73 @@
+"""Diagnostics support for GaggiMate."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import REDACTED, async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from .coordinator import GaggiMateCoordinator
+
+# Keys identifying the machine or its network, in the entry data and in
+# settings and status frames
+TO_REDACT = {
+    CONF_HOST,
+    "ip",
+    "mdnsName",
+    "wifiSsid",
+    "wifiPassword",
+    "haIP",
+    "haUser",
+    "haPassword",
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: GaggiMateCoordinator = entry.runtime_data
+    host = entry.data.get(CONF_HOST)
+
+    def redact_host(value: Any) -> Any:
+        # Titles of same-model machines and connection errors quote the address
+        if host and isinstance(value, str):
+            return value.replace(host, REDACTED)
+        return value
+
+    diagnostics = {
+        "entry": {
+            "title": redact_host(entry.title),
+            "data": dict(entry.data),
+        },
+        "connection": {
+            "connected": coordinator.connected,
+            "reused_validation_connection": coordinator.reused_validation_connection,
+            "setup_latency": coordinator.setup_latency,
+            "history": [
+                {key: redact_host(value) for key, value in event.items()}
+                for event in coordinator.metrics.connections
+            ],
+        },
+        "metrics": coordinator.metrics.as_dict(),
+        "queue_depths": coordinator.queue_depths,
+        "analytics": coordinator.analytics.as_dict(),
+        "preheat": {**coordinator.preheat.as_dict(), "schedule": coordinator.preheat_schedule},
+        "memory": coordinator.memory.as_dict(),
+        "data": coordinator.data,
+        "ota": coordinator.ota_data,
+        "profiles": [
+            {
+                "id": profile.get("id"),
+                "label": profile.get("label"),
+                "selected": profile.get("selected", False),
+                "hash": coordinator.profile_hashes.get(profile.get("id")),
+            }
+            for profile in coordinator.profiles
+        ],
+        "shots": len(coordinator.shot_recorder.shots),
+        "recent_frames": coordinator.metrics.recent_frames_as_list(),
+    }
+    return async_redact_data(diagnostics, TO_REDACT)
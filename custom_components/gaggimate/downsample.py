@@ -0,0 +1,75 @@
+"""Largest-Triangle-Three-Buckets downsampling for GaggiMate series.
+
+LTTB keeps the first and last point and, for every bucket in between, the
+point forming the largest triangle with the point kept from the previous
+bucket and the average of the next bucket. Peaks and edges survive, which
+keeps a few hundred points visually faithful to thousands.
+
+Several channels sharing one time axis are downsampled together: each
+channel is scaled to its own range and the triangle areas are summed, so a
+single set of timestamps serves them all.
+
+Everything in this module is synchronous and must run in an executor.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+
+def lttb_indices(t: np.ndarray, values: np.ndarray, points: int) -> np.ndarray:
+    """Return the indices to keep from a series.
+
+    ``values`` has one row per channel. Gaps (NaN) count as the bottom of
+    the channel's range.
+    """
+    n = t.size
+    if points >= n or points < 3:
+        return np.arange(n)
+
+    finite = np.isfinite(values)
+    low = np.where(finite, values, np.inf).min(axis=1, keepdims=True)
+    span = np.where(finite, values, -np.inf).max(axis=1, keepdims=True) - low
+    span = np.where(np.isfinite(span) & (span > 0), span, 1.0)
+    low = np.where(np.isfinite(low), low, 0.0)
+    y = np.where(finite, (values - low) / span, 0.0)
+    x = (t - t[0]) / ((t[-1] - t[0]) or 1.0)
+
+    # points - 2 buckets over the inner points 1 .. n - 2
+    edges = np.linspace(1, n - 1, points - 1).astype(int)
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[: n - 1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[:, : n - 1], edges[:-1], axis=1) / counts
+    # The "next bucket" of the last bucket is the last point
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.concatenate([avg_y[:, 1:], y[:, -1:]], axis=1)
+
+    keep = np.empty(points, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for bucket in range(points - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        ax, ay = x[a], y[:, a : a + 1]
+        area = np.abs(
+            (ax - next_x[bucket]) * (y[:, lo:hi] - ay)
+            - (ax - x[lo:hi]) * (next_y[:, bucket : bucket + 1] - ay)
+        ).sum(axis=0)
+        a = lo + int(np.argmax(area))
+        keep[bucket + 1] = a
+    return keep
+
+
+def downsample_columns(
+    t: list[float], columns: dict[str, list[float | None]], points: int
+) -> dict[str, list[Any]]:
+    """Downsample columns sharing the time axis ``t`` to at most ``points``."""
+    times = np.array(t, dtype=float)
+    values = np.array(
+        [np.array(column, dtype=float) for column in columns.values()]
+    ).reshape(len(columns), times.size)
+    keep = lttb_indices(times, values, points)
+    return {
+        "t": [t[i] for i in keep],
+        **{key: [column[i] for i in keep] for key, column in columns.items()},
+    }
@@ -0,0 +1,17 @@
+"""Shared entity behaviour for GaggiMate platforms."""
+from __future__ import annotations
+
+from homeassistant.core import callback
+
+
+class StateWriteCounter:
+    """Count every state write in the coordinator metrics.
+
+    Listed before ``CoordinatorEntity`` in each platform's base class.
+    """
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write state, counting the write in the coordinator metrics."""
+        self.coordinator.metrics.state_writes += 1
+        super().async_write_ha_state()
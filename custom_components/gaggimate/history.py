@@ -0,0 +1,57 @@
+"""Downsampled sensor history for GaggiMate."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from homeassistant.components.recorder import history as recorder_history
+from homeassistant.core import HomeAssistant
+
+from .downsample import downsample_columns
+
+# Status key of each sensor that can be queried, with its sensor ID
+HISTORY_SENSORS = {
+    "ct": "current_temperature",
+    "tt": "target_temperature",
+    "pr": "current_pressure",
+    "pt": "target_pressure",
+    "fl": "flow_rate",
+    "cw": "current_weight",
+    "tw": "target_weight",
+}
+HISTORY_DEFAULT_CHANNELS = ("ct", "pr", "fl", "cw")
+
+
+def load_history(
+    hass: HomeAssistant,
+    start: datetime,
+    end: datetime,
+    entity_ids: dict[str, str],
+    points: int,
+) -> dict[str, Any]:
+    """Load recorded states of each channel's entity and downsample them.
+
+    Runs in the recorder's executor. Times are returned in milliseconds
+    since the epoch; unknown and unavailable states are skipped.
+    """
+    result: dict[str, Any] = {}
+    for channel, entity_id in entity_ids.items():
+        states = recorder_history.state_changes_during_period(
+            hass, start, end, entity_id, no_attributes=True, include_start_time_state=True
+        ).get(entity_id, [])
+        times: list[int] = []
+        values: list[float] = []
+        for state in states:
+            try:
+                value = float(state.state)
+            except ValueError:
+                continue
+            times.append(int(state.last_updated.timestamp() * 1000))
+            values.append(value)
+        series = downsample_columns(times, {"values": values}, points)
+        result[channel] = {
+            "entity_id": entity_id,
+            "recorded_points": len(times),
+            **series,
+        }
+    return result
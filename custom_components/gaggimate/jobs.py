@@ -0,0 +1,177 @@
+"""Analytics job scheduling for GaggiMate.
+
+Shot summaries, simulations and downsampling are NumPy work that must not
+run on the event loop. Each device queues such jobs by priority and runs at
+most ``ANALYTICS_WORKERS`` of them at a time in Home Assistant's executor,
+so a burst of background work cannot crowd out finalizing a live shot or
+starve other integrations of executor threads.
+
+Identical jobs (same key) that are queued or running share one result, and
+all of a device's jobs are cancelled when its entry unloads or fails to set
+up. A job already running in a thread cannot be interrupted; its result is
+discarded.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import time
+from collections import Counter, defaultdict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import ANALYTICS_WORKERS
+from .metrics import RollingHistogram
+
+_LOGGER = logging.getLogger(__name__)
+
+PRIORITY_LIVE = 0  # finalizing the shot that just ended
+PRIORITY_INTERACTIVE = 1  # service calls someone is waiting for
+PRIORITY_BACKGROUND = 2  # refreshes nobody is waiting for
+
+
+class SchedulerClosed(HomeAssistantError):
+    """Raised when a job is submitted after the scheduler was cancelled."""
+
+
+@dataclass(order=True)
+class _Job:
+    """A queued job, ordered by priority and then submission order."""
+
+    priority: int
+    sequence: int
+    name: str = field(compare=False)
+    key: Hashable = field(compare=False)
+    target: Callable[[], Any] = field(compare=False)
+    future: asyncio.Future[Any] = field(compare=False)
+    queued: float = field(compare=False)
+
+
+class AnalyticsScheduler:
+    """Run one device's analytics jobs by priority with bounded concurrency."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, workers: int = ANALYTICS_WORKERS) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self.entry_id = entry_id
+        self._workers = workers
+        self._queue: asyncio.PriorityQueue[_Job] = asyncio.PriorityQueue()
+        self._jobs: dict[Hashable, _Job] = {}
+        self._sequence = itertools.count()
+        self._tasks: list[asyncio.Task[None]] = []
+        self._cancelled = False
+        self.counts: defaultdict[str, Counter[str]] = defaultdict(Counter)
+        self.wait_time: defaultdict[str, RollingHistogram] = defaultdict(RollingHistogram)
+        self.run_time: defaultdict[str, RollingHistogram] = defaultdict(RollingHistogram)
+
+    @property
+    def queued(self) -> int:
+        """Return the number of jobs queued or running."""
+        return len(self._jobs)
+
+    async def async_run(
+        self,
+        name: str,
+        target: Callable[..., Any],
+        *args: Any,
+        priority: int = PRIORITY_INTERACTIVE,
+        key: Hashable | None = None,
+    ) -> Any:
+        """Run ``target(*args)`` in the executor and return its result.
+
+        Jobs with the same ``key`` that are queued or running are merged.
+        Cancelling the caller does not cancel a job other callers share.
+        After ``cancel`` every new job raises ``SchedulerClosed``.
+        """
+        if self._cancelled:
+            self.counts[name]["cancelled"] += 1
+            raise SchedulerClosed(f"Analytics for {self.entry_id} have been stopped")
+        job_key = (name, key) if key is not None else (name, object())
+        job = self._jobs.get(job_key)
+        if job is not None:
+            self.counts[name]["deduplicated"] += 1
+        else:
+            if not self._tasks:
+                self._start_workers()
+            job = _Job(
+                priority,
+                next(self._sequence),
+                name,
+                job_key,
+                partial(target, *args),
+                self.hass.loop.create_future(),
+                time.monotonic(),
+            )
+            job.future.add_done_callback(partial(self._job_done, job))
+            self._jobs[job_key] = job
+            self._queue.put_nowait(job)
+            self.counts[name]["submitted"] += 1
+        return await asyncio.shield(job.future)
+
+    def _start_workers(self) -> None:
+        """Start the worker tasks."""
+        self._tasks = [
+            self.hass.async_create_background_task(
+                self._worker(), f"gaggimate {self.entry_id} analytics worker {index}"
+            )
+            for index in range(self._workers)
+        ]
+
+    async def _worker(self) -> None:
+        """Run queued jobs one at a time, highest priority first."""
+        while True:
+            job = await self._queue.get()
+            if job.future.done():
+                continue
+            started = time.monotonic()
+            self.wait_time[job.name].add(started - job.queued)
+            try:
+                result = await self.hass.async_add_executor_job(job.target)
+            except Exception as err:  # noqa: BLE001
+                if not job.future.done():
+                    job.future.set_exception(err)
+            else:
+                if not job.future.done():
+                    job.future.set_result(result)
+            self.run_time[job.name].add(time.monotonic() - started)
+
+    def _job_done(self, job: _Job, future: asyncio.Future[Any]) -> None:
+        """Forget a finished job and count its outcome."""
+        self._jobs.pop(job.key, None)
+        if future.cancelled():
+            self.counts[job.name]["cancelled"] += 1
+        elif future.exception() is not None:
+            self.counts[job.name]["failed"] += 1
+            _LOGGER.debug("Analytics job %s failed: %s", job.name, future.exception())
+        else:
+            self.counts[job.name]["completed"] += 1
+
+    def cancel(self) -> None:
+        """Cancel all queued and running jobs, stop the workers and refuse new jobs."""
+        self._cancelled = True
+        for job in list(self._jobs.values()):
+            job.future.cancel()
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return per-job counts and timings for diagnostics."""
+        return {
+            "workers": self._workers,
+            "queued": self.queued,
+            "jobs": {
+                name: {
+                    **counts,
+                    "wait_ms": self.wait_time[name].summary(),
+                    "run_ms": self.run_time[name].summary(),
+                }
+                for name, counts in self.counts.items()
+            },
+        }
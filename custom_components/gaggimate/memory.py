@@ -0,0 +1,93 @@
+"""Approximate memory accounting for GaggiMate.
+
+Each device's state, profile catalogue and buffers are measured every few
+minutes. Sizes are estimates: dictionaries are walked, but long lists (shot
+columns, frame buffers) are sized from a few sampled items, so a check
+stays cheap enough for the event loop even with a full shot archive.
+
+When a device holds more than its budget, the oldest buffered data is
+evicted, least valuable first, until it fits.
+"""
+from __future__ import annotations
+
+import logging
+import sys
+import time
+from collections import Counter, deque
+from collections.abc import Callable
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+# Items sampled to estimate the size of a long list
+LIST_SAMPLES = 8
+
+
+def approximate_size(value: Any) -> int:
+    """Return the approximate number of bytes held by ``value``."""
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            approximate_size(key) + approximate_size(item) for key, item in value.items()
+        )
+    if isinstance(value, (list, tuple, deque)):
+        size = sys.getsizeof(value)
+        count = len(value)
+        if count <= LIST_SAMPLES:
+            return size + sum(approximate_size(item) for item in value)
+        stride = count / LIST_SAMPLES
+        sampled = sum(approximate_size(value[int(i * stride)]) for i in range(LIST_SAMPLES))
+        return size + sampled * count // LIST_SAMPLES
+    return sys.getsizeof(value)
+
+
+class MemoryBudget:
+    """Track approximate bytes per component and evict when over budget."""
+
+    def __init__(self, budget: int) -> None:
+        """Initialize the budget, in bytes."""
+        self.budget = budget
+        self.usage: dict[str, int] = {}
+        self.evicted: Counter[str] = Counter()
+        self.check_time: float | None = None
+        self._over_budget = False
+
+    @property
+    def total(self) -> int:
+        """Return the approximate bytes held in total."""
+        return sum(self.usage.values())
+
+    def check(
+        self,
+        components: dict[str, Any],
+        evictors: dict[str, Callable[[], bool]],
+    ) -> None:
+        """Measure ``components`` and evict until within budget.
+
+        ``evictors`` maps component names, in eviction order, to callables
+        that drop the oldest item of that component in place and return
+        false once nothing more can be dropped.
+        """
+        started = time.perf_counter()
+        self.usage = {name: approximate_size(value) for name, value in components.items()}
+        for name, evict in evictors.items():
+            while self.total > self.budget and evict():
+                self.evicted[name] += 1
+                self.usage[name] = approximate_size(components[name])
+        over_budget = self.total > self.budget
+        if over_budget and not self._over_budget:
+            _LOGGER.warning(
+                "Memory use of %d bytes exceeds the budget of %d bytes with nothing left to evict",
+                self.total, self.budget,
+            )
+        self._over_budget = over_budget
+        self.check_time = time.perf_counter() - started
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the usage, budget and evictions for diagnostics."""
+        return {
+            "total": self.total,
+            "budget": self.budget,
+            "usage": dict(self.usage),
+            "evicted": dict(self.evicted),
+            "check_ms": round(self.check_time * 1000, 3) if self.check_time is not None else None,
+        }
@@ -0,0 +1,196 @@
+"""Lightweight hot-path metrics for GaggiMate."""
+from __future__ import annotations
+
+import json
+import logging
+import time
+from collections import Counter, defaultdict, deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    COMMAND_EFFECT_TIMEOUT,
+    CONNECTION_HISTORY,
+    METRICS_WINDOW,
+    RECENT_FRAMES,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RollingHistogram:
+    """Keep the most recent samples of a timing, summarized on demand.
+
+    Adding a sample is a deque append; sorting happens only when a summary
+    is requested.
+    """
+
+    def __init__(self, size: int = METRICS_WINDOW) -> None:
+        """Initialize the histogram."""
+        self._samples: deque[float] = deque(maxlen=size)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value: float) -> None:
+        """Record one sample in seconds."""
+        self._samples.append(value)
+        self.count += 1
+        self.total += value
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return a percentile of the recent samples in seconds."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+    def summary(self) -> dict[str, Any]:
+        """Return count, mean and recent percentiles in milliseconds."""
+        if not self._samples:
+            return {"count": self.count}
+        ordered = sorted(self._samples)
+        last = len(ordered) - 1
+
+        def pick(fraction: float) -> float:
+            return round(ordered[min(int(fraction * len(ordered)), last)] * 1000, 3)
+
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count * 1000, 3),
+            "p50": pick(0.5),
+            "p95": pick(0.95),
+            "p99": pick(0.99),
+            "max": round(ordered[last] * 1000, 3),
+        }
+
+
+@dataclass
+class ExpectedEffect:
+    """A command waiting for its effect to appear in a status frame."""
+
+    command: str
+    key: str
+    check: Callable[[Any], bool]
+    sent: float
+
+
+class CoordinatorMetrics:
+    """Counters and timings for one coordinator's hot paths."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.frames: Counter[str] = Counter()
+        self.bytes_received = 0
+        self.decode = RollingHistogram()
+        self.dispatch = RollingHistogram()
+        self.state_writes = 0
+        self.commands: Counter[str] = Counter()
+        self.send_failures = 0
+        self.recent_frames: deque[tuple[float, str, str]] = deque(maxlen=RECENT_FRAMES)
+        self.connections: deque[dict[str, Any]] = deque(maxlen=CONNECTION_HISTORY)
+        self.effect_latency: defaultdict[str, RollingHistogram] = defaultdict(RollingHistogram)
+        self.effects_missed: Counter[str] = Counter()
+        self._expected: list[ExpectedEffect] = []
+
+    def expect_effect(
+        self, command: str, key: str, check: Callable[[Any], bool], current: Any
+    ) -> None:
+        """Start timing a command until a status frame satisfies ``check``.
+
+        Commands whose effect is already visible in ``current`` cannot be
+        observed and are not tracked. An earlier command on the same status
+        key is superseded rather than counted as missed.
+        """
+        if current is not None and check(current):
+            return
+        self._expected = [effect for effect in self._expected if effect.key != key]
+        self._expected.append(ExpectedEffect(command, key, check, time.monotonic()))
+
+    def discard_effect(self, command: str) -> None:
+        """Stop timing a command that the device rejected."""
+        self._expected = [effect for effect in self._expected if effect.command != command]
+
+    def observe_status(self, data: dict[str, Any]) -> None:
+        """Resolve or expire expected effects against a status frame."""
+        if not self._expected:
+            return
+        now = time.monotonic()
+        waiting = []
+        for effect in self._expected:
+            value = data.get(effect.key)
+            if value is not None and effect.check(value):
+                self.effect_latency[effect.command].add(now - effect.sent)
+            elif now - effect.sent > COMMAND_EFFECT_TIMEOUT:
+                self.effects_missed[effect.command] += 1
+                _LOGGER.warning(
+                    "%s had no visible effect on %s within %ss",
+                    effect.command, effect.key, COMMAND_EFFECT_TIMEOUT,
+                )
+            else:
+                waiting.append(effect)
+        self._expected = waiting
+
+    def expected_effect_latency(self, command: str) -> float | None:
+        """Return the median send-to-effect latency of a command in seconds."""
+        histogram = self.effect_latency.get(command)
+        return histogram.percentile(0.5) if histogram is not None else None
+
+    def record_frame(self, direction: str, raw: str) -> None:
+        """Keep a raw frame in the recent-frame ring buffer.
+
+        Frames are stored as received and only decoded when diagnostics
+        are downloaded.
+        """
+        self.recent_frames.append((time.time(), direction, raw))
+
+    def record_connection(self, event: str, **details: Any) -> None:
+        """Record a connection event such as a connect or disconnect."""
+        self.connections.append({"time": dt_util.utcnow().isoformat(), "event": event, **details})
+
+    def recent_frames_as_list(self) -> list[dict[str, Any]]:
+        """Return the recent frames, oldest first, decoded where possible."""
+        frames = []
+        for received, direction, raw in self.recent_frames:
+            try:
+                frame: Any = json.loads(raw)
+            except ValueError:
+                frame = raw
+            frames.append({
+                "time": dt_util.utc_from_timestamp(received).isoformat(),
+                "direction": direction,
+                "frame": frame,
+            })
+        return frames
+
+    @property
+    def frames_received(self) -> int:
+        """Return the total number of frames received."""
+        return sum(self.frames.values())
+
+    @property
+    def commands_sent(self) -> int:
+        """Return the total number of commands sent."""
+        return sum(self.commands.values())
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return all metrics as a JSON-friendly dict."""
+        return {
+            "frames_received": self.frames_received,
+            "frames_by_type": dict(self.frames),
+            "bytes_received": self.bytes_received,
+            "decode_ms": self.decode.summary(),
+            "dispatch_ms": self.dispatch.summary(),
+            "state_writes": self.state_writes,
+            "commands_sent": self.commands_sent,
+            "commands_by_type": dict(self.commands),
+            "send_failures": self.send_failures,
+            "command_effect_ms": {
+                command: histogram.summary()
+                for command, histogram in self.effect_latency.items()
+            },
+            "commands_without_effect": dict(self.effects_missed),
+            "commands_awaiting_effect": len(self._expected),
+        }
@@ -13,6 +13,7 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
 from .coordinator import GaggiMateCoordinator
+from .entity import StateWriteCounter
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -34,7 +35,7 @@ async def async_setup_entry(
     async_add_entities(entities)
 
 
-class GaggiMateNumberBase(CoordinatorEntity[GaggiMateCoordinator], NumberEntity):
+class GaggiMateNumberBase(StateWriteCounter, CoordinatorEntity[GaggiMateCoordinator], NumberEntity):
     """Base class for GaggiMate number entities."""
 
     def __init__(
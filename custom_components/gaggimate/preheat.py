@@ -0,0 +1,222 @@
+"""Warm-up learning and preheat prediction for GaggiMate.
+
+Every time a machine leaves Standby well below its target temperature, the
+``ct`` curve is recorded (one sample per ``PREHEAT_SAMPLE_INTERVAL``) until
+the target is reached. The boiler is modelled as a first-order system
+heating towards a ceiling temperature after a dead time::
+
+    dT/dt = (ceiling - T) / tau
+
+which is a straight line in ``T``, so the model is one least-squares fit of
+the heating rate against temperature over all recorded samples. The fit runs
+as a background analytics job after each warm-up; predicting a warm-up time
+is then a closed-form expression.
+"""
+from __future__ import annotations
+
+import logging
+import math
+from typing import Any
+
+import numpy as np
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    MODE_STANDBY,
+    PREHEAT_MAX_DURATION,
+    PREHEAT_MIN_RISE,
+    PREHEAT_SAMPLE_INTERVAL,
+    PREHEAT_TOLERANCE,
+    PREHEAT_WARMUPS,
+    SHOTS_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+from .jobs import PRIORITY_BACKGROUND, AnalyticsScheduler, SchedulerClosed
+
+_LOGGER = logging.getLogger(__name__)
+
+# Temperature rise that marks the end of the dead time
+WARMUP_RISE_START = 0.5
+
+
+def fit_thermal_model(warmups: list[dict[str, Any]]) -> dict[str, Any] | None:
+    """Fit the heating model to recorded warm-ups.
+
+    Synchronous, must run in an executor.
+    """
+    rates, temperatures = [], []
+    for warmup in warmups:
+        t = np.array(warmup["t"], dtype=float)
+        ct = np.array(warmup["ct"], dtype=float)
+        if t.size < 3:
+            continue
+        rates.append(np.gradient(ct, t))
+        temperatures.append(ct)
+    if not rates:
+        return None
+
+    rate = np.concatenate(rates)
+    temperature = np.concatenate(temperatures)
+    design = np.column_stack([np.ones_like(temperature), -temperature])
+    (offset, slope), *_ = np.linalg.lstsq(design, rate, rcond=None)
+    model: dict[str, Any] = {
+        "warmups": len(rates),
+        "lag": round(float(np.median([warmup["lag"] for warmup in warmups])), 1),
+        "rate": round(float(np.mean(rate[rate > 0])) if (rate > 0).any() else 0.0, 4),
+    }
+    if slope > 0:
+        model["tau"] = round(float(1 / slope), 1)
+        model["ceiling"] = round(float(offset / slope), 1)
+    predicted = offset - slope * temperature
+    model["rmse"] = round(float(np.sqrt(np.mean((rate - predicted) ** 2))), 4)
+    return model
+
+
+def predict_warmup(model: dict[str, Any], start: float, target: float) -> float | None:
+    """Return the seconds needed to heat from ``start`` to ``target``."""
+    if target <= start:
+        return 0.0
+    ceiling = model.get("ceiling")
+    if ceiling is not None and ceiling > target + PREHEAT_TOLERANCE:
+        heating = model["tau"] * math.log((ceiling - start) / (ceiling - target))
+    elif model["rate"] > 0:
+        heating = (target - start) / model["rate"]
+    else:
+        return None
+    return model["lag"] + heating
+
+
+class PreheatModel:
+    """Record one device's warm-ups and predict how long the next one takes."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, scheduler: AnalyticsScheduler) -> None:
+        """Initialize the model."""
+        self.hass = hass
+        self._scheduler = scheduler
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.preheat"
+        )
+        self._warmups: list[dict[str, Any]] = []
+        self.model: dict[str, Any] | None = None
+        self._current: dict[str, Any] | None = None
+        self._start_time = 0.0
+        self._last_sample = 0.0
+        self._last_mode: int | None = None
+
+    @property
+    def warmups(self) -> list[dict[str, Any]]:
+        """Return recorded warm-ups, oldest first."""
+        return self._warmups
+
+    @property
+    def coldest_start(self) -> float | None:
+        """Return the lowest temperature a recorded warm-up started from."""
+        return min((warmup["start_temperature"] for warmup in self._warmups), default=None)
+
+    async def async_load(self) -> None:
+        """Load recorded warm-ups and fit the model."""
+        stored = await self._store.async_load()
+        if stored is not None:
+            self._warmups = stored.get("warmups", [])
+        if self._warmups:
+            await self._async_fit()
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return {"warmups": self._warmups}
+
+    def process_status(self, data: dict[str, Any], now: float) -> None:
+        """Feed a merged status frame received at monotonic time ``now``."""
+        mode, last_mode = data.get("m"), self._last_mode
+        self._last_mode = mode
+        current, target = data.get("ct"), data.get("tt")
+        if current is None or target is None:
+            return
+
+        if self._current is None:
+            leaving_standby = last_mode == MODE_STANDBY and mode not in (None, MODE_STANDBY)
+            if leaving_standby and target - current >= PREHEAT_MIN_RISE:
+                self._start(current, target, now)
+            return
+
+        if mode == MODE_STANDBY or now - self._start_time > PREHEAT_MAX_DURATION:
+            _LOGGER.debug("Warm-up abandoned")
+            self._current = None
+            return
+        if current >= target - PREHEAT_TOLERANCE:
+            self._finish(current, target, now)
+        elif now - self._last_sample >= PREHEAT_SAMPLE_INTERVAL:
+            self._sample(current, now)
+
+    def _start(self, current: float, target: float, now: float) -> None:
+        """Start recording a warm-up."""
+        self._start_time = now
+        self._current = {"started": dt_util.utcnow().isoformat(), "t": [], "ct": []}
+        self._sample(current, now)
+        _LOGGER.debug("Warm-up started at %.1f°C towards %.1f°C", current, target)
+
+    def _sample(self, current: float, now: float) -> None:
+        """Record one temperature sample."""
+        self._last_sample = now
+        self._current["t"].append(round(now - self._start_time, 1))
+        self._current["ct"].append(round(current, 2))
+
+    def _finish(self, current: float, target: float, now: float) -> None:
+        """Store a completed warm-up and refit the model."""
+        self._sample(current, now)
+        warmup, self._current = self._current, None
+        t, ct = warmup["t"], warmup["ct"]
+        # Drop the dead time before the temperature starts to rise
+        rising = next(
+            (index for index, value in enumerate(ct) if value >= ct[0] + WARMUP_RISE_START),
+            len(ct) - 1,
+        )
+        warmup.update(
+            {
+                "target": target,
+                "duration": t[-1],
+                "start_temperature": ct[0],
+                "lag": t[rising],
+                "t": t[rising:],
+                "ct": ct[rising:],
+            }
+        )
+        self._warmups.append(warmup)
+        del self._warmups[:-PREHEAT_WARMUPS]
+        self._store.async_delay_save(self._data_to_save, SHOTS_SAVE_DELAY)
+        _LOGGER.info("Recorded %.0fs warm-up to %.1f°C", t[-1], target)
+        self.hass.async_create_task(self._async_fit())
+
+    async def _async_fit(self) -> None:
+        """Refit the model in the background."""
+        try:
+            self.model = await self._scheduler.async_run(
+                "thermal_model",
+                fit_thermal_model,
+                list(self._warmups),
+                priority=PRIORITY_BACKGROUND,
+            )
+        except SchedulerClosed:
+            _LOGGER.debug("Not fitting the thermal model, the entry is unloading")
+            return
+        _LOGGER.debug("Fitted thermal model: %s", self.model)
+
+    def predict(self, start: float, target: float) -> float | None:
+        """Return the predicted warm-up time in seconds, if a model exists."""
+        if self.model is None:
+            return None
+        return predict_warmup(self.model, start, target)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the model and recorded warm-ups for diagnostics."""
+        return {
+            "model": self.model,
+            "warmups": [
+                {key: warmup[key] for key in ("started", "target", "duration", "lag")}
+                for warmup in self._warmups
+            ],
+        }
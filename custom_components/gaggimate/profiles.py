@@ -0,0 +1,34 @@
+"""Profile helpers for GaggiMate."""
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any
+
+# Keys that describe device-local state rather than profile content.
+# They are excluded when comparing profiles between machines.
+VOLATILE_PROFILE_KEYS = ("selected", "favorite")
+
+
+def profile_content(profile: dict[str, Any]) -> dict[str, Any]:
+    """Return a profile without its device-local keys."""
+    return {k: v for k, v in profile.items() if k not in VOLATILE_PROFILE_KEYS}
+
+
+def profile_hash(profile: dict[str, Any]) -> str:
+    """Return a stable content hash for a profile.
+
+    The ID is excluded, since the same profile has a different ID on every
+    machine it was created on.
+    """
+    content = {k: v for k, v in profile_content(profile).items() if k != "id"}
+    payload = json.dumps(content, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def find_profile(profiles: list[dict[str, Any]], key: str) -> dict[str, Any] | None:
+    """Find a profile by ID or label."""
+    for profile in profiles:
+        if profile.get("id") == key or profile.get("label") == key:
+            return profile
+    return None
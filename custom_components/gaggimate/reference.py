@@ -0,0 +1,89 @@
+"""Live comparison of a shot against a reference shot.
+
+The running shot is aligned to the reference with open-ended dynamic time
+warping: every frame adds one column of the cost matrix, restricted to a
+band of ``REFERENCE_WINDOW`` reference samples around the previous match.
+Each frame therefore costs the same small, fixed amount of work no matter
+how long either shot is, and the matched reference sample gives how far
+the shot is ahead of or behind the reference.
+
+Channels are scaled by the reference's peak value so pressure, flow and
+weight contribute equally to the distance.
+"""
+from __future__ import annotations
+
+import math
+from typing import Any
+
+from .const import REFERENCE_CHANNELS, REFERENCE_WINDOW
+
+
+class ShotAligner:
+    """Incrementally align a running shot to a reference shot."""
+
+    def __init__(self, reference: dict[str, Any], window: int = REFERENCE_WINDOW) -> None:
+        """Initialize the aligner from a recorded reference shot."""
+        self.reference_id = reference["id"]
+        self._window = window
+        self._t = reference["t"]
+        self._scales = [
+            max((value for value in reference[channel] if value is not None), default=0.0) or 1.0
+            for channel in REFERENCE_CHANNELS
+        ]
+        self._samples = [
+            tuple(
+                (value or 0.0) / scale
+                for value, scale in zip(
+                    (reference[channel][index] for channel in REFERENCE_CHANNELS), self._scales
+                )
+            )
+            for index in range(len(self._t))
+        ]
+        # Accumulated cost of the previous column, for reference samples lo .. lo + len - 1
+        self._lo = 0
+        self._costs: list[float] = []
+        self._index = 0
+        self._frames = 0
+        self._distance_total = 0.0
+        self.similarity: float | None = None
+        self.offset: float | None = None
+
+    def update(self, elapsed: float, data: dict[str, Any]) -> None:
+        """Align one frame of the running shot, ``elapsed`` seconds in."""
+        if not self._samples:
+            return
+        sample = tuple(
+            (data.get(channel) or 0.0) / scale
+            for channel, scale in zip(REFERENCE_CHANNELS, self._scales)
+        )
+        lo = max(0, self._index - self._window)
+        hi = min(len(self._samples), self._index + self._window + 1)
+        previous, previous_lo = self._costs, self._lo
+        costs: list[float] = []
+        for j in range(lo, hi):
+            distance = math.dist(sample, self._samples[j])
+            if not previous:
+                # First frame: the shot starts at the start of the reference
+                best = 0.0 if j == 0 else costs[-1]
+            else:
+                best = costs[-1] if costs else math.inf
+                for k in (j - previous_lo, j - 1 - previous_lo):
+                    if 0 <= k < len(previous):
+                        best = min(best, previous[k])
+            costs.append(distance + best)
+
+        best_index = min(range(len(costs)), key=costs.__getitem__)
+        self._lo, self._costs = lo, costs
+        self._index = lo + best_index
+        self._frames += 1
+        self._distance_total += math.dist(sample, self._samples[self._index])
+        self.similarity = round(100 * math.exp(-self._distance_total / self._frames), 1)
+        self.offset = round(self._t[self._index] - elapsed, 1)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the current comparison."""
+        return {
+            "reference_id": self.reference_id,
+            "similarity": self.similarity,
+            "offset": self.offset,
+        }
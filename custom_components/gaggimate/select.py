@@ -12,6 +12,7 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN, MODE_MAP, MODE_REVERSE_MAP
 from .coordinator import GaggiMateCoordinator
+from .entity import StateWriteCounter
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -35,7 +36,7 @@ async def async_setup_entry(
     async_add_entities(entities)
 
 
-class GaggiMateSelectBase(CoordinatorEntity[GaggiMateCoordinator], SelectEntity):
+class GaggiMateSelectBase(StateWriteCounter, CoordinatorEntity[GaggiMateCoordinator], SelectEntity):
     """Base class for GaggiMate select entities."""
 
     def __init__(
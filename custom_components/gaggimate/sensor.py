@@ -2,6 +2,8 @@
 from __future__ import annotations
 
 import logging
+import time
+from collections.abc import Callable
 from typing import Any
 
 from homeassistant.components.sensor import (
@@ -12,19 +14,84 @@ from homeassistant.components.sensor import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     PERCENTAGE,
+    UnitOfInformation,
     UnitOfTemperature,
     UnitOfMass,
+    UnitOfTime,
+    UnitOfVolume,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_time_change
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, MODE_MAP
+from .const import (
+    CONF_MAX_STALENESS,
+    DEFAULT_DEADBANDS,
+    DEFAULT_MAX_STALENESS,
+    DEFAULT_STEPS,
+    DOMAIN,
+    METRICS_SENSOR_INTERVAL,
+    MODE_MAP,
+    SHOT_SENSOR_INTERVAL,
+    TRENDS_SENSOR_DAYS,
+)
 from .coordinator import GaggiMateCoordinator
+from .entity import StateWriteCounter
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _p95_ms(histogram: Any) -> float | None:
+    """Return the 95th percentile of a timing histogram in milliseconds."""
+    value = histogram.percentile(0.95)
+    return round(value * 1000, 3) if value is not None else None
+
+
+# sensor_id: (name, unit, state class, value function)
+METRIC_SENSORS: dict[str, tuple[str, str | None, SensorStateClass, Callable[[GaggiMateCoordinator], Any]]] = {
+    "frames_received": (
+        "Frames Received", None, SensorStateClass.TOTAL_INCREASING,
+        lambda c: c.metrics.frames_received,
+    ),
+    "decode_time_p95": (
+        "Decode Time p95", "ms", SensorStateClass.MEASUREMENT,
+        lambda c: _p95_ms(c.metrics.decode),
+    ),
+    "dispatch_time_p95": (
+        "Dispatch Time p95", "ms", SensorStateClass.MEASUREMENT,
+        lambda c: _p95_ms(c.metrics.dispatch),
+    ),
+    "state_writes": (
+        "State Writes", None, SensorStateClass.TOTAL_INCREASING,
+        lambda c: c.metrics.state_writes,
+    ),
+    "commands_sent": (
+        "Commands Sent", None, SensorStateClass.TOTAL_INCREASING,
+        lambda c: c.metrics.commands_sent,
+    ),
+    "send_failures": (
+        "Send Failures", None, SensorStateClass.TOTAL_INCREASING,
+        lambda c: c.metrics.send_failures,
+    ),
+    "pending_requests": (
+        "Pending Requests", None, SensorStateClass.MEASUREMENT,
+        lambda c: c.queue_depths["pending_requests"],
+    ),
+}
+
+# sensor_id: (name, trend metric or None for the shot count, unit)
+TREND_SENSORS: dict[str, tuple[str, str | None, str | None]] = {
+    "shots_7d": ("Shots (7 days)", None, None),
+    "shot_time_7d": ("Mean Shot Time (7 days)", "duration", UnitOfTime.SECONDS),
+    "yield_7d": ("Mean Yield (7 days)", "yield", UnitOfMass.GRAMS),
+    "yield_ratio_7d": ("Mean Yield vs Target (7 days)", "yield_ratio", None),
+    "peak_pressure_7d": ("Mean Peak Pressure (7 days)", "peak_pressure", "bar"),
+    "temperature_error_7d": ("Mean Temperature Error (7 days)", "temperature_error", UnitOfTemperature.CELSIUS),
+}
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -51,12 +118,24 @@ async def async_setup_entry(
         GaggiMateFilesystemSensor(coordinator, entry, "filesystem_free", "Filesystem Free", "spiffsFree"),
         GaggiMateFilesystemPercentSensor(coordinator, entry),
         GaggiMateUpdateProgressSensor(coordinator, entry),
+        GaggiMateShotSensor(coordinator, entry, "shot_time", "Shot Time", "elapsed"),
+        GaggiMateShotSensor(coordinator, entry, "preinfusion_time", "Pre-infusion Time", "preinfusion"),
+        GaggiMateShotSensor(coordinator, entry, "shot_water", "Shot Water Volume", "water"),
+        GaggiMateReferenceSensor(coordinator, entry, "reference_similarity", "Reference Similarity", "similarity", PERCENTAGE),
+        GaggiMateReferenceSensor(coordinator, entry, "reference_offset", "Reference Offset", "offset", UnitOfTime.SECONDS),
+        GaggiMateMemorySensor(coordinator, entry),
     ]
+    entities.extend(
+        GaggiMateMetricSensor(coordinator, entry, sensor_id) for sensor_id in METRIC_SENSORS
+    )
+    entities.extend(
+        GaggiMateTrendSensor(coordinator, entry, sensor_id) for sensor_id in TREND_SENSORS
+    )
     
     async_add_entities(entities)
 
 
-class GaggiMateSensorBase(CoordinatorEntity[GaggiMateCoordinator], SensorEntity):
+class GaggiMateSensorBase(StateWriteCounter, CoordinatorEntity[GaggiMateCoordinator], SensorEntity):
     """Base class for GaggiMate sensors."""
 
     def __init__(
@@ -80,8 +159,14 @@ class GaggiMateSensorBase(CoordinatorEntity[GaggiMateCoordinator], SensorEntity)
         }
 
 
-class GaggiMateTemperatureSensor(GaggiMateSensorBase):
-    """Temperature sensor for GaggiMate."""
+class GaggiMateFilteredSensor(GaggiMateSensorBase):
+    """Base class for measurement sensors that only write meaningful changes.
+
+    Values are rounded to the configured step. A new state is written when
+    the value moved by at least the deadband, became or left zero or
+    unknown, or the last write is older than the maximum staleness, so slow
+    drift is still recorded.
+    """
 
     def __init__(
         self,
@@ -90,21 +175,69 @@ class GaggiMateTemperatureSensor(GaggiMateSensorBase):
         sensor_id: str,
         name: str,
         data_key: str,
+        kind: str,
     ) -> None:
-        """Initialize the temperature sensor."""
+        """Initialize the filtered sensor."""
         super().__init__(coordinator, entry, sensor_id, name)
         self._data_key = data_key
-        self._attr_device_class = SensorDeviceClass.TEMPERATURE
-        self._attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
-        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._deadband = entry.options.get(f"{kind}_deadband", DEFAULT_DEADBANDS[kind])
+        self._step = entry.options.get(f"{kind}_step", DEFAULT_STEPS[kind])
+        self._max_staleness = entry.options.get(CONF_MAX_STALENESS, DEFAULT_MAX_STALENESS)
+        self._value = self._read_value()
+        self._last_write = time.monotonic()
+
+    def _read_value(self) -> float | None:
+        """Return the current value rounded to the configured step."""
+        value = self.coordinator.data.get(self._data_key)
+        if value is None or not self._step:
+            return value
+        return round(round(value / self._step) * self._step, 6)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when the value changed meaningfully."""
+        value = self._read_value()
+        last = self._value
+        if value == last:
+            return
+        now = time.monotonic()
+        if (
+            value is None
+            or last is None
+            or value == 0
+            or last == 0
+            or abs(value - last) >= self._deadband
+            or now - self._last_write >= self._max_staleness
+        ):
+            self._value = value
+            self._last_write = now
+            super()._handle_coordinator_update()
 
     @property
     def native_value(self) -> float | None:
         """Return the state of the sensor."""
-        return self.coordinator.data.get(self._data_key)
+        return self._value
+
+
+class GaggiMateTemperatureSensor(GaggiMateFilteredSensor):
+    """Temperature sensor for GaggiMate."""
+
+    def __init__(
+        self,
+        coordinator: GaggiMateCoordinator,
+        entry: ConfigEntry,
+        sensor_id: str,
+        name: str,
+        data_key: str,
+    ) -> None:
+        """Initialize the temperature sensor."""
+        super().__init__(coordinator, entry, sensor_id, name, data_key, "temperature")
+        self._attr_device_class = SensorDeviceClass.TEMPERATURE
+        self._attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
+        self._attr_state_class = SensorStateClass.MEASUREMENT
 
 
-class GaggiMatePressureSensor(GaggiMateSensorBase):
+class GaggiMatePressureSensor(GaggiMateFilteredSensor):
     """Pressure sensor for GaggiMate."""
 
     def __init__(
@@ -116,23 +249,14 @@ class GaggiMatePressureSensor(GaggiMateSensorBase):
         data_key: str,
     ) -> None:
         """Initialize the pressure sensor."""
-        super().__init__(coordinator, entry, sensor_id, name)
-        self._data_key = data_key
+        super().__init__(coordinator, entry, sensor_id, name, data_key, "pressure")
         self._attr_icon = "mdi:gauge"
         self._attr_native_unit_of_measurement = "bar"
         self._attr_state_class = SensorStateClass.MEASUREMENT
         self._attr_suggested_display_precision = 2
 
-    @property
-    def native_value(self) -> float | None:
-        """Return the state of the sensor."""
-        value = self.coordinator.data.get(self._data_key)
-        if value is not None:
-            return round(value, 2)
-        return None
-
 
-class GaggiMateWeightSensor(GaggiMateSensorBase):
+class GaggiMateWeightSensor(GaggiMateFilteredSensor):
     """Weight sensor for GaggiMate."""
 
     def __init__(
@@ -144,19 +268,13 @@ class GaggiMateWeightSensor(GaggiMateSensorBase):
         data_key: str,
     ) -> None:
         """Initialize the weight sensor."""
-        super().__init__(coordinator, entry, sensor_id, name)
-        self._data_key = data_key
+        super().__init__(coordinator, entry, sensor_id, name, data_key, "weight")
         self._attr_icon = "mdi:weight-gram"
         self._attr_native_unit_of_measurement = UnitOfMass.GRAMS
         self._attr_state_class = SensorStateClass.MEASUREMENT
 
-    @property
-    def native_value(self) -> float | None:
-        """Return the state of the sensor."""
-        return self.coordinator.data.get(self._data_key)
 
-
-class GaggiMateFlowSensor(GaggiMateSensorBase):
+class GaggiMateFlowSensor(GaggiMateFilteredSensor):
     """Flow rate sensor for GaggiMate."""
 
     def __init__(
@@ -165,16 +283,11 @@ class GaggiMateFlowSensor(GaggiMateSensorBase):
         entry: ConfigEntry,
     ) -> None:
         """Initialize the flow sensor."""
-        super().__init__(coordinator, entry, "flow_rate", "Flow Rate")
+        super().__init__(coordinator, entry, "flow_rate", "Flow Rate", "fl", "flow")
         self._attr_icon = "mdi:water"
         self._attr_native_unit_of_measurement = "ml/s"
         self._attr_state_class = SensorStateClass.MEASUREMENT
 
-    @property
-    def native_value(self) -> float | None:
-        """Return the state of the sensor."""
-        return self.coordinator.data.get("fl")
-
 
 class GaggiMateModeSensor(GaggiMateSensorBase):
     """Mode sensor for GaggiMate."""
@@ -215,6 +328,100 @@ class GaggiMateProfileSensor(GaggiMateSensorBase):
         return self.coordinator.data.get("p")
 
 
+class GaggiMateShotSensor(GaggiMateSensorBase):
+    """Live timer or water volume of the current or last shot.
+
+    The recorder updates the value on every frame; state is written at most
+    once every ``SHOT_SENSOR_INTERVAL`` seconds during a shot, and once more
+    with the final value when it ends.
+    """
+
+    def __init__(
+        self,
+        coordinator: GaggiMateCoordinator,
+        entry: ConfigEntry,
+        sensor_id: str,
+        name: str,
+        key: str,
+    ) -> None:
+        """Initialize the shot sensor."""
+        super().__init__(coordinator, entry, sensor_id, name)
+        self._key = key
+        self._last_write = 0.0
+        if key == "water":
+            # Grows during a shot and resets at the next one, which Home
+            # Assistant treats as a new meter cycle
+            self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+            self._attr_icon = "mdi:water"
+            self._attr_device_class = SensorDeviceClass.VOLUME
+            self._attr_native_unit_of_measurement = UnitOfVolume.MILLILITERS
+        else:
+            self._attr_state_class = SensorStateClass.MEASUREMENT
+            self._attr_icon = "mdi:timer-outline"
+            self._attr_device_class = SensorDeviceClass.DURATION
+            self._attr_native_unit_of_measurement = UnitOfTime.SECONDS
+        self._attr_native_value = self._read_value()
+
+    def _read_value(self) -> float:
+        """Return the current value rounded for display."""
+        return round(self.coordinator.shot_recorder.shot_stats[self._key], 1)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state when the value changed, throttled during a shot."""
+        value = self._read_value()
+        if value == self._attr_native_value:
+            return
+        now = time.monotonic()
+        if self.coordinator.shot_recorder.recording and now - self._last_write < SHOT_SENSOR_INTERVAL:
+            return
+        self._last_write = now
+        self._attr_native_value = value
+        self.async_write_ha_state()
+
+
+class GaggiMateReferenceSensor(GaggiMateSensorBase):
+    """Comparison of the current or last shot with its profile's reference shot.
+
+    State is only written when the rounded comparison changes.
+    """
+
+    def __init__(
+        self,
+        coordinator: GaggiMateCoordinator,
+        entry: ConfigEntry,
+        sensor_id: str,
+        name: str,
+        key: str,
+        unit: str,
+    ) -> None:
+        """Initialize the reference sensor."""
+        super().__init__(coordinator, entry, sensor_id, name)
+        self._key = key
+        self._attr_icon = "mdi:compare-horizontal"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_native_value = self._read_value()
+
+    def _read_value(self) -> float | None:
+        """Return the current comparison value."""
+        comparison = self.coordinator.shot_recorder.comparison
+        return comparison[self._key] if comparison is not None else None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state when the comparison changed."""
+        value = self._read_value()
+        if value == self._attr_native_value:
+            return
+        self._attr_native_value = value
+        comparison = self.coordinator.shot_recorder.comparison
+        self._attr_extra_state_attributes = {
+            "reference_id": comparison["reference_id"] if comparison else None
+        }
+        self.async_write_ha_state()
+
+
 class GaggiMateVersionSensor(GaggiMateSensorBase):
     """Version sensor for GaggiMate."""
 
@@ -308,3 +515,144 @@ class GaggiMateUpdateProgressSensor(GaggiMateSensorBase):
         if self.coordinator.data.get("updating"):
             return self.coordinator.data.get("progress", 0)
         return None
+
+
+class GaggiMateMemorySensor(GaggiMateSensorBase):
+    """Diagnostic sensor reporting the memory held for the device.
+
+    Usage is only measured every ``MEMORY_CHECK_INTERVAL`` seconds, so state
+    is written when the measured total changed rather than on every frame.
+    """
+
+    def __init__(
+        self,
+        coordinator: GaggiMateCoordinator,
+        entry: ConfigEntry,
+    ) -> None:
+        """Initialize the memory sensor."""
+        super().__init__(coordinator, entry, "memory_usage", "Memory Usage")
+        self._attr_icon = "mdi:memory"
+        self._attr_device_class = SensorDeviceClass.DATA_SIZE
+        self._attr_native_unit_of_measurement = UnitOfInformation.KIBIBYTES
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._last_total: int | None = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only after a memory check changed the total."""
+        total = self.coordinator.memory.total
+        if total == self._last_total:
+            return
+        self._last_total = total
+        super()._handle_coordinator_update()
+
+    @property
+    def native_value(self) -> float:
+        """Return the state of the sensor."""
+        return round(self.coordinator.memory.total / 1024, 1)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return usage per component, the budget and evictions."""
+        memory = self.coordinator.memory
+        return {
+            "budget": round(memory.budget / 1024, 1),
+            "usage": {name: round(size / 1024, 1) for name, size in memory.usage.items()},
+            "evicted": dict(memory.evicted),
+        }
+
+
+class GaggiMateMetricSensor(GaggiMateSensorBase):
+    """Diagnostic sensor reporting one of the coordinator's hot-path metrics.
+
+    Metrics change on every frame, so state is written at most once every
+    ``METRICS_SENSOR_INTERVAL`` seconds.
+    """
+
+    def __init__(
+        self,
+        coordinator: GaggiMateCoordinator,
+        entry: ConfigEntry,
+        sensor_id: str,
+    ) -> None:
+        """Initialize the metric sensor."""
+        name, unit, state_class, value_fn = METRIC_SENSORS[sensor_id]
+        super().__init__(coordinator, entry, sensor_id, name)
+        self._value_fn = value_fn
+        self._last_write = 0.0
+        self._attr_icon = "mdi:chart-timeline-variant"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = state_class
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._attr_entity_registry_enabled_default = False
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state at most once per metrics interval."""
+        now = time.monotonic()
+        if now - self._last_write < METRICS_SENSOR_INTERVAL:
+            return
+        self._last_write = now
+        super()._handle_coordinator_update()
+
+    @property
+    def native_value(self) -> float | int | None:
+        """Return the state of the sensor."""
+        return self._value_fn(self.coordinator)
+
+
+class GaggiMateTrendSensor(GaggiMateSensorBase):
+    """Sensor reporting a shot trend over the last ``TRENDS_SENSOR_DAYS`` days.
+
+    Trends only change when a shot is recorded or a day drops out of the
+    window, so status frames are ignored.
+    """
+
+    def __init__(
+        self,
+        coordinator: GaggiMateCoordinator,
+        entry: ConfigEntry,
+        sensor_id: str,
+    ) -> None:
+        """Initialize the trend sensor."""
+        name, metric, unit = TREND_SENSORS[sensor_id]
+        super().__init__(coordinator, entry, sensor_id, name)
+        self._metric = metric
+        self._attr_icon = "mdi:chart-line"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_entity_registry_enabled_default = False
+        self._update_value()
+
+    async def async_added_to_hass(self) -> None:
+        """Follow new shots and the daily window rollover."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self.coordinator.trends.async_add_listener(self._handle_trends_update))
+        self.async_on_remove(
+            async_track_time_change(self.hass, self._handle_trends_update, hour=0, minute=0, second=0)
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Ignore status frames."""
+
+    @callback
+    def _handle_trends_update(self, _now: Any = None) -> None:
+        """Recompute the trend and write state."""
+        self._update_value()
+        self.async_write_ha_state()
+
+    def _update_value(self) -> None:
+        """Recompute the trend from the daily buckets."""
+        trend = self.coordinator.trends.recent(TRENDS_SENSOR_DAYS)
+        if self._metric is None:
+            self._attr_native_value = trend["shots"]
+            self._attr_extra_state_attributes = {}
+            return
+        stats = trend[self._metric]
+        self._attr_native_value = stats["mean"] if stats else None
+        self._attr_extra_state_attributes = {
+            "std": stats["std"] if stats else None,
+            "shots": trend["shots"],
+        }
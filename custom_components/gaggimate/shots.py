@@ -0,0 +1,350 @@
+"""Shot recording for GaggiMate."""
+from __future__ import annotations
+
+import logging
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    DOWNSAMPLE_CACHE_SIZE,
+    EVENT_SHOT_FINISHED,
+    EVENT_SHOT_PHASE_CHANGED,
+    EVENT_SHOT_STARTED,
+    MAX_STORED_SHOTS,
+    MODE_BREW,
+    PHASE_EXTRACTION,
+    PHASE_PREINFUSION,
+    PREINFUSION_END_PRESSURE,
+    SHOT_END_DELAY,
+    SHOT_MIN_DURATION,
+    SHOT_START_FLOW,
+    SHOT_START_PRESSURE,
+    SHOT_STOP_FLOW,
+    SHOT_STOP_PRESSURE,
+    SHOTS_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+from .downsample import downsample_columns
+from .jobs import PRIORITY_INTERACTIVE, AnalyticsScheduler
+from .reference import ShotAligner
+
+_LOGGER = logging.getLogger(__name__)
+
+# Status keys recorded as columns for every frame of a shot
+SHOT_CHANNELS = ("pr", "fl", "cw", "ct")
+
+
+class ShotRecorder:
+    """Record brew shots from status frames and keep a persistent archive.
+
+    Shots are stored column-wise: a ``t`` list of seconds since shot start
+    and one list per channel in ``SHOT_CHANNELS``.
+
+    Shot start, the end of pre-infusion and shot end are announced on the
+    event bus from the frame that caused them.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, scheduler: AnalyticsScheduler) -> None:
+        """Initialize the recorder."""
+        self.hass = hass
+        self.entry_id = entry_id
+        self._scheduler = scheduler
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.shots"
+        )
+        self._shots: list[dict[str, Any]] = []
+        self._current: dict[str, Any] | None = None
+        self._start_time: float = 0.0
+        self._last_active: float = 0.0
+        # Idle frames of the current shot, recorded only if the shot resumes
+        self._idle: list[tuple[dict[str, Any], float]] = []
+        self._downsampled: OrderedDict[tuple[str, int], dict[str, Any]] = OrderedDict()
+        self._shot_listeners: list[Callable[[dict[str, Any]], None]] = []
+        self._references: dict[str, str] = {}
+        self._aligner: ShotAligner | None = None
+        # Live values of the current or last shot, updated on every frame
+        self.shot_stats: dict[str, float] = {"elapsed": 0.0, "preinfusion": 0.0, "water": 0.0}
+        self._last_flow: tuple[float, float] | None = None
+        self._preinfusing = False
+        self.phase: str | None = None
+        # Device registry ID included in events, set once the device exists
+        self.device_id: str | None = None
+
+    @property
+    def shots(self) -> list[dict[str, Any]]:
+        """Return recorded shots, oldest first."""
+        return self._shots
+
+    @property
+    def recording(self) -> bool:
+        """Return true while a shot is being recorded."""
+        return self._current is not None
+
+    @property
+    def comparison(self) -> dict[str, Any] | None:
+        """Return the comparison of the current or last shot with its reference."""
+        return self._aligner.as_dict() if self._aligner is not None else None
+
+    @callback
+    def async_add_shot_listener(
+        self, listener: Callable[[dict[str, Any]], None]
+    ) -> CALLBACK_TYPE:
+        """Call ``listener`` with every shot added to the archive."""
+        self._shot_listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            self._shot_listeners.remove(listener)
+
+        return remove_listener
+
+    def shots_for_profile(self, profile: str) -> list[dict[str, Any]]:
+        """Return recorded shots pulled with the given profile label."""
+        return [shot for shot in self._shots if shot.get("profile") == profile]
+
+    def get_shot(self, shot_id: str) -> dict[str, Any] | None:
+        """Return a recorded shot by ID."""
+        for shot in self._shots:
+            if shot["id"] == shot_id:
+                return shot
+        return None
+
+    @property
+    def downsampled_cache(self) -> OrderedDict[tuple[str, int], dict[str, Any]]:
+        """Return the cache of downsampled shots, least recently used first."""
+        return self._downsampled
+
+    def evict_cached(self) -> bool:
+        """Drop the least recently used downsampled shot."""
+        if not self._downsampled:
+            return False
+        self._downsampled.popitem(last=False)
+        return True
+
+    def evict_oldest_shot(self) -> bool:
+        """Drop the oldest recorded shot, always keeping the latest one."""
+        if len(self._shots) <= 1:
+            return False
+        del self._shots[0]
+        self._store.async_delay_save(self._data_to_save, SHOTS_SAVE_DELAY)
+        return True
+
+    def reference_for(self, profile: str | None) -> dict[str, Any] | None:
+        """Return the reference shot of a profile.
+
+        This is the shot chosen with ``set_reference`` while it is still in
+        the archive, otherwise the latest shot pulled with the profile.
+        """
+        shot = self.get_shot(self._references.get(profile, ""))
+        if shot is not None:
+            return shot
+        shots = self.shots_for_profile(profile)
+        return shots[-1] if shots else None
+
+    def set_reference(self, shot: dict[str, Any]) -> None:
+        """Use ``shot`` as the reference for its profile."""
+        self._references[shot["profile"]] = shot["id"]
+        self._store.async_delay_save(self._data_to_save, SHOTS_SAVE_DELAY)
+
+    async def async_get_downsampled(self, shot: dict[str, Any], points: int) -> dict[str, Any]:
+        """Return a recorded shot with its channels downsampled to ``points``.
+
+        Recorded shots never change, so results are cached per shot and
+        point count.
+        """
+        key = (shot["id"], points)
+        cached = self._downsampled.get(key)
+        if cached is not None:
+            self._downsampled.move_to_end(key)
+            return cached
+
+        series = await self._scheduler.async_run(
+            "downsample",
+            downsample_columns,
+            shot["t"],
+            {channel: shot[channel] for channel in SHOT_CHANNELS},
+            points,
+            priority=PRIORITY_INTERACTIVE,
+            key=key,
+        )
+        result = {
+            **{name: value for name, value in shot.items() if name != "t" and name not in SHOT_CHANNELS},
+            "points": len(series["t"]),
+            "recorded_points": len(shot["t"]),
+            **series,
+        }
+        self._downsampled[key] = result
+        if len(self._downsampled) > DOWNSAMPLE_CACHE_SIZE:
+            self._downsampled.popitem(last=False)
+        return result
+
+    async def async_load(self) -> None:
+        """Load the shot archive from storage."""
+        stored = await self._store.async_load()
+        if stored is not None:
+            self._shots = stored.get("shots", [])
+            self._references = stored.get("references", {})
+        _LOGGER.debug("Loaded %d recorded shots", len(self._shots))
+
+    async def async_save(self) -> None:
+        """Write the shot archive to storage immediately."""
+        await self._store.async_save(self._data_to_save())
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return {"shots": self._shots, "references": self._references}
+
+    def process_status(self, data: dict[str, Any], now: float) -> None:
+        """Feed a merged status frame received at monotonic time ``now``.
+
+        A shot starts above the start thresholds and ends once it has stayed
+        below the lower stop thresholds for ``SHOT_END_DELAY`` or leaves Brew
+        mode, so readings hovering around one threshold or a short pause
+        cannot split a shot. Frames below the stop thresholds are held back
+        until the shot resumes, so the idle tail of a finished shot is never
+        recorded or counted.
+        """
+        brewing = data.get("m") == MODE_BREW
+        pressure, flow = data.get("pr") or 0, data.get("fl") or 0
+
+        if self._current is None:
+            if brewing and (pressure >= SHOT_START_PRESSURE or flow >= SHOT_START_FLOW):
+                self._start(data, now)
+            return
+
+        if brewing and (pressure >= SHOT_STOP_PRESSURE or flow >= SHOT_STOP_FLOW):
+            for frame, received in self._idle:
+                self._append(frame, received)
+            self._idle.clear()
+            self._append(data, now)
+            self._last_active = now
+        elif brewing and now - self._last_active < SHOT_END_DELAY:
+            self._idle.append((data, now))
+        else:
+            self._finish()
+
+    def _start(self, data: dict[str, Any], now: float) -> None:
+        """Start recording a new shot."""
+        self._start_time = now
+        self._last_active = now
+        self._idle.clear()
+        self._current = {
+            "id": uuid.uuid4().hex,
+            "profile": data.get("p"),
+            "started": dt_util.utcnow().isoformat(),
+            "target_temperature": data.get("tt"),
+            "target_weight": data.get("tw"),
+            "t": [],
+            **{channel: [] for channel in SHOT_CHANNELS},
+        }
+        self.shot_stats = {"elapsed": 0.0, "preinfusion": 0.0, "water": 0.0}
+        self._last_flow = None
+        self._preinfusing = True
+        self.phase = PHASE_PREINFUSION
+        reference = self.reference_for(data.get("p"))
+        self._aligner = ShotAligner(reference) if reference is not None else None
+        self._append(data, now)
+        self._fire(
+            EVENT_SHOT_STARTED,
+            {
+                "shot_id": self._current["id"],
+                "profile": self._current["profile"],
+                "phase": self.phase,
+                "target_temperature": self._current["target_temperature"],
+                "target_weight": self._current["target_weight"],
+            },
+        )
+        _LOGGER.debug("Shot started with profile %s", data.get("p"))
+
+    def _append(self, data: dict[str, Any], now: float) -> None:
+        """Append one frame to the current shot."""
+        shot = self._current
+        shot["t"].append(round(now - self._start_time, 3))
+        for channel in SHOT_CHANNELS:
+            value = data.get(channel)
+            shot[channel].append(round(value, 3) if value is not None else None)
+        if self._aligner is not None:
+            self._aligner.update(now - self._start_time, data)
+
+        # Trapezoidal integration of flow over frame timestamps
+        stats = self.shot_stats
+        flow = max(data.get("fl") or 0.0, 0.0)
+        if self._last_flow is not None:
+            last_time, last_flow = self._last_flow
+            stats["water"] += (flow + last_flow) / 2 * (now - last_time)
+        self._last_flow = (now, flow)
+        stats["elapsed"] = now - self._start_time
+        if self._preinfusing:
+            if (data.get("pr") or 0) >= PREINFUSION_END_PRESSURE:
+                self._preinfusing = False
+                self.phase = PHASE_EXTRACTION
+                if len(shot["t"]) > 1:
+                    self._fire(
+                        EVENT_SHOT_PHASE_CHANGED,
+                        {
+                            "shot_id": shot["id"],
+                            "profile": shot["profile"],
+                            "phase": PHASE_EXTRACTION,
+                            "previous_phase": PHASE_PREINFUSION,
+                            "elapsed": round(stats["elapsed"], 1),
+                        },
+                    )
+            else:
+                stats["preinfusion"] = stats["elapsed"]
+
+    def _finish(self) -> None:
+        """Close the current shot and store it if it was long enough."""
+        shot, self._current = self._current, None
+        self._idle.clear()
+        end = shot["t"][-1]
+        shot["duration"] = end
+        shot["preinfusion"] = round(self.shot_stats["preinfusion"], 1)
+        shot["water"] = round(self.shot_stats["water"], 1)
+        self.phase = None
+        recorded = end >= SHOT_MIN_DURATION
+        if recorded:
+            self._shots.append(shot)
+            del self._shots[:-MAX_STORED_SHOTS]
+            self._store.async_delay_save(self._data_to_save, SHOTS_SAVE_DELAY)
+            _LOGGER.info("Recorded %.1fs shot with profile %s", end, shot["profile"])
+            for listener in list(self._shot_listeners):
+                # A failing listener must not cost the others or the finished event
+                try:
+                    listener(shot)
+                except Exception:  # noqa: BLE001
+                    _LOGGER.exception("Error in shot listener %s", listener)
+        else:
+            _LOGGER.debug("Discarding %.1fs shot, shorter than %.1fs", end, SHOT_MIN_DURATION)
+        self._fire(EVENT_SHOT_FINISHED, self._summary(shot, recorded))
+
+    def _summary(self, shot: dict[str, Any], recorded: bool) -> dict[str, Any]:
+        """Return the payload of the shot finished event."""
+        weights = [value for value in shot["cw"] if value is not None]
+        pressures = [value for value in shot["pr"] if value is not None]
+        return {
+            "shot_id": shot["id"],
+            "profile": shot["profile"],
+            "started": shot["started"],
+            "duration": round(shot["duration"], 1),
+            "preinfusion": shot["preinfusion"],
+            "yield": weights[-1] if weights else None,
+            "water": shot["water"],
+            "peak_pressure": max(pressures) if pressures else None,
+            "target_temperature": shot["target_temperature"],
+            "target_weight": shot["target_weight"],
+            "recorded": recorded,
+            "reference": self.comparison,
+        }
+
+    def _fire(self, event_type: str, data: dict[str, Any]) -> None:
+        """Fire a shot lifecycle event for this device."""
+        self.hass.bus.async_fire(
+            event_type, {"device_id": self.device_id, "entry_id": self.entry_id, **data}
+        )
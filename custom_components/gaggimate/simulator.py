@@ -0,0 +1,263 @@
+"""Offline shot simulator for GaggiMate profiles.
+
+The model is deliberately simple so that dozens of profile variants can be
+evaluated in a few milliseconds:
+
+* The pump drives pressure towards the phase setpoint as a first-order lag
+  with time constant ``tau``.
+* The puck is a conductance that changes linearly over the shot, so
+  ``flow = (c0 + c1 * t) * pressure``.
+* Yield is the pumped volume minus the water retained by the puck
+  (``v0``), scaled by ``eta``.
+
+All parameters are fitted from shots recorded with the same profile.
+Everything in this module is synchronous and must run in an executor.
+"""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import numpy as np
+
+SIM_STEP = 0.1  # seconds
+OUTPUT_STEP = 0.5  # seconds between returned curve points
+PUMP_MAX_PRESSURE = 9.0  # bar at 100% pump power for simple profiles
+MAX_PRESSURE = 12.0  # bar
+MIN_CONDUCTANCE = 0.01  # ml/s per bar
+MIN_FIT_SAMPLES = 10
+TAU_CANDIDATES = np.linspace(0.2, 5.0, 49)
+
+
+@dataclass
+class PuckModel:
+    """Fitted pump and puck parameters."""
+
+    tau: float = 1.5
+    c0: float = 0.22
+    c1: float = 0.002
+    eta: float = 0.85
+    v0: float = 6.0
+
+
+def _as_array(values: list[float | None]) -> np.ndarray:
+    """Convert a recorded column to a float array with NaN for gaps."""
+    return np.array(values, dtype=float)
+
+
+def profile_schedule(
+    profile: dict[str, Any], step: float = SIM_STEP
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the per-step setpoint and a mask of flow-controlled steps."""
+    values: list[np.ndarray] = []
+    flags: list[np.ndarray] = []
+    previous_value = 0.0
+    previous_flow = False
+
+    for phase in profile.get("phases", []):
+        duration = float(phase.get("duration") or 0)
+        if duration <= 0:
+            continue
+
+        pump = phase.get("pump", 100)
+        if isinstance(pump, dict):
+            is_flow = pump.get("target") == "flow"
+            value = float(pump.get("flow" if is_flow else "pressure") or 0)
+        else:
+            is_flow = False
+            value = float(pump) / 100 * PUMP_MAX_PRESSURE
+
+        n = max(int(round(duration / step)), 1)
+        local = np.arange(n) * step
+        phase_values = np.full(n, value)
+
+        transition = phase.get("transition") or {}
+        ramp = min(float(transition.get("duration") or 0), duration)
+        if transition.get("type", "instant") != "instant" and ramp > 0 and is_flow == previous_flow:
+            ramping = local < ramp
+            phase_values[ramping] = previous_value + (value - previous_value) * local[ramping] / ramp
+
+        values.append(phase_values)
+        flags.append(np.full(n, is_flow))
+        previous_value, previous_flow = value, is_flow
+
+    if not values:
+        raise ValueError("Profile has no timed phases")
+
+    return np.concatenate(values), np.concatenate(flags)
+
+
+def variant_schedules(
+    setpoint: np.ndarray,
+    is_flow: np.ndarray,
+    variants: list[dict[str, Any]],
+) -> tuple[np.ndarray, np.ndarray]:
+    """Build a (variants, steps) setpoint matrix for scaled profile variants."""
+    time_scale = np.array([float(v.get("time_scale", 1.0)) for v in variants])
+    pressure_scale = np.array([float(v.get("pressure_scale", 1.0)) for v in variants])
+    flow_scale = np.array([float(v.get("flow_scale", 1.0)) for v in variants])
+
+    base_steps = setpoint.size
+    steps = int(np.ceil(base_steps * time_scale.max()))
+    # Index into the base schedule for every variant at every step
+    index = np.floor(np.arange(steps)[None, :] / time_scale[:, None]).astype(int)
+    running = index < base_steps
+    index = np.minimum(index, base_steps - 1)
+
+    flow_mask = is_flow[index]
+    scale = np.where(flow_mask, flow_scale[:, None], pressure_scale[:, None])
+    targets = np.where(running, setpoint[index] * scale, 0.0)
+    return targets, flow_mask & running
+
+
+def simulate(
+    model: PuckModel,
+    targets: np.ndarray,
+    is_flow: np.ndarray,
+    step: float = SIM_STEP,
+    tau: float | np.ndarray | None = None,
+) -> dict[str, np.ndarray]:
+    """Simulate pressure, flow and yield for every row of ``targets``."""
+    rows, steps = targets.shape
+    time = np.arange(steps) * step
+    conductance = np.maximum(model.c0 + model.c1 * time, MIN_CONDUCTANCE)
+    setpoint = np.clip(np.where(is_flow, targets / conductance, targets), 0.0, MAX_PRESSURE)
+
+    alpha = 1.0 - np.exp(-step / np.asarray(model.tau if tau is None else tau, dtype=float))
+    pressure = np.empty((rows, steps))
+    current = np.zeros(rows)
+    for k in range(steps):
+        current += alpha * (setpoint[:, k] - current)
+        pressure[:, k] = current
+
+    flow = pressure * conductance
+    volume = np.cumsum(flow, axis=1) * step
+    weight = np.maximum(volume - model.v0, 0.0) * model.eta
+    return {"time": time, "pressure": pressure, "flow": flow, "yield": weight}
+
+
+def _cumulative_volume(time: np.ndarray, flow: np.ndarray) -> np.ndarray:
+    """Integrate flow over time with the trapezoidal rule."""
+    flow = np.nan_to_num(flow)
+    increments = np.diff(time) * (flow[1:] + flow[:-1]) / 2
+    return np.concatenate(([0.0], np.cumsum(increments)))
+
+
+def fit_model(
+    shots: list[dict[str, Any]],
+    setpoint: np.ndarray,
+    is_flow: np.ndarray,
+    step: float = SIM_STEP,
+) -> PuckModel:
+    """Fit a puck model to recorded shots of one profile."""
+    model = PuckModel()
+    if not shots:
+        return model
+
+    columns = [
+        {key: _as_array(shot[key]) for key in ("t", "pr", "fl", "cw")} for shot in shots
+    ]
+    time = np.concatenate([c["t"] for c in columns])
+    pressure = np.concatenate([c["pr"] for c in columns])
+    flow = np.concatenate([c["fl"] for c in columns])
+
+    # Conductance: fl = c0 * pr + c1 * t * pr
+    mask = np.isfinite(pressure) & np.isfinite(flow) & (pressure > 0.5)
+    if mask.sum() >= MIN_FIT_SAMPLES:
+        design = np.column_stack((pressure[mask], time[mask] * pressure[mask]))
+        (c0, c1), *_ = np.linalg.lstsq(design, flow[mask], rcond=None)
+        if c0 > MIN_CONDUCTANCE:
+            model.c0, model.c1 = float(c0), float(c1)
+
+    # Yield: cw = eta * (volume - v0) once drops reach the cup
+    volume = np.concatenate([_cumulative_volume(c["t"], c["fl"]) for c in columns])
+    weight = np.concatenate([c["cw"] for c in columns])
+    mask = np.isfinite(weight) & (weight > 1.0)
+    if mask.sum() >= MIN_FIT_SAMPLES:
+        slope, intercept = np.polyfit(volume[mask], weight[mask], 1)
+        if 0.3 < slope < 1.5 and intercept <= 0:
+            model.eta, model.v0 = float(slope), float(-intercept / slope)
+
+    # Pump lag: simulate every candidate at once and keep the best match
+    targets = np.broadcast_to(setpoint, (TAU_CANDIDATES.size, setpoint.size))
+    flags = np.broadcast_to(is_flow, targets.shape)
+    candidates = simulate(model, targets, flags, step, tau=TAU_CANDIDATES)
+    errors = np.zeros(TAU_CANDIDATES.size)
+    for c in columns:
+        valid = np.isfinite(c["pr"]) & (c["t"] <= candidates["time"][-1])
+        if not valid.any():
+            continue
+        index = np.minimum(np.round(c["t"][valid] / step).astype(int), setpoint.size - 1)
+        errors += np.mean((candidates["pressure"][:, index] - c["pr"][valid]) ** 2, axis=1)
+    if errors.any():
+        model.tau = float(TAU_CANDIDATES[np.argmin(errors)])
+
+    return model
+
+
+def fit_error(
+    model: PuckModel,
+    shots: list[dict[str, Any]],
+    setpoint: np.ndarray,
+    is_flow: np.ndarray,
+    step: float = SIM_STEP,
+) -> dict[str, float | int | None]:
+    """Return the RMS error of the baseline simulation against recorded shots."""
+    result = simulate(model, setpoint[None, :], is_flow[None, :], step)
+    errors: dict[str, list[float]] = {"pressure": [], "flow": [], "yield": []}
+
+    for shot in shots:
+        time = _as_array(shot["t"])
+        for channel, key in (("pressure", "pr"), ("flow", "fl"), ("yield", "cw")):
+            actual = _as_array(shot[key])
+            valid = np.isfinite(actual) & (time <= result["time"][-1])
+            if not valid.any():
+                continue
+            predicted = np.interp(time[valid], result["time"], result[channel][0])
+            errors[channel].append(float(np.sqrt(np.mean((predicted - actual[valid]) ** 2))))
+
+    return {
+        "shots": len(shots),
+        **{
+            channel: round(float(np.mean(values)), 3) if values else None
+            for channel, values in errors.items()
+        },
+    }
+
+
+def run_simulation(
+    profile: dict[str, Any],
+    shots: list[dict[str, Any]],
+    variants: list[dict[str, Any]] | None = None,
+    target_weight: float | None = None,
+) -> dict[str, Any]:
+    """Fit a model for a profile and simulate the requested variants."""
+    setpoint, is_flow = profile_schedule(profile)
+    model = fit_model(shots, setpoint, is_flow)
+
+    variants = variants or [{}]
+    targets, flags = variant_schedules(setpoint, is_flow, variants)
+    result = simulate(model, targets, flags)
+
+    stride = max(int(round(OUTPUT_STEP / SIM_STEP)), 1)
+    curves = []
+    for row, variant in enumerate(variants):
+        curve: dict[str, Any] = {
+            "label": variant.get("label", f"variant_{row}"),
+            "time": np.round(result["time"][::stride], 2).tolist(),
+            "pressure": np.round(result["pressure"][row, ::stride], 2).tolist(),
+            "flow": np.round(result["flow"][row, ::stride], 2).tolist(),
+            "yield": np.round(result["yield"][row, ::stride], 1).tolist(),
+        }
+        if target_weight is not None:
+            reached = np.flatnonzero(result["yield"][row] >= target_weight)
+            curve["time_to_target"] = (
+                round(float(result["time"][reached[0]]), 1) if reached.size else None
+            )
+        curves.append(curve)
+
+    return {
+        "model": {key: round(value, 4) for key, value in asdict(model).items()},
+        "fit_error": fit_error(model, shots, setpoint, is_flow),
+        "variants": curves,
+    }
@@ -12,6 +12,7 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN, MODE_STANDBY, MODE_BREW
 from .coordinator import GaggiMateCoordinator
+from .entity import StateWriteCounter
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -27,7 +28,7 @@ async def async_setup_entry(
     async_add_entities([GaggiMatePowerSwitch(coordinator, entry)])
 
 
-class GaggiMatePowerSwitch(CoordinatorEntity[GaggiMateCoordinator], SwitchEntity):
+class GaggiMatePowerSwitch(StateWriteCounter, CoordinatorEntity[GaggiMateCoordinator], SwitchEntity):
     """Power switch for GaggiMate.
     
     CRITICAL BEHAVIOR:
@@ -0,0 +1,235 @@
+"""Cross-shot trend analytics for GaggiMate.
+
+Every recorded shot is reduced once to a small summary (shot time, yield,
+yield against target, peak pressure and temperature error). Summaries are
+kept for far longer than the full shot archive and folded into per-profile
+daily buckets holding the count, sum and sum of squares of every metric, so
+means and spreads for any day, week or the whole period are a few array
+additions instead of a rescan of the shots.
+"""
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from datetime import date, timedelta
+from typing import Any
+
+import numpy as np
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, MAX_SHOT_SUMMARIES, SHOTS_SAVE_DELAY, STORAGE_VERSION
+from .jobs import PRIORITY_BACKGROUND, PRIORITY_LIVE, AnalyticsScheduler, SchedulerClosed
+
+_LOGGER = logging.getLogger(__name__)
+
+TREND_METRICS = ("duration", "yield", "yield_ratio", "peak_pressure", "temperature_error")
+TREND_GROUPS = ("day", "week", "device")
+
+
+def shot_summary(shot: dict[str, Any]) -> dict[str, Any]:
+    """Reduce a recorded shot to its trend metrics."""
+    weights = np.array(shot["cw"], dtype=float)
+    pressures = np.array(shot["pr"], dtype=float)
+    temperatures = np.array(shot["ct"], dtype=float)
+
+    def finite_or_none(value: float) -> float | None:
+        return round(float(value), 3) if np.isfinite(value) else None
+
+    final_weight = weights[np.isfinite(weights)]
+    shot_yield = final_weight[-1] if final_weight.size else np.nan
+    target_weight = shot.get("target_weight") or np.nan
+    target_temperature = shot.get("target_temperature")
+    temperature_error = (
+        np.nanmean(temperatures) - target_temperature
+        if target_temperature is not None and np.isfinite(temperatures).any()
+        else np.nan
+    )
+    return {
+        "id": shot["id"],
+        "profile": shot.get("profile"),
+        "started": shot["started"],
+        "duration": finite_or_none(shot.get("duration", np.nan)),
+        "yield": finite_or_none(shot_yield),
+        "yield_ratio": finite_or_none(shot_yield / target_weight),
+        "peak_pressure": finite_or_none(
+            np.nanmax(pressures) if np.isfinite(pressures).any() else np.nan
+        ),
+        "temperature_error": finite_or_none(temperature_error),
+    }
+
+
+def shot_summaries(shots: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Reduce several recorded shots to their trend metrics."""
+    return [shot_summary(shot) for shot in shots]
+
+
+def _moments(summary: dict[str, Any]) -> np.ndarray:
+    """Return count, sum and sum of squares of each metric of one shot."""
+    values = np.array(
+        [np.nan if summary[m] is None else summary[m] for m in TREND_METRICS], dtype=float
+    )
+    present = np.isfinite(values)
+    values = np.where(present, values, 0.0)
+    return np.stack([present.astype(float), values, values * values], axis=1)
+
+
+def _describe(moments: np.ndarray) -> dict[str, Any]:
+    """Return the shot count and the mean and standard deviation of each metric."""
+    count, total, squares = moments[:, 0], moments[:, 1], moments[:, 2]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+        variance = (squares - total * mean) / (count - 1)
+    std = np.sqrt(np.clip(variance, 0, None))
+    result: dict[str, Any] = {"shots": int(count.max())}
+    for index, metric in enumerate(TREND_METRICS):
+        if count[index] == 0:
+            result[metric] = None
+            continue
+        result[metric] = {
+            "mean": round(float(mean[index]), 3),
+            "std": round(float(std[index]), 3) if count[index] > 1 else None,
+        }
+    return result
+
+
+class ShotTrends:
+    """Keep shot summaries and per-profile daily buckets for one device."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, scheduler: AnalyticsScheduler) -> None:
+        """Initialize the trends."""
+        self.hass = hass
+        self._scheduler = scheduler
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.trends"
+        )
+        self._summaries: list[dict[str, Any]] = []
+        # profile -> day -> moments array (metrics x [count, sum, sum of squares])
+        self._days: dict[str | None, dict[date, np.ndarray]] = {}
+        self._listeners: list[Callable[[], None]] = []
+
+    @property
+    def summaries(self) -> list[dict[str, Any]]:
+        """Return shot summaries, oldest first."""
+        return self._summaries
+
+    def evict_oldest_summary(self) -> bool:
+        """Drop the oldest shot summary.
+
+        The daily buckets keep its totals until the next restart.
+        """
+        if not self._summaries:
+            return False
+        del self._summaries[0]
+        self._store.async_delay_save(self._data_to_save, SHOTS_SAVE_DELAY)
+        return True
+
+    async def async_load(self, shots: list[dict[str, Any]]) -> None:
+        """Load stored summaries and summarize archived shots not seen yet."""
+        stored = await self._store.async_load()
+        if stored is not None:
+            self._summaries = stored.get("summaries", [])
+        known = {summary["id"] for summary in self._summaries}
+        missing = [shot for shot in shots if shot["id"] not in known]
+        if missing:
+            self._summaries.extend(
+                await self._scheduler.async_run(
+                    "shot_summaries", shot_summaries, missing, priority=PRIORITY_BACKGROUND
+                )
+            )
+        self._summaries.sort(key=lambda summary: summary["started"])
+        del self._summaries[:-MAX_SHOT_SUMMARIES]
+        for summary in self._summaries:
+            self._add_to_bucket(summary)
+        if missing:
+            self._store.async_delay_save(self._data_to_save, SHOTS_SAVE_DELAY)
+        _LOGGER.debug(
+            "Loaded %d shot summaries, %d newly summarized", len(self._summaries), len(missing)
+        )
+
+    async def async_save(self) -> None:
+        """Write the summaries to storage immediately."""
+        await self._store.async_save(self._data_to_save())
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return {"summaries": self._summaries}
+
+    @callback
+    def async_add_listener(self, listener: Callable[[], None]) -> CALLBACK_TYPE:
+        """Call ``listener`` whenever a shot was added."""
+        self._listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(listener)
+
+        return remove_listener
+
+    def add_shot(self, shot: dict[str, Any]) -> None:
+        """Summarize a newly recorded shot in the background."""
+        self.hass.async_create_task(self._async_add_shot(shot))
+
+    async def _async_add_shot(self, shot: dict[str, Any]) -> None:
+        """Summarize a shot and fold it into the daily buckets."""
+        try:
+            summary = await self._scheduler.async_run(
+                "shot_summary", shot_summary, shot, priority=PRIORITY_LIVE, key=shot["id"]
+            )
+        except SchedulerClosed:
+            _LOGGER.debug("Not summarizing shot %s, the entry is unloading", shot["id"])
+            return
+        self._summaries.append(summary)
+        del self._summaries[:-MAX_SHOT_SUMMARIES]
+        self._add_to_bucket(summary)
+        self._store.async_delay_save(self._data_to_save, SHOTS_SAVE_DELAY)
+        for listener in self._listeners:
+            listener()
+
+    def _add_to_bucket(self, summary: dict[str, Any]) -> None:
+        """Fold a summary into its profile's daily bucket."""
+        started = dt_util.parse_datetime(summary["started"])
+        day = dt_util.as_local(started).date() if started else dt_util.now().date()
+        days = self._days.setdefault(summary["profile"], {})
+        moments = _moments(summary)
+        if day in days:
+            days[day] += moments
+        else:
+            days[day] = moments
+
+    def query(
+        self, profile: str | None, group_by: str, since: date
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Return trend statistics per profile, grouped by day, week or device."""
+        result: dict[str, list[dict[str, Any]]] = {}
+        for label, days in self._days.items():
+            if profile is not None and label != profile:
+                continue
+            groups: dict[str, np.ndarray] = {}
+            for day, moments in days.items():
+                if day < since:
+                    continue
+                if group_by == "day":
+                    key = day.isoformat()
+                elif group_by == "week":
+                    key = (day - timedelta(days=day.weekday())).isoformat()
+                else:
+                    key = since.isoformat()
+                groups[key] = groups[key] + moments if key in groups else moments.copy()
+            if groups:
+                result[label or "unknown"] = [
+                    {"period": key, **_describe(groups[key])} for key in sorted(groups)
+                ]
+        return result
+
+    def recent(self, days: int) -> dict[str, Any]:
+        """Return statistics over all profiles for the last ``days`` days."""
+        since = dt_util.now().date() - timedelta(days=days - 1)
+        moments = np.zeros((len(TREND_METRICS), 3))
+        for profile_days in self._days.values():
+            for day, day_moments in profile_days.items():
+                if day >= since:
+                    moments += day_moments
+        return _describe(moments)
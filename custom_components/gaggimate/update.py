@@ -16,6 +16,7 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
 from .coordinator import GaggiMateCoordinator
+from .entity import StateWriteCounter
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -31,7 +32,7 @@ async def async_setup_entry(
     async_add_entities([GaggiMateUpdateEntity(coordinator, entry)])
 
 
-class GaggiMateUpdateEntity(CoordinatorEntity[GaggiMateCoordinator], UpdateEntity):
+class GaggiMateUpdateEntity(StateWriteCounter, CoordinatorEntity[GaggiMateCoordinator], UpdateEntity):
     """Update entity for GaggiMate firmware."""
 
     _attr_device_class = UpdateDeviceClass.FIRMWARE
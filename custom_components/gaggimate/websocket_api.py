@@ -0,0 +1,293 @@
+"""Home Assistant WebSocket API for GaggiMate."""
+from __future__ import annotations
+
+import time
+from datetime import timedelta
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import (
+    CONF_MAX_STALENESS,
+    DEFAULT_DEADBANDS,
+    DEFAULT_MAX_STALENESS,
+    DEFAULT_STEPS,
+    MODE_MAP,
+    TELEMETRY_CHANNELS,
+    TELEMETRY_DEFAULT_CHANNELS,
+    TELEMETRY_INTERVAL,
+)
+from .coordinator import GaggiMateCoordinator, find_coordinator
+
+SNAPSHOT_STATUS_KEYS = ("m", "p", "ct", "tt", "pr", "pt", "cw", "tw")
+# Snapshot measurements, rounded and deadbanded like the matching sensors so
+# sensor noise does not produce a delta on every status frame
+SNAPSHOT_MEASUREMENTS = {
+    "ct": "temperature",
+    "tt": "temperature",
+    "pr": "pressure",
+    "pt": "pressure",
+    "cw": "weight",
+    "tw": "weight",
+}
+SNAPSHOT_OTA_KEYS = (
+    "displayVersion",
+    "controllerVersion",
+    "latestVersion",
+    "displayUpdateAvailable",
+    "controllerUpdateAvailable",
+    "updating",
+    "progress",
+)
+
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """Register the GaggiMate WebSocket commands."""
+    websocket_api.async_register_command(hass, ws_subscribe_telemetry)
+    websocket_api.async_register_command(hass, ws_snapshot)
+    websocket_api.async_register_command(hass, ws_subscribe_snapshot)
+
+
+def measurement_filters(
+    hass: HomeAssistant, coordinator: GaggiMateCoordinator
+) -> dict[str, tuple[float, float]]:
+    """Return the configured step and deadband of each snapshot measurement."""
+    entry = hass.config_entries.async_get_entry(coordinator.entry_id)
+    options = entry.options if entry is not None else {}
+    return {
+        key: (
+            options.get(f"{kind}_step", DEFAULT_STEPS[kind]),
+            options.get(f"{kind}_deadband", DEFAULT_DEADBANDS[kind]),
+        )
+        for key, kind in SNAPSHOT_MEASUREMENTS.items()
+    }
+
+
+def device_snapshot(
+    coordinator: GaggiMateCoordinator,
+    filters: dict[str, tuple[float, float]] | None = None,
+) -> dict[str, Any]:
+    """Return everything the dashboard card shows for one device.
+
+    Measurements are rounded to the step in ``filters``, if given.
+    """
+    data = coordinator.data or {}
+    status = {key: data.get(key) for key in SNAPSHOT_STATUS_KEYS}
+    for key, (step, _deadband) in (filters or {}).items():
+        value = status[key]
+        if value is not None and step:
+            status[key] = round(round(value / step) * step, 6)
+    status["mode"] = MODE_MAP.get(data.get("m"))
+    return {
+        "connected": coordinator.connected,
+        "status": status,
+        "ota": {key: data.get(key) for key in SNAPSHOT_OTA_KEYS},
+        "profiles": [
+            {
+                "id": profile.get("id"),
+                "label": profile.get("label"),
+                "selected": profile.get("selected", False),
+            }
+            for profile in coordinator.profiles
+        ],
+    }
+
+
+def max_staleness(hass: HomeAssistant, coordinator: GaggiMateCoordinator) -> float:
+    """Return the configured maximum staleness of filtered measurements."""
+    entry = hass.config_entries.async_get_entry(coordinator.entry_id)
+    options = entry.options if entry is not None else {}
+    return options.get(CONF_MAX_STALENESS, DEFAULT_MAX_STALENESS)
+
+
+def apply_deadbands(
+    old: dict[str, Any],
+    new: dict[str, Any],
+    filters: dict[str, tuple[float, float]],
+    written: dict[str, float],
+    staleness: float,
+    now: float,
+) -> None:
+    """Keep the previous value of measurements that moved less than their deadband.
+
+    Follows the sensors' rule: changes to or from zero or unknown always
+    pass, and so does any change once the value sent last, at the time in
+    ``written``, is older than ``staleness`` seconds.
+    """
+    previous, status = old["status"], new["status"]
+    for key, (_step, deadband) in filters.items():
+        value, last = status[key], previous.get(key)
+        if value == last:
+            continue
+        if (
+            value is None
+            or last is None
+            or value == 0
+            or last == 0
+            or abs(value - last) >= deadband
+            or now - written.get(key, 0.0) >= staleness
+        ):
+            written[key] = now
+        else:
+            status[key] = last
+
+
+def snapshot_delta(old: dict[str, Any], new: dict[str, Any]) -> dict[str, Any]:
+    """Return the parts of a snapshot that changed.
+
+    Changed ``status`` and ``ota`` sections contain only their changed keys;
+    other sections are sent whole.
+    """
+    delta: dict[str, Any] = {}
+    for section, value in new.items():
+        previous = old.get(section)
+        if value == previous:
+            continue
+        if isinstance(value, dict) and isinstance(previous, dict):
+            delta[section] = {
+                key: item for key, item in value.items() if previous.get(key) != item
+            }
+        else:
+            delta[section] = value
+    return delta
+
+
+@callback
+def _async_get_coordinator(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> GaggiMateCoordinator | None:
+    """Return the coordinator for a command, sending an error if it is not loaded."""
+    coordinator = find_coordinator(hass, msg["device_id"])
+    if coordinator is None:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, f"GaggiMate device {msg['device_id']} not found"
+        )
+    return coordinator
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "gaggimate/subscribe_telemetry",
+        vol.Required("device_id"): str,
+        vol.Optional("channels", default=list(TELEMETRY_DEFAULT_CHANNELS)): vol.All(
+            [vol.In(TELEMETRY_CHANNELS)], vol.Length(min=1)
+        ),
+        vol.Optional("interval", default=TELEMETRY_INTERVAL): vol.All(
+            vol.Coerce(float), vol.Range(min=0.05, max=10)
+        ),
+    }
+)
+@callback
+def ws_subscribe_telemetry(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Stream batched status samples for one device.
+
+    Every status frame is sampled straight from the coordinator and sent in
+    column form every ``interval`` seconds: ``t`` holds the sample times in
+    milliseconds since the epoch and each requested channel a list of
+    values. The ``shot`` channel holds the recorded time of the current shot
+    in seconds, or None when no shot is being recorded.
+    """
+    coordinator = _async_get_coordinator(hass, connection, msg)
+    if coordinator is None:
+        return
+    
+    channels: list[str] = msg["channels"]
+    batch: dict[str, list[Any]] = {"t": [], **{channel: [] for channel in channels}}
+    recorder = coordinator.shot_recorder
+    
+    @callback
+    def sample(received: float, data: dict[str, Any]) -> None:
+        batch["t"].append(int(received * 1000))
+        for channel in channels:
+            if channel == "shot":
+                # Not a status key: the recorder's view of the same frame
+                batch[channel].append(
+                    recorder.shot_stats["elapsed"] if recorder.recording else None
+                )
+            else:
+                batch[channel].append(data.get(channel))
+    
+    @callback
+    def flush(_now: Any = None) -> None:
+        if not batch["t"]:
+            return
+        connection.send_message(websocket_api.event_message(msg["id"], dict(batch)))
+        for key in batch:
+            batch[key] = []
+    
+    remove_listener = coordinator.async_add_telemetry_listener(sample)
+    cancel_flush = async_track_time_interval(hass, flush, timedelta(seconds=msg["interval"]))
+    
+    @callback
+    def unsubscribe() -> None:
+        remove_listener()
+        cancel_flush()
+    
+    connection.subscriptions[msg["id"]] = unsubscribe
+    connection.send_result(msg["id"])
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "gaggimate/snapshot",
+        vol.Required("device_id"): str,
+    }
+)
+@callback
+def ws_snapshot(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Return the device snapshot."""
+    coordinator = _async_get_coordinator(hass, connection, msg)
+    if coordinator is None:
+        return
+    connection.send_result(
+        msg["id"], device_snapshot(coordinator, measurement_filters(hass, coordinator))
+    )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "gaggimate/subscribe_snapshot",
+        vol.Required("device_id"): str,
+    }
+)
+@callback
+def ws_subscribe_snapshot(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Send the device snapshot, then only what changes in it.
+
+    The first event carries ``snapshot``; later events carry ``delta`` and
+    are only sent when something the card shows has changed, with
+    measurements filtered like the sensors.
+    """
+    coordinator = _async_get_coordinator(hass, connection, msg)
+    if coordinator is None:
+        return
+    
+    filters = measurement_filters(hass, coordinator)
+    staleness = max_staleness(hass, coordinator)
+    last = device_snapshot(coordinator, filters)
+    written = dict.fromkeys(filters, time.monotonic())
+    
+    @callback
+    def send_delta() -> None:
+        nonlocal last
+        snapshot = device_snapshot(coordinator, filters)
+        apply_deadbands(last, snapshot, filters, written, staleness, time.monotonic())
+        delta = snapshot_delta(last, snapshot)
+        if delta:
+            last = snapshot
+            connection.send_message(websocket_api.event_message(msg["id"], {"delta": delta}))
+    
+    connection.subscriptions[msg["id"]] = coordinator.async_add_listener(send_delta)
+    connection.send_result(msg["id"])
+    connection.send_message(websocket_api.event_message(msg["id"], {"snapshot": last}))
@@ -22,6 +22,23 @@ const getGaggiMateDevices = (hass) => {
     }));
 };
 
+// Device snapshot status key and unit for each sensor suffix
+const SNAPSHOT_KEYS = {
+  current_temperature: "ct", target_temperature: "tt",
+  current_pressure: "pr", target_pressure: "pt",
+  current_weight: "cw", target_weight: "tw",
+};
+const SNAPSHOT_UNITS = { ct: "°C", tt: "°C", pr: "bar", pt: "bar", cw: "g", tw: "g" };
+
+// Live shot graph: channels, fixed vertical ranges and colors
+const GRAPH_CHANNELS = [
+  { key: "pr", label: "Pressure", max: 12, color: null },  // null = accent color
+  { key: "fl", label: "Flow", max: 8, color: "#2196f3" },
+  { key: "cw", label: "Weight", max: 60, color: "#8bc34a" },
+  { key: "ct", label: "Temp", max: 110, color: "#f44336" },
+];
+const GRAPH_MIN_SPAN = 30;        // seconds shown before the time axis grows
+
 // Lighten a hex color by blending with white at the given ratio (0=original, 1=white)
 const lightenColor = (hex, ratio) => {
   const r = parseInt(hex.slice(1, 3), 16);
@@ -76,6 +93,7 @@ class GaggiMateCardEditor extends LitElement {
 
         <div class="sw-row"><span>Show Grinder</span><ha-switch .checked="${this._config.show_grinder !== false}" .configValue="${"show_grinder"}" @change="${this._valueChanged}"></ha-switch></div>
         <div class="sw-row"><span>Show Weight</span><ha-switch .checked="${this._config.show_weight !== false}" .configValue="${"show_weight"}" @change="${this._valueChanged}"></ha-switch></div>
+        <div class="sw-row"><span>Show Shot Graph</span><ha-switch .checked="${this._config.show_graph !== false}" .configValue="${"show_graph"}" @change="${this._valueChanged}"></ha-switch></div>
       </div>`;
   }
 
@@ -102,12 +120,21 @@ class GaggiMateCard extends LitElement {
       hass: {},
       config: {},
       _dragTgt: { type: Number },   // live drag value (null when not dragging)
+      _snapshot: { attribute: false },  // device snapshot from gaggimate/subscribe_snapshot
     };
   }
 
   constructor() {
     super();
     this._dragTgt = null;
+    this._snapshot = null;
+    this._unsub = null;
+    this._unsubTelemetry = null;
+    this._shot = this._emptyShot();
+    this._graphFrame = null;
+    this._graphFull = false;
+    this._graphCanvas = null;
+    this._graphObserver = null;
     this._dragMax = 110;
     this._dragBound = {
       move: this._onDragMove.bind(this),
@@ -119,19 +146,226 @@ class GaggiMateCard extends LitElement {
 
   static getStubConfig(hass) {
     const dev = getGaggiMateDevices(hass)[0];
-    return { device_name: dev?.slug || "", name: dev?.name || "GaggiMate", show_grinder: true, show_weight: true };
+    return { device_name: dev?.slug || "", name: dev?.name || "GaggiMate", show_grinder: true, show_weight: true, show_graph: true };
+  }
+
+  setConfig(config) {
+    if (this.config && this.config.device_name !== config.device_name) this._unsubscribe();
+    this.config = config;
+  }
+
+  connectedCallback() {
+    super.connectedCallback();
+    this._subscribe();
+  }
+
+  disconnectedCallback() {
+    super.disconnectedCallback();
+    this._unsubscribe();
+  }
+
+  // hass changes on every state change in the house; only render when one of
+  // this device's entities changed (or never, once the snapshot drives the card)
+  shouldUpdate(changed) {
+    if (!changed.has("hass") || changed.size > 1) return true;
+    const old = changed.get("hass");
+    if (!old || !this.config?.device_name) return true;
+    if (this._snapshot) return false;
+    return this._watchedEntities().some(id => old.states[id] !== this.hass.states[id]);
+  }
+
+  _watchedEntities() {
+    const slug = this.config.device_name;
+    return [
+      ...Object.keys(SNAPSHOT_KEYS).map(suffix => `sensor.${slug}_${suffix}`),
+      `select.${slug}_mode`,
+      `select.${slug}_profile`,
+    ];
+  }
+
+  updated() {
+    this._subscribe();
+    this._attachGraph();
+  }
+
+  // Receive the whole device in one snapshot, then only its deltas.
+  // Integrations without the snapshot API fall back to entity states.
+  _subscribe() {
+    if (!this.hass?.connection || !this.config?.device_name) return;
+    if (!this._unsubTelemetry && this.config.show_graph !== false) {
+      this._unsubTelemetry = this.hass.connection
+        .subscribeMessage((msg) => this._onTelemetry(msg), {
+          type: "gaggimate/subscribe_telemetry",
+          device_id: this.config.device_name,
+          channels: ["shot", ...GRAPH_CHANNELS.map(c => c.key)],
+        })
+        .catch(() => null);
+    }
+    if (this._unsub) return;
+    this._unsub = this.hass.connection
+      .subscribeMessage((msg) => this._onSnapshot(msg), {
+        type: "gaggimate/subscribe_snapshot",
+        device_id: this.config.device_name,
+      })
+      .catch((err) => {
+        console.warn("GaggiMate card: snapshot unavailable, reading entity states", err);
+        return null;
+      });
+  }
+
+  async _unsubscribe() {
+    const pending = [this._unsub, this._unsubTelemetry];
+    this._unsub = null;
+    this._unsubTelemetry = null;
+    this._snapshot = null;
+    this._shot = this._emptyShot();
+    this._graphObserver?.disconnect();
+    this._graphObserver = null;
+    this._graphCanvas = null;
+    for (const unsub of pending) {
+      const unsubscribe = unsub && await unsub;
+      if (unsubscribe) unsubscribe();
+    }
+  }
+
+  // --- Live shot graph ---
+  _emptyShot() {
+    return { recording: false, t: [], values: Object.fromEntries(GRAPH_CHANNELS.map(c => [c.key, []])) };
   }
 
-  setConfig(config) { this.config = config; }
+  // Append a batch of telemetry samples. Shot boundaries come from the
+  // integration's shot recorder through the "shot" channel, so the graph
+  // shows exactly the frames of the recorded shot; the last shot stays up
+  // until the next one starts.
+  _onTelemetry(batch) {
+    let appended = false;
+    for (let i = 0; i < batch.t.length; i++) {
+      const elapsed = batch.shot[i];
+      if (elapsed === null || elapsed === undefined) {
+        this._shot.recording = false;
+        continue;
+      }
+      let shot = this._shot;
+      const last = shot.t.length ? shot.t[shot.t.length - 1] : -1;
+      if (!shot.recording || elapsed < last) {
+        shot = this._shot = { ...this._emptyShot(), recording: true };
+      } else if (elapsed === last) {
+        continue;  // frame not recorded, e.g. while the shot is about to end
+      }
+      shot.t.push(elapsed);
+      for (const c of GRAPH_CHANNELS) shot.values[c.key].push(batch[c.key][i]);
+      appended = true;
+    }
+    if (appended) this._scheduleGraphDraw();
+  }
+
+  _attachGraph() {
+    const canvas = this.shadowRoot?.querySelector("canvas.graph");
+    if (!canvas || this._graphCanvas === canvas) return;
+    this._graphObserver?.disconnect();
+    this._graphCanvas = canvas;
+    this._graphObserver = new ResizeObserver(() => this._scheduleGraphDraw(true));
+    this._graphObserver.observe(canvas);
+  }
+
+  _scheduleGraphDraw(full = false) {
+    this._graphFull = this._graphFull || full;
+    if (this._graphFrame) return;
+    this._graphFrame = requestAnimationFrame(() => {
+      this._graphFrame = null;
+      const redraw = this._graphFull;
+      this._graphFull = false;
+      this._drawGraph(redraw);
+    });
+  }
+
+  // Draw only the segments added since the last frame; the whole graph is
+  // redrawn when the canvas is resized, a new shot starts or the time axis grows
+  _drawGraph(full) {
+    const canvas = this.shadowRoot?.querySelector("canvas.graph");
+    if (!canvas) return;
+    const shot = this._shot;
+    const ctx = canvas.getContext("2d");
+    const dpr = window.devicePixelRatio || 1;
+    const width = canvas.clientWidth;
+    const height = canvas.clientHeight;
+    const duration = shot.t.length ? shot.t[shot.t.length - 1] : 0;
+    const span = Math.max(GRAPH_MIN_SPAN, Math.ceil(duration / 10) * 10);
+
+    if (full || canvas.width !== Math.round(width * dpr) || shot !== canvas._shot || span !== canvas._span) {
+      canvas.width = Math.round(width * dpr);
+      canvas.height = Math.round(height * dpr);
+      ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+      ctx.clearRect(0, 0, width, height);
+      ctx.strokeStyle = getComputedStyle(this).getPropertyValue("--divider-color") || "#ddd";
+      ctx.lineWidth = 1;
+      ctx.beginPath();
+      for (let s = 10; s < span; s += 10) {
+        const x = Math.round((s / span) * width) + 0.5;
+        ctx.moveTo(x, 0);
+        ctx.lineTo(x, height);
+      }
+      ctx.stroke();
+      canvas._shot = shot;
+      canvas._span = span;
+      canvas._drawn = 0;
+    }
+
+    const from = Math.max(canvas._drawn - 1, 0);
+    if (shot.t.length - from < 2) return;
+    const x = (i) => (shot.t[i] / span) * width;
+    ctx.lineWidth = 2;
+    ctx.lineJoin = "round";
+    for (const c of GRAPH_CHANNELS) {
+      const values = shot.values[c.key];
+      const y = (i) => height - (Math.min(Math.max(values[i] ?? 0, 0), c.max) / c.max) * height;
+      ctx.strokeStyle = c.color || this.config.color || "#ff9800";
+      ctx.beginPath();
+      ctx.moveTo(x(from), y(from));
+      for (let i = from + 1; i < shot.t.length; i++) ctx.lineTo(x(i), y(i));
+      ctx.stroke();
+    }
+    canvas._drawn = shot.t.length;
+  }
+
+  _onSnapshot(msg) {
+    if (msg.snapshot) {
+      this._snapshot = msg.snapshot;
+      return;
+    }
+    const next = { ...this._snapshot };
+    for (const [section, value] of Object.entries(msg.delta)) {
+      const merge = value && typeof value === "object" && !Array.isArray(value);
+      next[section] = merge ? { ...next[section], ...value } : value;
+    }
+    this._snapshot = next;
+  }
+
+  _getMode() {
+    if (this._snapshot) return this._snapshot.status.mode || "Standby";
+    return this.hass.states[`select.${this.config.device_name}_mode`]?.state || "Standby";
+  }
+
+  // Current profile label and the labels to choose from, or null if unknown
+  _getProfiles() {
+    if (this._snapshot) {
+      const labels = this._snapshot.profiles.map(p => p.label);
+      return labels.length ? { current: this._snapshot.status.p, options: labels } : null;
+    }
+    const stateObj = this.hass.states[`select.${this.config.device_name}_profile`];
+    return stateObj ? { current: stateObj.state, options: stateObj.attributes.options } : null;
+  }
 
   _getVal(suffix) {
     if (!this.hass || !this.config) return 0;
+    if (this._snapshot) return parseFloat(this._snapshot.status[SNAPSHOT_KEYS[suffix]]) || 0;
     const stateObj = this.hass.states[`sensor.${this.config.device_name}_${suffix}`];
     return stateObj ? parseFloat(stateObj.state) || 0 : 0;
   }
 
   _getUnit(suffix) {
     if (!this.hass || !this.config) return "";
+    if (this._snapshot) return SNAPSHOT_UNITS[SNAPSHOT_KEYS[suffix]] || "";
     const stateObj = this.hass.states[`sensor.${this.config.device_name}_${suffix}`];
     return stateObj?.attributes?.unit_of_measurement || "";
   }
@@ -224,7 +458,7 @@ class GaggiMateCard extends LitElement {
     const isHeating = showButtons && !isDragging && cur < tgt - 0.5;
 
     const slug = this.config.device_name;
-    const mode = this.hass.states[`select.${slug}_mode`]?.state || "Standby";
+    const mode = this._getMode();
     const buttonsEnabled = showButtons && mode === "Brew";
     const disabledCls = buttonsEnabled ? '' : 'disabled';
     const heatActiveClass = isHeating ? 'active' : '';
@@ -318,26 +552,27 @@ class GaggiMateCard extends LitElement {
   render() {
     if (!this.hass || !this.config?.device_name) return html`<ha-card style="padding:16px">Check configuration.</ha-card>`;
     const slug = this.config.device_name;
-    const mode = this.hass.states[`select.${slug}_mode`]?.state || "Standby";
-    const profile = this.hass.states[`select.${slug}_profile`];
+    const mode = this._getMode();
+    const profiles = this._getProfiles();
     const brand = this.config.color || "#ff9800";
     const showGrinder = this.config.show_grinder !== false;
     const showWeight = this.config.show_weight !== false;
+    const showGraph = this.config.show_graph !== false;
     const modes = ["Standby", "Brew", "Steam", "Water", ...(showGrinder ? ["Grind"] : [])];
 
     return html`
       <ha-card>
         <div class="card-header">${this.config.name}</div>
-        ${profile ? html`
+        ${profiles ? html`
           <div class="pad">
-            <ha-select label="Profile" .value="${profile.state}"
+            <ha-select label="Profile" .value="${profiles.current}"
               @selected="${(e) => {
                 // Only act on user-initiated changes, not initial render
-                if (e.target.value && e.target.value !== profile.state) {
-                  this.hass.callService('select', 'select_option', {entity_id: profile.entity_id, option: e.target.value});
+                if (e.target.value && e.target.value !== profiles.current) {
+                  this.hass.callService('select', 'select_option', {entity_id: `select.${slug}_profile`, option: e.target.value});
                 }
               }}">
-              ${profile.attributes.options.map(opt => html`<mwc-list-item .value="${opt}">${opt}</mwc-list-item>`)}
+              ${profiles.options.map(opt => html`<mwc-list-item .value="${opt}">${opt}</mwc-list-item>`)}
             </ha-select>
           </div>` : ''}
         <div class="modes">
@@ -358,6 +593,13 @@ class GaggiMateCard extends LitElement {
             <div class="divider"></div>
             <div class="w-sec"><div class="w-l">TARGET</div><div>${this._getVal("target_weight").toFixed(1)}g</div></div>
           </div>` : ''}
+        ${showGraph ? html`
+          <div class="graph-wrap">
+            <canvas class="graph"></canvas>
+            <div class="legend">
+              ${GRAPH_CHANNELS.map(c => html`<span><i style="background:${c.color || brand}"></i>${c.label}</span>`)}
+            </div>
+          </div>` : ''}
       </ha-card>`;
   }
 
@@ -405,6 +647,10 @@ class GaggiMateCard extends LitElement {
       .weight { margin: 0 16px 16px; padding: 12px; background: var(--secondary-background-color); border-radius: 12px; display: flex; justify-content: space-around; text-align: center; color: var(--primary-text-color); }
       .w-l { font-size: 9px; opacity: 0.5; font-weight: bold; }
       .divider { width: 1px; background: var(--divider-color); }
+      .graph-wrap { margin: 0 16px 16px; }
+      canvas.graph { width: 100%; height: 120px; display: block; }
+      .legend { display: flex; justify-content: center; gap: 12px; font-size: 10px; color: var(--secondary-text-color); margin-top: 4px; }
+      .legend i { display: inline-block; width: 8px; height: 8px; border-radius: 50%; margin-right: 4px; }
     `;
   }
 }
@@ -0,0 +1,189 @@
+"""End-to-end benchmark of the GaggiMate coordinator against the emulator.
+
+Measures, through a real ``GaggiMateCoordinator`` connected to
+``fake_gaggimate.py``:
+
+* frame-to-state latency: time from the emulator sending a status frame to
+  the coordinator notifying its entities,
+* CPU time spent in this process per status frame,
+* command round trip: time from ``change_mode`` to the first status frame
+  reporting the new mode.
+
+Requires Home Assistant to be installed (``pip install homeassistant``)::
+
+    python tools/benchmark.py --rate 20 --duration 30 --commands 20
+
+The emulator runs in a separate process by default so its CPU time does
+not pollute the measurement; pass ``--in-process`` to share the loop.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(REPO_ROOT / "tools"))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.gaggimate.const import MODE_BREW, MODE_STANDBY  # noqa: E402
+from custom_components.gaggimate.coordinator import GaggiMateCoordinator  # noqa: E402
+from fake_gaggimate import FakeGaggiMate  # noqa: E402
+
+
+def summarize(values: list[float], scale: float = 1000.0) -> dict[str, float]:
+    """Return count and percentiles of ``values`` (seconds, reported in ms)."""
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+    if len(ordered) > 1:
+        cuts = statistics.quantiles(ordered, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = ordered[0]
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.fmean(ordered) * scale, 3),
+        "p50": round(p50 * scale, 3),
+        "p95": round(p95 * scale, 3),
+        "p99": round(p99 * scale, 3),
+        "max": round(ordered[-1] * scale, 3),
+    }
+
+
+async def create_hass(config_dir: str) -> HomeAssistant:
+    """Create a bare Home Assistant instance to host the coordinator."""
+    hass = HomeAssistant(config_dir)
+    await hass.async_start()
+    return hass
+
+
+async def start_emulator(args: argparse.Namespace) -> tuple[str, Any]:
+    """Start the emulator and return its address and a handle to stop it."""
+    options = dict(frame_rate=args.rate, jitter=args.jitter, slow_response=args.slow)
+    if args.in_process:
+        device = FakeGaggiMate(**options)
+        await device.start()
+        return device.address, device
+
+    process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        str(REPO_ROOT / "tools" / "fake_gaggimate.py"),
+        "--rate", str(args.rate),
+        "--jitter", str(args.jitter),
+        "--slow", str(args.slow),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    address = (await process.stdout.readline()).decode().strip()
+    return address, process
+
+
+async def stop_emulator(handle: Any) -> None:
+    """Stop an emulator started by ``start_emulator``."""
+    if isinstance(handle, FakeGaggiMate):
+        await handle.stop()
+    else:
+        handle.terminate()
+        await handle.wait()
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    """Run the benchmark and return the results."""
+    address, emulator = await start_emulator(args)
+    config_dir = tempfile.mkdtemp(prefix="gaggimate-bench-")
+    hass = await create_hass(config_dir)
+    coordinator = GaggiMateCoordinator(hass, address, "benchmark")
+
+    latencies: list[float] = []
+    frames = 0
+    waiters: list[tuple[int, asyncio.Future[float]]] = []
+
+    def on_update() -> None:
+        nonlocal frames
+        data = coordinator.data or {}
+        sent = data.get("_ts")
+        if sent is not None:
+            frames += 1
+            latencies.append(time.time() - sent)
+        for mode, future in list(waiters):
+            if data.get("m") == mode and not future.done():
+                future.set_result(time.perf_counter())
+
+    try:
+        await coordinator.async_refresh()
+        coordinator.async_add_listener(on_update)
+
+        # Warm up, then measure ingestion only
+        await asyncio.sleep(args.warmup)
+        latencies.clear()
+        frames = 0
+        cpu_start = time.process_time()
+        await asyncio.sleep(args.duration)
+        cpu_used = time.process_time() - cpu_start
+        frame_latencies = list(latencies)
+        frame_count = frames
+
+        # Command round trips, alternating between Brew and Standby
+        round_trips: list[float] = []
+        timeouts = 0
+        for i in range(args.commands):
+            mode = MODE_BREW if i % 2 == 0 else MODE_STANDBY
+            future: asyncio.Future[float] = hass.loop.create_future()
+            waiters.append((mode, future))
+            sent = time.perf_counter()
+            await coordinator.change_mode(mode)
+            try:
+                observed = await asyncio.wait_for(future, timeout=5)
+                round_trips.append(observed - sent)
+            except asyncio.TimeoutError:
+                timeouts += 1
+            finally:
+                waiters.clear()
+    finally:
+        await coordinator.async_shutdown()
+        await hass.async_stop(force=True)
+        await stop_emulator(emulator)
+
+    return {
+        "frame_rate": args.rate,
+        "frames": frame_count,
+        "frame_to_state_ms": summarize(frame_latencies),
+        "cpu_per_frame_us": round(cpu_used / frame_count * 1e6, 1) if frame_count else None,
+        "command_round_trip_ms": summarize(round_trips),
+        "command_timeouts": timeouts,
+    }
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, default=10.0, help="status frames per second")
+    parser.add_argument("--jitter", type=float, default=0.0, help="frame interval jitter in seconds")
+    parser.add_argument("--slow", type=float, default=0.0, help="emulator response delay in seconds")
+    parser.add_argument("--duration", type=float, default=20.0, help="measurement window in seconds")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds ignored after connecting")
+    parser.add_argument("--commands", type=int, default=20, help="mode changes to time")
+    parser.add_argument("--in-process", action="store_true", help="run the emulator in this process")
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    results = asyncio.run(run(args))
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.json:
+        args.json.write_text(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+"""Local GaggiMate device emulator for benchmarks and development.
+
+Speaks the same protocol as the firmware as far as the integration uses it:
+the ``/ws`` WebSocket (``evt:status`` frames, OTA settings, profiles, mode
+and temperature commands) and the ``/api/settings`` and ``/api/scales/scan``
+HTTP endpoints.
+
+Run standalone::
+
+    python tools/fake_gaggimate.py --port 8080 --rate 10 --shot-every 60
+
+With ``--count`` several devices are started on consecutive ports and their
+addresses are printed one per line. Sending ``SIGUSR1`` drops every client of
+every device at once.
+
+Each status frame carries an extra ``_ts`` key with the wall clock time it
+was sent, so benchmarks can measure end-to-end latency.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import json
+import logging
+import random
+import signal
+import time
+import uuid
+from typing import Any
+
+from aiohttp import WSMsgType, web
+
+_LOGGER = logging.getLogger("fake_gaggimate")
+
+MODE_STANDBY = 0
+MODE_BREW = 1
+
+DEFAULT_PROFILES = [
+    {
+        "id": "classic",
+        "label": "Classic 9 bar",
+        "type": "pro",
+        "temperature": 93,
+        "phases": [
+            {"name": "Preinfusion", "phase": "preinfusion", "duration": 8,
+             "pump": {"target": "pressure", "pressure": 3, "flow": 0}},
+            {"name": "Brew", "phase": "brew", "duration": 25,
+             "pump": {"target": "pressure", "pressure": 9, "flow": 0},
+             "transition": {"type": "linear", "duration": 3}},
+        ],
+    },
+    {
+        "id": "turbo",
+        "label": "Turbo",
+        "type": "pro",
+        "temperature": 94,
+        "phases": [
+            {"name": "Brew", "phase": "brew", "duration": 15,
+             "pump": {"target": "pressure", "pressure": 6, "flow": 0}},
+        ],
+    },
+    {"id": "flush", "label": "Flush", "type": "standard", "utility": True,
+     "phases": [{"name": "Flush", "phase": "brew", "duration": 5, "pump": 100}]},
+]
+
+
+class FakeGaggiMate:
+    """An emulated GaggiMate device."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        frame_rate: float = 10.0,
+        jitter: float = 0.0,
+        slow_response: float = 0.0,
+        disconnect_every: float | None = None,
+        shot_every: float | None = None,
+        shot_duration: float = 30.0,
+    ) -> None:
+        """Initialize the emulator.
+
+        ``jitter`` is the maximum random deviation of the frame interval in
+        seconds, ``slow_response`` delays every request response, and
+        ``disconnect_every`` drops all clients periodically.
+        """
+        self.bind_host = host
+        self.port = port
+        self.frame_rate = frame_rate
+        self.jitter = jitter
+        self.slow_response = slow_response
+        self.disconnect_every = disconnect_every
+        self.shot_every = shot_every
+        self.shot_duration = shot_duration
+
+        self.profiles = copy.deepcopy(DEFAULT_PROFILES)
+        self.state: dict[str, Any] = {
+            "m": MODE_STANDBY,
+            "ct": 25.0,
+            "tt": 93.0,
+            "pr": 0.0,
+            "pt": 9.0,
+            "fl": 0.0,
+            "cw": 0.0,
+            "tw": 36.0,
+            "p": self.profiles[0]["label"],
+        }
+        self.ota: dict[str, Any] = {
+            "hardware": "GaggiMate Pro Rev 1.x",
+            "displayVersion": "v1.6.0",
+            "controllerVersion": "v1.6.0",
+            "latestVersion": "v1.6.0",
+            "displayUpdateAvailable": False,
+            "controllerUpdateAvailable": False,
+            "updating": False,
+            "progress": 0,
+            "spiffsTotal": 1_441_792,
+            "spiffsUsed": 524_288,
+            "spiffsFree": 917_504,
+            "spiffsUsedPct": 36,
+        }
+        self.frames_sent = 0
+        self.requests_received = 0
+        self._clients: set[web.WebSocketResponse] = set()
+        self._runner: web.AppRunner | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._shot_started: float | None = None
+
+    @property
+    def address(self) -> str:
+        """Return the host:port clients should connect to."""
+        return f"{self.bind_host}:{self.port}"
+
+    async def start(self) -> None:
+        """Start serving."""
+        app = web.Application()
+        app.router.add_get("/ws", self._handle_ws)
+        app.router.add_post("/api/settings", self._handle_settings)
+        app.router.add_post("/api/scales/scan", self._handle_scale_scan)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.bind_host, self.port)
+        await site.start()
+        if self.port == 0:
+            self.port = site._server.sockets[0].getsockname()[1]  # noqa: SLF001
+
+        self._tasks.append(asyncio.create_task(self._status_loop()))
+        if self.disconnect_every:
+            self._tasks.append(asyncio.create_task(self._disconnect_loop()))
+        _LOGGER.info("Fake GaggiMate listening on %s", self.address)
+
+    async def stop(self) -> None:
+        """Stop serving and drop all clients."""
+        for task in self._tasks:
+            task.cancel()
+        await self.drop_clients()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def drop_clients(self) -> None:
+        """Close every client connection, as a Wi-Fi drop would."""
+        await asyncio.gather(*(ws.close() for ws in list(self._clients)), return_exceptions=True)
+        self._clients.clear()
+
+    def _simulate(self, now: float) -> None:
+        """Advance the emulated machine state."""
+        state = self.state
+        brewing = self._shot_started is not None
+        if self.shot_every and state["m"] == MODE_BREW and not brewing:
+            if now % self.shot_every < 1 / max(self.frame_rate, 1):
+                self._shot_started = now
+                state["cw"] = 0.0
+                brewing = True
+
+        if brewing:
+            elapsed = now - self._shot_started
+            if elapsed >= self.shot_duration:
+                self._shot_started = None
+                state["pr"] = state["fl"] = 0.0
+            else:
+                target = 3.0 if elapsed < 8 else state["pt"]
+                state["pr"] += (target - state["pr"]) * 0.3 + random.gauss(0, 0.03)
+                state["fl"] = max(state["pr"] * 0.22 + random.gauss(0, 0.02), 0.0)
+                if elapsed > 6:
+                    state["cw"] += state["fl"] * 0.85 / self.frame_rate
+        else:
+            state["pr"] = max(random.gauss(0, 0.01), 0.0)
+            state["fl"] = 0.0
+
+        heating = state["m"] != MODE_STANDBY
+        goal = state["tt"] if heating else 25.0
+        state["ct"] += (goal - state["ct"]) * (0.02 if heating else 0.002) + random.gauss(0, 0.05)
+
+    def _status_frame(self) -> str:
+        """Serialize the current status."""
+        return json.dumps(
+            {
+                "tp": "evt:status",
+                **{k: round(v, 2) if isinstance(v, float) else v for k, v in self.state.items()},
+                "_ts": time.time(),
+            }
+        )
+
+    async def _status_loop(self) -> None:
+        """Broadcast status frames at the configured rate."""
+        interval = 1 / self.frame_rate
+        while True:
+            delay = interval + random.uniform(-self.jitter, self.jitter) if self.jitter else interval
+            await asyncio.sleep(max(delay, 0))
+            self._simulate(time.monotonic())
+            if not self._clients:
+                continue
+            frame = self._status_frame()
+            for ws in list(self._clients):
+                try:
+                    await ws.send_str(frame)
+                    self.frames_sent += 1
+                except (ConnectionError, RuntimeError):
+                    self._clients.discard(ws)
+
+    async def _disconnect_loop(self) -> None:
+        """Drop all clients periodically."""
+        while True:
+            await asyncio.sleep(self.disconnect_every)
+            _LOGGER.info("Dropping %d client(s)", len(self._clients))
+            await self.drop_clients()
+
+    async def _handle_ws(self, request: web.Request) -> web.WebSocketResponse:
+        """Serve one WebSocket client."""
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self._clients.add(ws)
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                self.requests_received += 1
+                response = self._handle_request(json.loads(msg.data))
+                if response is None:
+                    continue
+                if self.slow_response:
+                    await asyncio.sleep(self.slow_response)
+                await ws.send_str(json.dumps(response))
+        finally:
+            self._clients.discard(ws)
+        return ws
+
+    def _handle_request(self, request: dict[str, Any]) -> dict[str, Any] | None:
+        """Apply a WebSocket request and return the response, if any."""
+        tp = request.get("tp")
+        response: dict[str, Any] | None = None
+
+        if tp == "req:ota-settings":
+            response = {"tp": "res:ota-settings", **self.ota}
+        elif tp == "req:profiles:list":
+            response = {"tp": "res:profiles:list", "profiles": self.profiles}
+        elif tp == "req:profiles:select":
+            for profile in self.profiles:
+                if profile["id"] == request.get("id"):
+                    self.state["p"] = profile["label"]
+                    self.state["tt"] = float(profile.get("temperature", self.state["tt"]))
+            response = {"tp": "res:profiles:select"}
+        elif tp == "req:profiles:save":
+            profile = dict(request.get("profile", {}))
+            profile.setdefault("id", uuid.uuid4().hex[:8])
+            self.profiles = [p for p in self.profiles if p["id"] != profile["id"]] + [profile]
+            response = {"tp": "res:profiles:save", "profile": profile}
+        elif tp == "req:change-mode":
+            self.state["m"] = int(request.get("mode", MODE_STANDBY))
+        elif tp == "req:raise-temp":
+            self.state["tt"] = min(self.state["tt"] + 1, 160)
+        elif tp == "req:lower-temp":
+            self.state["tt"] = max(self.state["tt"] - 1, 0)
+        elif tp == "req:ota-start":
+            response = {"tp": "res:ota-start"}
+
+        if response is not None and "rid" in request:
+            response["rid"] = request["rid"]
+        return response
+
+    async def _handle_settings(self, request: web.Request) -> web.Response:
+        """Handle POST /api/settings."""
+        if request.content_type == "application/json":
+            data = await request.json()
+        else:
+            data = dict(await request.post())
+        if self.slow_response:
+            await asyncio.sleep(self.slow_response)
+        if "targetPressure" in data:
+            self.state["pt"] = float(data["targetPressure"])
+        if "targetWeight" in data:
+            self.state["tw"] = float(data["targetWeight"])
+        return web.json_response({"success": True})
+
+    async def _handle_scale_scan(self, request: web.Request) -> web.Response:
+        """Handle POST /api/scales/scan."""
+        if self.slow_response:
+            await asyncio.sleep(self.slow_response)
+        return web.json_response({"success": True})
+
+
+async def _run(args: argparse.Namespace) -> None:
+    """Run devices until interrupted."""
+    devices = [
+        FakeGaggiMate(
+            host=args.host,
+            port=args.port + i if args.port else 0,
+            frame_rate=args.rate,
+            jitter=args.jitter,
+            slow_response=args.slow,
+            disconnect_every=args.disconnect_every,
+            shot_every=args.shot_every,
+        )
+        for i in range(args.count)
+    ]
+    for device in devices:
+        device.state["m"] = MODE_BREW if args.shot_every else MODE_STANDBY
+        await device.start()
+        print(device.address, flush=True)
+
+    # SIGUSR1 drops every client of every device at once
+    def drop_all() -> None:
+        for device in devices:
+            asyncio.ensure_future(device.drop_clients())
+
+    asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, drop_all)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        for device in devices:
+            await device.stop()
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0, help="first port, 0 picks free ports")
+    parser.add_argument("--count", type=int, default=1, help="number of devices to emulate")
+    parser.add_argument("--rate", type=float, default=10.0, help="status frames per second")
+    parser.add_argument("--jitter", type=float, default=0.0, help="frame interval jitter in seconds")
+    parser.add_argument("--slow", type=float, default=0.0, help="delay before each response in seconds")
+    parser.add_argument("--disconnect-every", type=float, default=None, help="drop clients every N seconds")
+    parser.add_argument("--shot-every", type=float, default=None, help="pull a shot every N seconds")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+    try:
+        asyncio.run(_run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
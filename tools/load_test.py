@@ -0,0 +1,210 @@
+"""Fleet-scale load test for one Home Assistant event loop.
+
+Starts ``--devices`` emulated machines in a separate process, connects one
+``GaggiMateCoordinator`` per machine (with the real entities' update
+handlers run on every update, as in ``replay.py``) and reports:
+
+* event-loop lag percentiles while the fleet streams status frames,
+* coordinator updates and entity state writes per second,
+* traced Python memory per coordinator,
+* a reconnect storm: all devices drop at once and the time until every
+  coordinator receives frames again, with the loop lag during the storm.
+
+Requires Home Assistant to be installed::
+
+    python tools/load_test.py --devices 50 --rate 10 --duration 30
+
+Results include the platform details so runs on different hardware can be
+compared; use ``--json`` to keep them.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import signal
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(REPO_ROOT / "tools"))
+
+from benchmark import create_hass, summarize  # noqa: E402
+from replay import create_entities  # noqa: E402
+
+from custom_components.gaggimate import coordinator as coordinator_module  # noqa: E402
+from custom_components.gaggimate.coordinator import GaggiMateCoordinator  # noqa: E402
+
+LAG_PROBE_INTERVAL = 0.05  # seconds
+
+
+class LagProbe:
+    """Measure how late the event loop wakes up a sleeping task."""
+
+    def __init__(self) -> None:
+        """Initialize the probe."""
+        self.samples: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start sampling."""
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.perf_counter() + LAG_PROBE_INTERVAL
+            await asyncio.sleep(LAG_PROBE_INTERVAL)
+            self.samples.append(max(time.perf_counter() - expected, 0.0))
+
+    def take(self) -> list[float]:
+        """Return and reset the collected samples."""
+        samples, self.samples = self.samples, []
+        return samples
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        if self._task is not None:
+            self._task.cancel()
+
+
+async def start_fleet(args: argparse.Namespace) -> tuple[list[str], asyncio.subprocess.Process]:
+    """Start the emulated fleet and return the device addresses."""
+    process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        str(REPO_ROOT / "tools" / "fake_gaggimate.py"),
+        "--count", str(args.devices),
+        "--rate", str(args.rate),
+        "--jitter", str(args.jitter),
+        "--shot-every", str(args.shot_every),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    addresses = [
+        (await process.stdout.readline()).decode().strip() for _ in range(args.devices)
+    ]
+    return addresses, process
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    """Run the load test and return the results."""
+    coordinator_module.RECONNECT_INTERVAL = args.reconnect_interval
+    addresses, fleet = await start_fleet(args)
+    hass = await create_hass(tempfile.mkdtemp(prefix="gaggimate-load-"))
+
+    last_update: dict[int, float] = {}
+    updates = 0
+    coordinators: list[GaggiMateCoordinator] = []
+    probe = LagProbe()
+
+    def make_listener(index: int, entities: list[Any]) -> Any:
+        def on_update() -> None:
+            nonlocal updates
+            updates += 1
+            last_update[index] = time.perf_counter()
+            for entity in entities:
+                entity._handle_coordinator_update()
+        return on_update
+
+    try:
+        # Memory: trace allocations while the fleet is connected and warmed up
+        tracemalloc.start()
+        baseline = tracemalloc.take_snapshot()
+        for index, address in enumerate(addresses):
+            coordinator = GaggiMateCoordinator(hass, address, f"load_{index}")
+            coordinator.data = {}
+            entities = await create_entities(hass, coordinator)
+            coordinator.async_add_listener(make_listener(index, entities))
+            coordinators.append(coordinator)
+        connect_start = time.perf_counter()
+        await asyncio.gather(*(c.async_refresh() for c in coordinators))
+        connect_time = time.perf_counter() - connect_start
+        await asyncio.sleep(args.warmup)
+        traced = tracemalloc.take_snapshot().compare_to(baseline, "filename")
+        tracemalloc.stop()
+        memory_per_coordinator = sum(stat.size_diff for stat in traced) / len(coordinators)
+
+        # Steady state streaming
+        probe.start()
+        updates = 0
+        writes = sum(c.metrics.state_writes for c in coordinators)
+        await asyncio.sleep(args.duration)
+        steady_lag = probe.take()
+        steady_updates = updates
+        steady_writes = sum(c.metrics.state_writes for c in coordinators) - writes
+
+        # Reconnect storm
+        dropped = time.perf_counter()
+        fleet.send_signal(signal.SIGUSR1)
+        deadline = dropped + args.reconnect_interval * 2 + args.storm_timeout
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(0.1)
+            if all(last_update.get(i, 0) > dropped + 1 / args.rate for i in range(len(coordinators))):
+                break
+        recovered = [
+            last_update[i] - dropped
+            for i in range(len(coordinators))
+            if last_update.get(i, 0) > dropped + 1 / args.rate
+        ]
+        storm_lag = probe.take()
+    finally:
+        probe.stop()
+        for coordinator in coordinators:
+            await coordinator.async_shutdown()
+        await hass.async_stop(force=True)
+        fleet.terminate()
+        await fleet.wait()
+
+    return {
+        "platform": {
+            "python": platform.python_version(),
+            "system": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "devices": args.devices,
+        "frame_rate": args.rate,
+        "connect_seconds": round(connect_time, 3),
+        "memory_per_coordinator_kib": round(memory_per_coordinator / 1024, 1),
+        "loop_lag_ms": summarize(steady_lag),
+        "coordinator_updates_per_second": round(steady_updates / args.duration, 1),
+        "state_writes_per_second": round(steady_writes / args.duration, 1),
+        "reconnect_storm": {
+            "reconnected": len(recovered),
+            "failed": len(coordinators) - len(recovered),
+            "recovery_ms": summarize(recovered),
+            "loop_lag_ms": summarize(storm_lag),
+        },
+    }
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=25, help="number of emulated machines")
+    parser.add_argument("--rate", type=float, default=10.0, help="status frames per second per device")
+    parser.add_argument("--jitter", type=float, default=0.01, help="frame interval jitter in seconds")
+    parser.add_argument("--shot-every", type=float, default=45.0, help="each device pulls a shot every N seconds")
+    parser.add_argument("--duration", type=float, default=30.0, help="steady-state measurement window in seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="seconds after connecting before measuring")
+    parser.add_argument("--reconnect-interval", type=float, default=5.0, help="coordinator reconnect delay for the storm")
+    parser.add_argument("--storm-timeout", type=float, default=30.0, help="extra seconds allowed for the fleet to recover")
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    results = asyncio.run(run(args))
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.json:
+        args.json.write_text(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
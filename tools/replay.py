@@ -0,0 +1,169 @@
+"""Replay a WebSocket capture through the coordinator and entity layer.
+
+Captures are recorded with the ``gaggimate.start_capture`` service. Every
+inbound frame is fed to ``GaggiMateCoordinator.process_frame`` and each
+coordinator update runs the coordinator update handler of the real sensor,
+binary sensor, switch, number and update entities. State writes are
+stubbed to evaluate the entity state, so the measured cost covers decoding,
+dispatch, sensor filtering and entity state computation.
+
+Requires Home Assistant to be installed::
+
+    python tools/replay.py capture.jsonl.gz            # as fast as possible
+    python tools/replay.py capture.jsonl.gz --speed 1  # real time
+    python tools/replay.py capture.jsonl.gz --speed 10 --profile 20
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import cProfile
+import json
+import logging
+import pstats
+import sys
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(REPO_ROOT / "tools"))
+
+from benchmark import create_hass, summarize  # noqa: E402
+
+from custom_components.gaggimate import (  # noqa: E402
+    binary_sensor,
+    number,
+    sensor,
+    switch,
+    update,
+)
+from custom_components.gaggimate.capture import DIRECTION_IN, read_frames  # noqa: E402
+from custom_components.gaggimate.coordinator import GaggiMateCoordinator  # noqa: E402
+
+PLATFORMS = (sensor, binary_sensor, switch, number, update)
+STATE_ATTRIBUTES = ("native_value", "is_on", "current_option", "installed_version")
+
+
+async def create_entities(hass: Any, coordinator: GaggiMateCoordinator) -> list[Any]:
+    """Create the integration's entities with state writes stubbed.
+
+    A stubbed write counts the write and evaluates the attribute holding the
+    entity state, as Home Assistant would.
+    """
+    entry = SimpleNamespace(
+        entry_id="replay",
+        title="GaggiMate",
+        data={"model": "GaggiMate", "hw_version": ""},
+        options={},
+        runtime_data=coordinator,
+    )
+    entities: list[Any] = []
+    for platform in PLATFORMS:
+        await platform.async_setup_entry(hass, entry, entities.extend)
+
+    def write_state(entity: Any, attribute: str | None) -> None:
+        coordinator.metrics.state_writes += 1
+        if attribute is not None:
+            getattr(entity, attribute)
+
+    for entity in entities:
+        attribute = next(
+            (name for name in STATE_ATTRIBUTES if hasattr(type(entity), name)), None
+        )
+        entity.async_write_ha_state = partial(write_state, entity, attribute)
+    return entities
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    """Replay the capture and return the measurements."""
+    frames = await asyncio.to_thread(read_frames, args.capture)
+    inbound = [(t, frame) for t, direction, frame in frames if direction == DIRECTION_IN]
+    if not inbound:
+        raise SystemExit("Capture contains no inbound frames")
+
+    hass = await create_hass(tempfile.mkdtemp(prefix="gaggimate-replay-"))
+    coordinator = GaggiMateCoordinator(hass, "replay", "replay")
+    coordinator.data = {}
+    entities = await create_entities(hass, coordinator)
+
+    updates = 0
+
+    def on_update() -> None:
+        nonlocal updates
+        updates += 1
+        for entity in entities:
+            entity._handle_coordinator_update()
+
+    coordinator.async_add_listener(on_update)
+
+    costs: list[float] = []
+    lateness: list[float] = []
+    profiler = cProfile.Profile() if args.profile else None
+    base = time.monotonic()
+    start = time.perf_counter()
+    try:
+        for captured_at, frame in inbound:
+            if args.speed:
+                due = start + captured_at / args.speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                lateness.append(max(time.perf_counter() - due, 0.0))
+
+            if profiler is not None:
+                profiler.enable()
+            began = time.perf_counter()
+            coordinator.process_frame(frame, received=base + captured_at)
+            costs.append(time.perf_counter() - began)
+            if profiler is not None:
+                profiler.disable()
+        wall = time.perf_counter() - start
+    finally:
+        await hass.async_stop(force=True)
+
+    if profiler is not None:
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(args.profile)
+
+    result: dict[str, Any] = {
+        "frames": len(inbound),
+        "coordinator_updates": updates,
+        "state_writes": coordinator.metrics.state_writes,
+        "entities": len(entities),
+        "capture_seconds": round(inbound[-1][0] - inbound[0][0], 1),
+        "wall_seconds": round(wall, 3),
+        "frames_per_second": round(len(inbound) / wall, 1) if wall else None,
+        "dispatch_ms": summarize(costs),
+        "shots_recorded": len(coordinator.shot_recorder.shots),
+    }
+    if args.speed:
+        result["lateness_ms"] = summarize(lateness)
+    return result
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("capture", type=Path, help="capture file written by gaggimate.start_capture")
+    parser.add_argument(
+        "--speed", type=float, default=0.0,
+        help="replay speed multiplier, 1 is real time and 0 (default) is as fast as possible",
+    )
+    parser.add_argument("--profile", type=int, default=0, metavar="N", help="print the top N functions by cumulative time")
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    results = asyncio.run(run(args))
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.json:
+        args.json.write_text(output + "\n")
+
+
+if __name__ == "__main__":
+    main()